@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Adaptive batch sizing for the bulk loaders.
+
+Instead of a hand-tuned row count, batches are cut to a byte budget that is
+adjusted after every batch (AIMD): while batches succeed under the latency
+target the budget grows by a fixed step, and a failed or slow batch halves it.
+A batch that fails also caps future growth just below its size, so the sizer
+stops probing a statement-size or timeout limit it has already hit, and the
+failed batch itself is split to the reduced budget and retried (split()).
+"""
+import threading
+
+DEFAULT_START_BYTES = 1 << 20
+DEFAULT_MIN_BYTES = 32 << 10
+DEFAULT_MAX_BYTES = 32 << 20
+DEFAULT_STEP_BYTES = 512 << 10
+DEFAULT_TARGET_SECONDS = 2.0
+
+
+class AdaptiveBatchSizer:
+    """AIMD controller for a per-batch byte budget; safe to call from worker threads"""
+
+    def __init__(self, start_bytes=DEFAULT_START_BYTES, min_bytes=DEFAULT_MIN_BYTES, max_bytes=DEFAULT_MAX_BYTES,
+                 step_bytes=DEFAULT_STEP_BYTES, target_seconds=DEFAULT_TARGET_SECONDS, decrease_factor=0.5,
+                 on_step=None):
+        if not 0 < min_bytes <= start_bytes <= max_bytes:
+            raise ValueError('Expected 0 < min_bytes <= start_bytes <= max_bytes')
+        if not 0 < decrease_factor < 1:
+            raise ValueError('decrease_factor must be between 0 and 1')
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.step_bytes = step_bytes
+        self.target_seconds = target_seconds
+        self.decrease_factor = decrease_factor
+        self.on_step = on_step
+        self.ceiling = max_bytes
+        self.steps = []
+        self._budget = start_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def budget(self):
+        with self._lock:
+            return self._budget
+
+    def observe(self, rows, nbytes, seconds, error=None):
+        """Feed back one finished batch and return the new budget"""
+        with self._lock:
+            before = self._budget
+            if error is not None:
+                action = 'error'
+                self.ceiling = max(self.min_bytes, min(self.ceiling, int(nbytes * 0.9)))
+                budget = before * self.decrease_factor
+            elif seconds > self.target_seconds:
+                action = 'slow'
+                budget = before * self.decrease_factor
+            else:
+                action = 'grow'
+                budget = before + self.step_bytes
+            self._budget = int(max(self.min_bytes, min(budget, self.ceiling, self.max_bytes)))
+            step = {
+                'step': len(self.steps) + 1,
+                'rows': rows,
+                'bytes': nbytes,
+                'seconds': round(seconds, 4),
+                'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None,
+                'action': action,
+                'budget_before': before,
+                'budget_after': self._budget,
+            }
+            self.steps.append(step)
+        if self.on_step:
+            self.on_step(step)
+        return step['budget_after']
+
+    def iter_batches(self, records, encode):
+        """Cut a record stream into (rows, payload) batches of about one budget each.
+
+        ``encode(record)`` returns the record's wire text; the payload is the
+        concatenation, so rows are encoded once. The budget is re-read at the
+        start of every batch, so feedback from finished batches applies to the
+        next one cut.
+        """
+        budget = self.budget
+        rows = []
+        parts = []
+        size = 0
+        for record in records:
+            text = encode(record)
+            nbytes = len(text.encode('utf-8'))
+            if rows and size + nbytes > budget:
+                yield rows, ''.join(parts)
+                budget = self.budget
+                rows = []
+                parts = []
+                size = 0
+            rows.append(record)
+            parts.append(text)
+            size += nbytes
+        if rows:
+            yield rows, ''.join(parts)
+
+    def split(self, rows, payload):
+        """Cut an encoded batch into (rows, payload) pieces of about one budget each.
+
+        ``payload`` must hold one line per row, as COPY text does, so a failed
+        batch can be re-cut without encoding its rows again.
+        """
+        # COPY text escapes newlines inside values, so only row ends are '\n'
+        lines = [line + '\n' for line in payload.split('\n')[:-1]]
+        if len(lines) != len(rows):
+            raise ValueError(f'Payload has {len(lines)} lines for {len(rows)} rows')
+        return [([row for row, _ in pairs], piece)
+                for pairs, piece in self.iter_batches(zip(rows, lines), lambda pair: pair[1])]
+
+    def summary(self):
+        """Best and final budgets plus overall throughput of the observed batches"""
+        with self._lock:
+            steps = list(self.steps)
+            budget = self._budget
+        ok = [s for s in steps if s['action'] != 'error' and s['rows_per_sec']]
+        best = max(ok, key=lambda s: s['rows_per_sec']) if ok else None
+        return {
+            'steps': len(steps),
+            'errors': sum(1 for s in steps if s['action'] == 'error'),
+            'final_budget': budget,
+            'ceiling': self.ceiling,
+            'best_rows_per_sec': best['rows_per_sec'] if best else None,
+            'best_batch_bytes': best['bytes'] if best else None,
+        }
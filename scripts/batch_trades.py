@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Split a trade dump into INSERT batch files in a single streaming pass.
+
+The input is parsed once and cut into batches by row count or by encoded byte
+size (DB and API payload limits are byte limits), so a batch never exceeds
+--max-bytes unless a single row is larger on its own. Repeated trade IDs are
+dropped with the keep-first policy unless --dedup picks another or --no-dedup
+is given. Files are written by a small thread pool, optionally gzip-compressed
+and spread over shard subdirectories.
+
+Usage:
+    python scripts/batch_trades.py [web/all_trades.sql] (--rows N | --max-bytes N)
+        [--output-dir DIR] [--prefix NAME] [--limit N] [--ids-file FILE]
+        [--dedup keep-first|keep-latest | --no-dedup] [--shards K] [--workers W] [--gzip]
+        [--metrics web/metrics.jsonl] [--profile cprofile|pyinstrument]
+
+Replaces the one-off slicing scripts:
+    create_45_trade_batches.py  --rows 45 --output-dir web/trades_45_batches --prefix trades_45_batch
+    create_trade_batches.py     --rows 1000 --prefix trades_1000_batch
+    create_small_test_batch.py  --limit 10 --rows 10 --prefix trades_test_10
+    split_large_batch.py        trades_1000_batch_1.sql --rows 50 --prefix trades_50_batch
+    import_trades_direct.py     trades_1000_batch_1.sql --bare-values --rows 20 --prefix trades_20_batch
+    extract_first_20_trades.py  trades_1000_batch_1.sql --limit 20 --rows 20 --prefix trades_first_20
+    create_25_trade_batch.py    trades_1000_batch_1.sql --limit 25 --rows 25 --prefix trades_25_batch
+    create_30_trade_batch.py / extract_first_30_trades.py
+                                trades_1000_batch_1.sql --bare-values --limit 30 --rows 30 --prefix trades_30_batch
+"""
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from pipeline_metrics import PROFILERS, PipelineMetrics
+from trade_dedup import KEEP_FIRST, POLICIES, dedupe_trades
+from trade_record import iter_trades
+from trade_sql import TRADE_COLUMNS, format_values_row
+
+DEFAULT_ON_CONFLICT = 'ON CONFLICT (id) DO NOTHING'
+_ROW_SEPARATOR = ',\n'
+
+
+def statement_frame(table='Trade', columns=TRADE_COLUMNS, on_conflict=DEFAULT_ON_CONFLICT):
+    """Return the (head, tail) text that wraps the VALUES rows of one INSERT"""
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    return f'INSERT INTO "{table}" ({column_list}) VALUES\n', f'\n{on_conflict};'
+
+
+def iter_sized_batches(records, max_rows=None, max_bytes=None, table='Trade', columns=TRADE_COLUMNS,
+                       on_conflict=DEFAULT_ON_CONFLICT):
+    """Group records into batches under a row and/or byte limit.
+
+    Yields ``(records, sql)`` where ``sql`` is the complete INSERT statement.
+    Every row is rendered exactly once; its UTF-8 size decides whether it still
+    fits in the current batch. A row that alone exceeds max_bytes gets its own batch.
+    """
+    if not max_rows and not max_bytes:
+        raise ValueError('Set max_rows or max_bytes')
+    head, tail = statement_frame(table, columns, on_conflict)
+    frame_bytes = len(head.encode('utf-8')) + len(tail.encode('utf-8'))
+    separator_bytes = len(_ROW_SEPARATOR)
+
+    batch = []
+    rendered = []
+    size = frame_bytes
+    for record in records:
+        row = format_values_row(record)
+        row_bytes = len(row.encode('utf-8'))
+        added = row_bytes + (separator_bytes if rendered else 0)
+        if rendered and ((max_rows and len(batch) >= max_rows) or
+                         (max_bytes and size + added > max_bytes)):
+            yield batch, head + _ROW_SEPARATOR.join(rendered) + tail
+            batch = []
+            rendered = []
+            size = frame_bytes
+            added = row_bytes
+        batch.append(record)
+        rendered.append(row)
+        size += added
+    if batch:
+        yield batch, head + _ROW_SEPARATOR.join(rendered) + tail
+
+
+def batch_path(output_dir, prefix, batch_num, shards=1, compress=False):
+    """Path of batch ``batch_num`` (1-based); shards are assigned round-robin"""
+    if shards > 1:
+        output_dir = os.path.join(output_dir, f'shard_{(batch_num - 1) % shards:02d}')
+    suffix = '.sql.gz' if compress else '.sql'
+    return os.path.join(output_dir, f'{prefix}_{batch_num:03d}{suffix}')
+
+
+def write_batch_file(path, sql, compress=False):
+    """Write one batch atomically (tmp file + rename) and return its size on disk"""
+    tmp_path = path + '.tmp'
+    data = sql.encode('utf-8')
+    if compress:
+        data = gzip.compress(data, compresslevel=6)
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def read_id_filter(path):
+    """Trade IDs to keep, one per line (blank lines and # comments ignored)"""
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith('#')}
+
+
+def write_batches(records, output_dir, prefix, max_rows=None, max_bytes=None, shards=1, workers=4,
+                  compress=False, on_batch=None):
+    """Batch a record stream and write every batch file; returns a stats dict.
+
+    Writes run on a thread pool with at most 2*workers batches held in memory,
+    so the pass stays streaming however large the input is.
+    ``on_batch(batch_num, path, records, bytes_written, error)`` is called per file.
+    """
+    for shard in range(max(shards, 1)):
+        os.makedirs(os.path.dirname(batch_path(output_dir, prefix, shard + 1, shards)) or '.', exist_ok=True)
+
+    stats = {'batches': 0, 'rows': 0, 'bytes_sql': 0, 'bytes_written': 0, 'largest_batch_bytes': 0,
+             'failed_batches': 0, 'errors': [], 'seconds': 0.0}
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(workers * 2)
+
+    def run(batch_num, path, batch, sql):
+        try:
+            written, error = write_batch_file(path, sql, compress), None
+        except Exception as e:
+            written, error = 0, e
+        finally:
+            in_flight.release()
+        with lock:
+            stats['bytes_written'] += written
+            if error is not None:
+                stats['failed_batches'] += 1
+                stats['errors'].append(f'{path}: {error}')
+            if on_batch:
+                on_batch(batch_num, path, batch, written, error)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch, sql in iter_sized_batches(records, max_rows, max_bytes):
+            sql_bytes = len(sql.encode('utf-8'))
+            with lock:
+                stats['batches'] += 1
+                stats['rows'] += len(batch)
+                stats['bytes_sql'] += sql_bytes
+                stats['largest_batch_bytes'] = max(stats['largest_batch_bytes'], sql_bytes)
+                batch_num = stats['batches']
+            in_flight.acquire()
+            executor.submit(run, batch_num, batch_path(output_dir, prefix, batch_num, shards, compress), batch, sql)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split a trade dump into INSERT batch files')
+    parser.add_argument('source', nargs='?', default='web/all_trades.sql')
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument('--rows', type=int, help='maximum trades per batch')
+    size.add_argument('--max-bytes', type=int, help='maximum size of one INSERT statement in bytes')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--prefix', default='trades_batch', help='batch file name prefix')
+    parser.add_argument('--limit', type=int, help='only take the first N trades')
+    parser.add_argument('--ids-file', help='only keep trade IDs listed in this file')
+    dedup = parser.add_mutually_exclusive_group()
+    dedup.add_argument('--dedup', choices=POLICIES, default=KEEP_FIRST,
+                       help='policy for dropping duplicate trade IDs (default: %(default)s)')
+    dedup.add_argument('--no-dedup', action='store_true', help='keep repeated trade IDs')
+    parser.add_argument('--bare-values', action='store_true',
+                        help='input holds only (...),(...) tuples without an INSERT header')
+    parser.add_argument('--shards', type=int, default=1, help='spread files over N shard_XX subdirectories')
+    parser.add_argument('--workers', type=int, default=4, help='parallel file writers')
+    parser.add_argument('--gzip', action='store_true', help='write .sql.gz files')
+    parser.add_argument('--quiet', action='store_true', help='do not print one line per batch')
+    parser.add_argument('--metrics', help='append per-stage metrics to this JSONL file')
+    parser.add_argument('--profile', choices=PROFILERS, help='profile the batch stage')
+    args = parser.parse_args()
+
+    metrics = PipelineMetrics(args.metrics, profile=args.profile)
+    records = metrics.iter_stage('parse', iter_trades(args.source, bare_values=args.bare_values))
+    metrics.get('parse').bytes_read = os.path.getsize(args.source)
+    upstream = metrics.get('parse')
+    if args.ids_file:
+        wanted = read_id_filter(args.ids_file)
+        print(f'🔎 Keeping {len(wanted)} trade IDs from {args.ids_file}')
+        records = metrics.iter_stage('filter', (r for r in records if r.id in wanted), upstream)
+        upstream = metrics.get('filter')
+    deduper = None
+    if not args.no_dedup:
+        records, deduper = dedupe_trades(records, args.dedup)
+        records = metrics.iter_stage('dedup', records, upstream)
+        upstream = metrics.get('dedup')
+    if args.limit:
+        records = islice(records, args.limit)
+
+    limit = f'{args.rows} trades' if args.rows else f'{args.max_bytes:,} bytes'
+    print(f'🚀 Batching {args.source} into {args.output_dir} (up to {limit} per batch)')
+
+    def progress(batch_num, path, batch, written, error):
+        if error is not None:
+            print(f'   ❌ {path}: {error}')
+        elif not args.quiet:
+            print(f'   ✅ {path}: {len(batch)} trades, {written:,} bytes ({batch[0].id} to {batch[-1].id})')
+
+    with metrics.stage('batch', upstream) as batch_stage:
+        stats = write_batches(records, args.output_dir, args.prefix, max_rows=args.rows, max_bytes=args.max_bytes,
+                              shards=args.shards, workers=args.workers, compress=args.gzip, on_batch=progress)
+        batch_stage.rows_out = stats['rows']
+        batch_stage.bytes_written = stats['bytes_written']
+
+    if deduper is not None:
+        report = deduper.report()
+        report_path = os.path.join(args.output_dir, f'{args.prefix}_dedup_report.json')
+        deduper.write_report(report_path)
+        print(f'\n🧹 Dedup ({args.dedup}): {report["exact_duplicate_count"]} duplicate IDs dropped, '
+              f'{report["near_duplicate_count"]} near-duplicates kept for review ({report_path})')
+
+    print(f'\n📊 Final Statistics:')
+    print(f'  Total trades: {stats["rows"]}')
+    print(f'  Total batches: {stats["batches"]}')
+    print(f'  Largest batch: {stats["largest_batch_bytes"]:,} bytes')
+    print(f'  Bytes written: {stats["bytes_written"]:,}' + (f' (from {stats["bytes_sql"]:,} SQL)' if args.gzip else ''))
+    print(f'  Time: {stats["seconds"]:.2f}s')
+    metrics.print_summary()
+    if stats['failed_batches']:
+        print(f'\n⚠️  {stats["failed_batches"]} batch files could not be written')
+        sys.exit(1)
+    print(f'\n✅ Created {stats["batches"]} batch files in {args.output_dir}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the Python ETL toolchain on synthetic dumps.
+
+For each size (10k, 100k, 1M trades by default) it generates, once per seed:
+
+    all_trades.sql   multi-row INSERTs, about 1% repeated IDs
+    Trade.csv        a Neon-style export (every value quoted, NULL as an empty
+                     field) missing some dump rows, with a few changed and extra rows
+    neonIssuer.csv   the matching issuer export
+
+The raw JSON is realistic and hostile: issuer names with commas, apostrophes,
+double quotes and parentheses. Each stage then runs in a fresh process, so its
+peak RSS is its own:
+
+    parse        iter_trades over all_trades.sql
+    dedup        TradeDeduper (keep-first) over the parsed stream
+    reconcile    reconcile_trades.reconcile(Trade.csv, all_trades.sql)
+    batch-write  batch_trades.write_batches, 1000-row files
+    load         pg_loader.load_trades into a scratch schema (only with --dsn)
+    form4        sec_form4 parse + derive_columns over a synthetic Form 4 corpus
+                 (one XML per filing, n of them up to FORM4_MAX_FILINGS; no database);
+                 rows are filings, and fewer than FORM4_MIN_RATE filings/sec fails
+                 the run
+
+The load stage creates its own schema (insider_bench) with an empty copy of
+"Trade" and drops it afterwards; nothing in public is touched.
+
+Results (seconds, rows/sec, peak RSS) are printed as a table and written as
+JSON. With --baseline, a stage whose rows/sec drops, or whose peak RSS grows, by
+more than --threshold (default 20%) against the baseline fails the run.
+
+Usage:
+    python scripts/benchmark_etl.py [--sizes 10k,100k,1m] [--stages parse,dedup,...] [--dsn postgresql://...]
+                                    [--baseline benchmarks/baseline.json] [--threshold 0.2]
+                                    [--save-baseline benchmarks/baseline.json] [--output benchmarks/results.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+from trade_sql import TRADE_COLUMNS, format_insert
+
+STAGES = ('parse', 'dedup', 'reconcile', 'batch-write', 'load', 'form4')
+DEFAULT_SIZES = '10k,100k,1m'
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_DATA_DIR = 'benchmarks/data'
+BENCH_SCHEMA = 'insider_bench'
+# How often run_stage checks that a stage's child process is still alive
+POLL_SECONDS = 5
+
+INSERT_ROWS = 1000
+DUPLICATE_RATE = 0.01
+MISSING_RATE = 0.01
+CHANGED_RATE = 0.005
+EXTRA_RATE = 0.002
+CREATED_AT = '2025-09-24T18:16:17.764Z'
+
+_NAME_STEMS = ('Apple', 'Alphabet', 'Berkshire Hathaway', 'Johnson & Johnson', "McDonald's", "Moody's",
+               'Procter & Gamble', 'AT&T', 'Coca-Cola', "Lowe's Companies", 'T. Rowe Price', 'NVIDIA')
+_NAME_TAILS = ('Inc', 'Corp', 'Co., Ltd.', 'Holdings, Inc. (Class A)', 'PLC (ADR)', 'Trust "Series B"',
+               "Fund, L.P. (O'Neil)", 'Group (The)', 'Inc., 5.25% Notes (2031)')
+_SIZE_BANDS = ((1000, 15000, '1K–15K'), (15001, 50000, '15K–50K'), (50001, 100000, '50K–100K'),
+               (100001, 250000, '100K–250K'), (250001, 500000, '250K–500K'), (1000001, 5000000, '1M–5M'))
+_OWNERS = ('Self', 'Spouse', 'Joint', 'Child', 'Undisclosed')
+
+FORM4_DIR = 'form4'
+FORM4_MAX_FILINGS = 20_000
+FORM4_MIN_RATE = 1000
+# Transaction codes by frequency; A (award) and G (gift) carry a $0 price
+_FORM4_CODES = 'PPSSSSAMFGM'
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1m' -> 1000000"""
+    text = text.strip().lower()
+    factor = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * factor)
+
+
+def size_label(n):
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f'{n // 1_000_000}m'
+    if n >= 1_000 and n % 1_000 == 0:
+        return f'{n // 1_000}k'
+    return str(n)
+
+
+def _csv_field(value):
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _csv_line(values):
+    return ','.join(_csv_field(v) for v in values) + '\n'
+
+
+def _csv_timestamp(iso, millis=False):
+    # 2025-08-14T16:00:00.000Z -> 2025-08-14 16:00:00 (how the Neon export writes it)
+    return iso[:23 if millis else 19].replace('T', ' ')
+
+
+def _csv_number(value):
+    # NUMERIC(65,30) columns come out of the export as 1000.000000000000000000000000000000
+    return None if value is None else f'{Decimal(repr(value)):.30f}'
+
+
+def _export_row(values):
+    """A trade as the Neon CSV export writes it: jsonb re-spaced, numerics at full scale"""
+    row = dict(values)
+    row['traded_at'] = _csv_timestamp(row['traded_at'])
+    row['published_at'] = _csv_timestamp(row['published_at'])
+    row['created_at'] = _csv_timestamp(row['created_at'], millis=True)
+    for column in ('size_min', 'size_max', 'price'):
+        row[column] = _csv_number(row[column])
+    row['raw'] = json.dumps(json.loads(row['raw']), ensure_ascii=False)
+    return row
+
+
+class SyntheticData:
+    """Deterministic synthetic politicians, issuers and trades for one seed"""
+
+    def __init__(self, n_trades, seed=0):
+        self.n_trades = n_trades
+        self.rng = random.Random(seed)
+        rng = self.rng
+        self.politicians = [(f'{chr(65 + i % 26)}{i:06d}', f'Member {i} {rng.choice("ABCDEFGH")}. O\'Test')
+                            for i in range(220)]
+        n_issuers = max(500, n_trades // 10)
+        self.issuers = []
+        for i in range(n_issuers):
+            name = f'{rng.choice(_NAME_STEMS)} {i}, {rng.choice(_NAME_TAILS)}'
+            ticker = f'T{i:05d}' if rng.random() < 0.7 else None
+            self.issuers.append((str(400000 + i), ticker, name, rng.choice(('Financials', 'N/A', 'Energy')), None,
+                                 '2025-09-26 10:21:52.968'))
+
+    def trade(self, n):
+        rng = self.rng
+        politician_id, politician_name = rng.choice(self.politicians)
+        issuer_id, ticker, issuer_name = rng.choice(self.issuers)[:3]
+        low, high, band = rng.choice(_SIZE_BANDS)
+        day = rng.randint(0, 1000)
+        traded_at = time.strftime('%Y-%m-%dT16:00:00.000Z', time.gmtime(1672531200 + day * 86400))
+        published_at = time.strftime('%Y-%m-%dT16:00:00.000Z', time.gmtime(1672531200 + (day + 30) * 86400))
+        raw = json.dumps({'ticker': ticker, 'sizeText': band, 'issuerName': issuer_name,
+                          'politicianName': politician_name, 'politicianChamber': None,
+                          'comment': 'Filed (late), amended; see "Part II"'}, ensure_ascii=False, separators=(',', ':'))
+        trade_id = str(20000000000 + n)
+        return (trade_id, politician_id, issuer_id, traded_at, rng.choice(('buy', 'sell')), low, high,
+                published_at, 30, rng.choice(_OWNERS),
+                round(rng.uniform(1, 900), 2) if rng.random() < 0.8 else None,
+                f'https://www.capitoltrades.com/trades/{trade_id}', raw, CREATED_AT)
+
+    def write(self, directory):
+        """Write all_trades.sql, Trade.csv and neonIssuer.csv into directory"""
+        os.makedirs(directory, exist_ok=True)
+        rng = self.rng
+        csv_columns = ('id', 'politician_id', 'issuer_id', 'published_at', 'traded_at', 'filed_after_days',
+                       'owner', 'type', 'size_min', 'size_max', 'price', 'source_url', 'raw', 'created_at')
+        recent = []
+        with open(os.path.join(directory, 'all_trades.sql'), 'w', encoding='utf-8') as sql, \
+                open(os.path.join(directory, 'Trade.csv'), 'w', encoding='utf-8') as csv_file:
+            csv_file.write(','.join(csv_columns) + '\n')
+            block = []
+            for n in range(self.n_trades):
+                if recent and rng.random() < DUPLICATE_RATE:
+                    row = rng.choice(recent)
+                else:
+                    row = self.trade(n)
+                    recent = (recent + [row])[-1000:]
+                    values = dict(zip(TRADE_COLUMNS, row))
+                    if rng.random() >= MISSING_RATE:
+                        if rng.random() < CHANGED_RATE:
+                            values['price'] = round(rng.uniform(1, 900), 2)
+                        exported = _export_row(values)
+                        csv_file.write(_csv_line(exported[c] for c in csv_columns))
+                    if rng.random() < EXTRA_RATE:
+                        extra = _export_row(dict(zip(TRADE_COLUMNS, self.trade(n))))
+                        extra['id'] = f'9{extra["id"]}'
+                        csv_file.write(_csv_line(extra[c] for c in csv_columns))
+                block.append(row)
+                if len(block) >= INSERT_ROWS:
+                    sql.write(format_insert('Trade', TRADE_COLUMNS, block) + '\n\n')
+                    block = []
+            if block:
+                sql.write(format_insert('Trade', TRADE_COLUMNS, block) + '\n')
+
+        with open(os.path.join(directory, 'neonIssuer.csv'), 'w', encoding='utf-8') as f:
+            f.write('"id","ticker","name","sector","country","created_at"\n')
+            for issuer in self.issuers:
+                f.write(_csv_line(issuer))
+
+
+def _form4_transaction(rng):
+    code = rng.choice(_FORM4_CODES)
+    ad = 'A' if code in 'PAMG' else 'D'
+    shares = rng.randint(1, 200_000)
+    price = 0 if code in 'AG' else round(rng.uniform(0.5, 400), 2)
+    after = shares + rng.randint(0, 10 ** 6) if ad == 'A' else rng.choice((0, rng.randint(0, 10 ** 6)))
+    return (
+        '<nonDerivativeTransaction><securityTitle><value>Common Stock</value></securityTitle>'
+        f'<transactionDate><value>2025-05-{rng.randint(1, 28):02d}</value></transactionDate>'
+        f'<transactionCoding><transactionFormType>4</transactionFormType><transactionCode>{code}</transactionCode>'
+        '<equitySwapInvolved>0</equitySwapInvolved></transactionCoding>'
+        f'<transactionAmounts><transactionShares><value>{shares}</value></transactionShares>'
+        f'<transactionPricePerShare><value>{price}</value></transactionPricePerShare>'
+        f'<transactionAcquiredDisposedCode><value>{ad}</value></transactionAcquiredDisposedCode></transactionAmounts>'
+        '<postTransactionAmounts><sharesOwnedFollowingTransaction>'
+        f'<value>{after}</value></sharesOwnedFollowingTransaction></postTransactionAmounts>'
+        '<ownershipNature><directOrIndirectOwnership>'
+        f'<value>{rng.choice("DDI")}</value></directOrIndirectOwnership></ownershipNature>'
+        '</nonDerivativeTransaction>'
+    )
+
+
+_FORM4_DERIVATIVE = (
+    '<derivativeTable><derivativeTransaction><securityTitle><value>Stock Option</value></securityTitle>'
+    '<conversionOrExercisePrice><value>12.5</value></conversionOrExercisePrice>'
+    '<transactionDate><value>2025-05-02</value></transactionDate>'
+    '<transactionCoding><transactionFormType>4</transactionFormType><transactionCode>M</transactionCode>'
+    '<equitySwapInvolved>0</equitySwapInvolved></transactionCoding>'
+    '<transactionAmounts><transactionShares><value>5000</value></transactionShares>'
+    '<transactionPricePerShare><value>0</value></transactionPricePerShare>'
+    '<transactionAcquiredDisposedCode><value>D</value></transactionAcquiredDisposedCode></transactionAmounts>'
+    '<expirationDate><value>2030-01-01</value></expirationDate>'
+    '<underlyingSecurity><underlyingSecurityTitle><value>Common Stock</value></underlyingSecurityTitle>'
+    '<underlyingSecurityShares><value>5000</value></underlyingSecurityShares></underlyingSecurity>'
+    '<postTransactionAmounts><sharesOwnedFollowingTransaction><value>20000</value>'
+    '</sharesOwnedFollowingTransaction></postTransactionAmounts>'
+    '<ownershipNature><directOrIndirectOwnership><value>D</value></directOrIndirectOwnership></ownershipNature>'
+    '</derivativeTransaction></derivativeTable>'
+)
+
+
+def write_form4_corpus(directory, n_filings, seed):
+    """Deterministic Form 4 ownershipDocument files named by accession number"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for n in range(n_filings):
+        issuer_cik = 320000 + n % 3000
+        owner = n % 5000
+        transactions = ''.join(_form4_transaction(rng) for _ in range(rng.choice((1, 1, 2, 3, 5))))
+        derivative = _FORM4_DERIVATIVE if rng.random() < 0.3 else ''
+        with open(os.path.join(directory, f'{1200000 + owner:010d}-25-{n:06d}.xml'), 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0"?>\n<ownershipDocument><schemaVersion>X0508</schemaVersion>'
+                '<documentType>4</documentType><periodOfReport>2025-05-02</periodOfReport>'
+                f'<issuer><issuerCik>{issuer_cik:010d}</issuerCik>'
+                f'<issuerName>{rng.choice(_NAME_STEMS).replace("&", "&amp;")} {issuer_cik} Inc.</issuerName>'
+                f'<issuerTradingSymbol>T{issuer_cik}</issuerTradingSymbol></issuer>'
+                f'<reportingOwner><reportingOwnerId><rptOwnerCik>{1200000 + owner:010d}</rptOwnerCik>'
+                f'<rptOwnerName>Owner {owner}</rptOwnerName></reportingOwnerId>'
+                f'<reportingOwnerRelationship><isDirector>{rng.choice("01")}</isDirector><isOfficer>1</isOfficer>'
+                '<isTenPercentOwner>0</isTenPercentOwner><isOther>0</isOther>'
+                '<officerTitle>Chief Financial Officer</officerTitle></reportingOwnerRelationship></reportingOwner>'
+                f'<nonDerivativeTable>{transactions}</nonDerivativeTable>{derivative}'
+                '<footnotes><footnote id="F1">Weighted average price.</footnote></footnotes>'
+                '<ownerSignature><signatureName>/s/ Attorney-in-fact</signatureName>'
+                '<signatureDate>2025-05-04</signatureDate></ownerSignature></ownershipDocument>\n'
+            )
+
+
+def ensure_form4_corpus(directory, n_trades, seed):
+    """Form 4 corpus inside a dataset directory, generated if missing"""
+    form4_dir = os.path.join(directory, FORM4_DIR)
+    marker = os.path.join(form4_dir, '.complete')
+    if not os.path.exists(marker):
+        n_filings = min(n_trades, FORM4_MAX_FILINGS)
+        print(f'🧪 Generating {n_filings:,} synthetic Form 4 filings in {form4_dir}...')
+        write_form4_corpus(form4_dir, n_filings, seed)
+        open(marker, 'w').close()
+    return form4_dir
+
+
+def ensure_dataset(data_dir, n_trades, seed):
+    """Directory holding the synthetic files for this size and seed, generated if missing"""
+    directory = os.path.join(data_dir, f'{size_label(n_trades)}_seed{seed}')
+    marker = os.path.join(directory, '.complete')
+    if not os.path.exists(marker):
+        print(f'🧪 Generating {n_trades:,} synthetic trades in {directory}...')
+        started = time.perf_counter()
+        SyntheticData(n_trades, seed).write(directory)
+        open(marker, 'w').close()
+        print(f'   done in {time.perf_counter() - started:.1f}s')
+    return directory
+
+
+def _bench_dsn(dsn):
+    from psycopg2.extensions import make_dsn
+    return make_dsn(dsn, options=f'-c search_path={BENCH_SCHEMA}')
+
+
+def _run_stage(stage, directory, dsn):
+    """Run one stage in this process and return the number of rows it handled"""
+    from trade_record import iter_trades
+    dump = os.path.join(directory, 'all_trades.sql')
+
+    if stage == 'parse':
+        return sum(1 for _ in iter_trades(dump))
+
+    if stage == 'dedup':
+        from trade_dedup import dedupe_trades
+        survivors, deduper = dedupe_trades(iter_trades(dump))
+        for _ in survivors:
+            pass
+        return deduper.rows_in
+
+    if stage == 'reconcile':
+        from reconcile_trades import reconcile
+        out_dir = tempfile.mkdtemp(prefix='bench_reconcile_')
+        try:
+            summary = reconcile(os.path.join(directory, 'Trade.csv'), dump, out_dir=out_dir)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        return summary['dump_trades'] + summary['export_trades']
+
+    if stage == 'batch-write':
+        from batch_trades import write_batches
+        out_dir = tempfile.mkdtemp(prefix='bench_batches_')
+        try:
+            stats = write_batches(iter_trades(dump), out_dir, 'bench', max_rows=1000)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        return stats['rows']
+
+    if stage == 'load':
+        from pg_loader import load_trades
+        stats = load_trades(iter_trades(dump), _bench_dsn(dsn))
+        if stats['failed_batches']:
+            raise RuntimeError(f'{stats["failed_batches"]} batches failed')
+        return stats['rows_sent']
+
+    if stage == 'form4':
+        from sec_form4 import derive_columns, iter_filings
+        filings = 0
+        for filing in iter_filings(os.path.join(directory, FORM4_DIR)):
+            derive_columns(filing['trades'])
+            filings += 1
+        return filings
+
+    raise ValueError(f'Unknown stage {stage!r}')
+
+
+def _stage_worker(stage, directory, dsn, queue):
+    try:
+        started = time.perf_counter()
+        rows = _run_stage(stage, directory, dsn)
+        seconds = time.perf_counter() - started
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+        queue.put({'rows': rows, 'seconds': seconds,
+                   'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20})
+    except Exception as e:
+        queue.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def run_stage(stage, directory, dsn=None):
+    """Run a stage in a fresh process so its peak RSS is measured on its own.
+
+    A child that dies without reporting (killed, out of memory, crashed in C)
+    fails the stage instead of leaving the benchmark waiting forever.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_stage_worker, args=(stage, directory, dsn, queue))
+    process.start()
+    while True:
+        try:
+            result = queue.get(timeout=POLL_SECONDS)
+            break
+        except queue_module.Empty:
+            if process.is_alive():
+                continue
+            # The result may have been queued just before the process exited
+            try:
+                result = queue.get(timeout=1)
+                break
+            except queue_module.Empty:
+                process.join()
+                return {'error': f'stage process exited with code {process.exitcode} without a result'}
+    process.join()
+    if 'error' not in result:
+        result['rows_per_sec'] = result['rows'] / result['seconds'] if result['seconds'] else None
+    return result
+
+
+def prepare_load_schema(dsn):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        cur.execute(f'CREATE SCHEMA {BENCH_SCHEMA}')
+        # LIKE copies columns, defaults and the primary key but not the foreign keys
+        cur.execute(f'CREATE TABLE {BENCH_SCHEMA}."Trade" (LIKE public."Trade" INCLUDING DEFAULTS INCLUDING INDEXES)')
+    conn.close()
+
+
+def drop_load_schema(dsn):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+    conn.close()
+
+
+def compare(results, baseline, threshold):
+    """Regressions against a baseline: rows/sec down or peak RSS up by more than threshold"""
+    regressions = []
+    for key, current in results.items():
+        before = baseline.get(key)
+        if not before or 'error' in current or 'error' in before:
+            continue
+        if before.get('rows_per_sec') and current['rows_per_sec'] < before['rows_per_sec'] * (1 - threshold):
+            regressions.append(f'{key}: {current["rows_per_sec"]:,.0f} rows/sec vs baseline '
+                               f'{before["rows_per_sec"]:,.0f} '
+                               f'({current["rows_per_sec"] / before["rows_per_sec"] - 1:+.0%})')
+        if before.get('peak_rss_mb') and current['peak_rss_mb'] > before['peak_rss_mb'] * (1 + threshold):
+            regressions.append(f'{key}: peak RSS {current["peak_rss_mb"]:,.0f} MB vs baseline '
+                               f'{before["peak_rss_mb"]:,.0f} MB '
+                               f'({current["peak_rss_mb"] / before["peak_rss_mb"] - 1:+.0%})')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ETL scripts on synthetic dumps')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated trade counts, e.g. 10k,100k,1m')
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help='Postgres for the load stage (uses its own scratch schema)')
+    parser.add_argument('--output', default='benchmarks/results.json')
+    parser.add_argument('--baseline', help='fail on regressions against this results file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--save-baseline', help='also write the results here as the new baseline')
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f'unknown stages: {", ".join(sorted(unknown))}')
+    if 'load' in stages and not args.dsn:
+        print('⚠️  No DATABASE_URL/--dsn: skipping the load stage')
+        stages.remove('load')
+
+    results = {}
+    for n in sizes:
+        directory = ensure_dataset(args.data_dir, n, args.seed)
+        for stage in stages:
+            if stage == 'load':
+                prepare_load_schema(args.dsn)
+            if stage == 'form4':
+                ensure_form4_corpus(directory, n, args.seed)
+            try:
+                result = run_stage(stage, directory, args.dsn)
+            finally:
+                if stage == 'load':
+                    drop_load_schema(args.dsn)
+            key = f'{size_label(n)}/{stage}'
+            results[key] = result
+            if 'error' in result:
+                print(f'   ❌ {key}: {result["error"]}')
+            else:
+                print(f'   ⏱️  {key}: {result["seconds"]:.2f}s, {result["rows_per_sec"]:,.0f} rows/sec, '
+                      f'peak RSS {result["peak_rss_mb"]:,.0f} MB')
+
+    print(f'\n{"size/stage":<20} {"rows":>10} {"seconds":>9} {"rows/sec":>12} {"peak RSS MB":>12}')
+    for key, result in results.items():
+        if 'error' in result:
+            print(f'{key:<20} {"error":>10}')
+            continue
+        print(f'{key:<20} {result["rows"]:>10,} {result["seconds"]:>9.2f} {result["rows_per_sec"]:>12,.0f} '
+              f'{result["peak_rss_mb"]:>12,.0f}')
+
+    report = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'seed': args.seed,
+              'python': sys.version.split()[0], 'results': results}
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f'\n📝 Results written to {args.output}')
+
+    failed = any('error' in r for r in results.values())
+    for key, result in results.items():
+        if key.endswith('/form4') and 'error' not in result and result['rows_per_sec'] < FORM4_MIN_RATE:
+            print(f'\n❌ {key}: {result["rows_per_sec"]:,.0f} filings/sec is under {FORM4_MIN_RATE:,}')
+            failed = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n❌ Regressions beyond {args.threshold:.0%}:')
+            for line in regressions:
+                print(f'   {line}')
+            failed = True
+        else:
+            print(f'✅ No regressions beyond {args.threshold:.0%} against {args.baseline}')
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
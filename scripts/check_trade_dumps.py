@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Regression check over the trade dumps kept in web/.
+
+The hand-made test dumps (batch1_test.sql, batch2_test.sql, batch1_part_*.sql)
+fill created_at with NOW() rather than a literal, which is the case the rest of
+the pipeline has to carry through as SqlExpr. Every dump is parsed with
+iter_trades and each record is checked to re-render and re-parse to the same
+values, with NOW() still an SqlExpr and sent to COPY as NULL.
+
+With --dsn, the dumps are also loaded end to end into a scratch schema, once
+through load_trades (COPY + merge) and once through load_changed_trades
+(COPY + upsert), and every stored created_at must have been filled in. The
+scratch schema is dropped afterwards.
+
+Exits non-zero on the first problem in each dump.
+
+Usage:
+    python scripts/check_trade_dumps.py [web/batch1_test.sql ...] [--dsn postgresql://...]
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+
+from pg_loader import load_changed_trades, load_trades, require_psycopg2
+from trade_record import iter_trades
+from trade_sql import TRADE_COLUMNS, SqlExpr, copy_text_row, format_insert, iter_sql_values
+
+DEFAULT_DUMPS = ('web/batch1_test.sql', 'web/batch2_test.sql', 'web/batch1_part_*.sql')
+SCRATCH_SCHEMA = 'check_trade_dumps'
+
+
+def expand_dumps(patterns):
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    return paths
+
+
+def check_dump(path):
+    """(records, problem or None) for one dump"""
+    try:
+        records = list(iter_trades(path))
+    except Exception as e:
+        return [], f'{path}: parse failed: {type(e).__name__}: {e}'
+    if not records:
+        return records, f'{path}: no trades parsed'
+    reparsed = list(iter_sql_values(io.BytesIO(format_insert('Trade', TRADE_COLUMNS, records).encode('utf-8'))))
+    if len(reparsed) != len(records):
+        return records, f'{path}: re-rendered {len(records)} trades, parsed back {len(reparsed)}'
+    for record, values in zip(records, reparsed):
+        for column, want, got in zip(TRADE_COLUMNS, record, values):
+            if isinstance(want, SqlExpr) != isinstance(got, SqlExpr) or str(want) != str(got):
+                return records, f'{path}: trade {record.id} column {column}: wrote {want!r}, read back {got!r}'
+        fields = copy_text_row(record).rstrip('\n').split('\t')
+        for column, value, field in zip(TRADE_COLUMNS, record, fields):
+            if isinstance(value, SqlExpr) and field != '\\N':
+                return records, f'{path}: trade {record.id} column {column}: {value} sent to COPY as {field!r}'
+    return records, None
+
+
+def check_load(dsn, records):
+    """Load records into scratch copies of "Trade" and "TradeContentHash"; return a problem or None"""
+    psycopg2 = require_psycopg2()
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE; CREATE SCHEMA {SCRATCH_SCHEMA}')
+            for table in ('Trade', 'TradeContentHash'):
+                # LIKE leaves out foreign keys, so the dumps load without their politicians and issuers
+                cur.execute(f'CREATE TABLE {SCRATCH_SCHEMA}."{table}" (LIKE "{table}" INCLUDING ALL)')
+        scratch = psycopg2.extensions.make_dsn(dsn, options=f'-csearch_path={SCRATCH_SCHEMA}')
+        expected = len({r.id for r in records})
+        for label, load, key in (('load_trades', load_trades, 'rows_inserted'),
+                                 ('load_changed_trades', load_changed_trades, 'rows_updated')):
+            stats = load(iter(records), scratch)
+            if stats['errors']:
+                return f'{label}: {stats["errors"][0]}'
+            if stats[key] != expected:
+                return f'{label}: expected {expected} {key.replace("_", " ")}, got {stats[key]}'
+        with conn.cursor() as cur:
+            cur.execute(f'SELECT COUNT(*), COUNT("created_at") FROM {SCRATCH_SCHEMA}."Trade"')
+            stored, dated = cur.fetchone()
+        if stored != expected or dated != stored:
+            return f'stored {stored} of {expected} trades, {dated} with created_at'
+        return None
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE')
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regression check over the trade dumps in web/')
+    parser.add_argument('dumps', nargs='*', default=DEFAULT_DUMPS, help='dump files or glob patterns')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help='also load the dumps end to end into a scratch schema')
+    args = parser.parse_args()
+
+    paths = expand_dumps(args.dumps)
+    print(f'🔍 Checking {len(paths)} trade dumps')
+    problems = []
+    loaded = []
+    for path in paths:
+        if not os.path.exists(path):
+            problems.append(f'{path}: not found')
+            continue
+        records, problem = check_dump(path)
+        expressions = sum(1 for r in records for v in r if isinstance(v, SqlExpr))
+        if problem:
+            problems.append(problem)
+        else:
+            print(f'   ✅ {path}: {len(records)} trades, {expressions} SQL expressions')
+            loaded.extend(records)
+
+    if args.dsn and loaded:
+        problem = check_load(args.dsn, loaded)
+        if problem:
+            problems.append(f'load: {problem}')
+        else:
+            print(f'   ✅ Loaded {len({r.id for r in loaded})} trades through COPY and upsert')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        sys.exit(1)
+    print(f'✅ All {len(paths)} dumps parsed and round-tripped{" and loaded" if args.dsn else ""}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,125 +1,102 @@
 #!/usr/bin/env python3
+"""
+Cross-check the Neon Issuer export against the local issuers.json.
+
+Issuers are matched by ID first and then by fuzzy name (scripts/issuer_match.py),
+so "Berkshire Hathaway Inc" vs "BERKSHIRE HATHAWAY INC-CL B" is reported as a
+name variant rather than a mismatch, and an issuer that moved to a new ID shows
+up as ID drift with a confidence score instead of as one missing and one extra row.
+
+Usage:
+    python scripts/cross_check_issuers.py [web/neonIssuer.csv] [web/issuers.json] [--min-score 0.6]
+"""
+import argparse
 import csv
 import json
-import sys
+import time
+
+from issuer_match import DEFAULT_MIN_SCORE, IssuerTable, cross_check
 
 def load_neon_issuers(csv_file):
     """Load issuers from Neon CSV export"""
-    neon_issuers = {}
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            neon_issuers[row['id']] = {
-                'name': row['name'],
-                'ticker': row['ticker'] if row['ticker'] != 'None' else None,
-                'sector': row['sector'],
-                'country': row['country']
-            }
-    return neon_issuers
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        return IssuerTable.from_rows(csv.DictReader(f))
 
 def load_local_issuers(json_file):
     """Load issuers from local JSON file"""
     with open(json_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
-        # Convert list to dictionary if needed
-        if isinstance(data, list):
-            return {issuer['id']: issuer for issuer in data}
-        return data
+    # Convert dictionary to list if needed
+    if isinstance(data, dict):
+        data = [{'id': issuer_id, **issuer} for issuer_id, issuer in data.items()]
+    return IssuerTable.from_rows(data)
 
-def cross_check_issuers(neon_issuers, local_issuers):
-    """Cross-check Neon vs Local issuer data"""
-    print(f"Neon issuers: {len(neon_issuers)}")
-    print(f"Local issuers: {len(local_issuers)}")
-    
-    # Find issuers in local data but not in Neon
-    missing_in_neon = []
-    for issuer_id, issuer_data in local_issuers.items():
-        if issuer_id not in neon_issuers:
-            missing_in_neon.append({
-                'id': issuer_id,
-                'name': issuer_data.get('name', ''),
-                'ticker': issuer_data.get('ticker', '')
-            })
-    
-    # Find issuers in Neon but not in local data
-    missing_in_local = []
-    for issuer_id, issuer_data in neon_issuers.items():
-        if issuer_id not in local_issuers:
-            missing_in_local.append({
-                'id': issuer_id,
-                'name': issuer_data.get('name', ''),
-                'ticker': issuer_data.get('ticker', '')
-            })
-    
-    # Find common issuers with different data
-    different_data = []
-    for issuer_id in set(neon_issuers.keys()) & set(local_issuers.keys()):
-        neon_issuer = neon_issuers[issuer_id]
-        local_issuer = local_issuers[issuer_id]
-        
-        if (neon_issuer['name'] != local_issuer.get('name', '') or 
-            neon_issuer['ticker'] != local_issuer.get('ticker', '')):
-            different_data.append({
-                'id': issuer_id,
-                'neon_name': neon_issuer['name'],
-                'local_name': local_issuer.get('name', ''),
-                'neon_ticker': neon_issuer['ticker'],
-                'local_ticker': local_issuer.get('ticker', '')
-            })
-    
-    return missing_in_neon, missing_in_local, different_data
+def show(title, entries, describe, limit=10):
+    if not entries:
+        return
+    print(f"\n=== {title} ({len(entries)}) ===")
+    for entry in entries[:limit]:
+        print(describe(entry))
+    if len(entries) > limit:
+        print(f"... and {len(entries) - limit} more")
 
 def main():
-    neon_file = 'web/neonIssuer.csv'
-    local_file = 'web/issuers.json'
-    
+    parser = argparse.ArgumentParser(description='Cross-check Neon issuers against issuers.json')
+    parser.add_argument('neon', nargs='?', default='web/neonIssuer.csv')
+    parser.add_argument('local', nargs='?', default='web/issuers.json')
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE,
+                        help='minimum confidence for a fuzzy name match')
+    parser.add_argument('--output', default='web/cross_check_results.json')
+    args = parser.parse_args()
+
     print("Loading Neon issuer data...")
-    neon_issuers = load_neon_issuers(neon_file)
-    
+    neon_issuers = load_neon_issuers(args.neon)
+
     print("Loading local issuer data...")
-    local_issuers = load_local_issuers(local_file)
-    
+    local_issuers = load_local_issuers(args.local)
+
+    print(f"Neon issuers: {len(neon_issuers)}")
+    print(f"Local issuers: {len(local_issuers)}")
+
     print("Cross-checking data...")
-    missing_in_neon, missing_in_local, different_data = cross_check_issuers(neon_issuers, local_issuers)
-    
-    print(f"\n=== CROSS-CHECK RESULTS ===")
+    started = time.perf_counter()
+    result = cross_check(local_issuers, neon_issuers, min_score=args.min_score)
+    elapsed = time.perf_counter() - started
+
+    missing_in_neon = result['missing_in_remote']
+    missing_in_local = result['missing_in_local']
+
+    print(f"\n=== CROSS-CHECK RESULTS ({elapsed:.2f}s) ===")
+    print(f"Same: {len(result['same'])}")
+    print(f"Name variants: {len(result['name_variants'])}")
+    print(f"Different data: {len(result['different_data'])}")
+    print(f"ID drift: {len(result['id_drift'])}")
     print(f"Missing in Neon: {len(missing_in_neon)}")
     print(f"Missing in Local: {len(missing_in_local)}")
-    print(f"Different data: {len(different_data)}")
-    
-    if missing_in_neon:
-        print(f"\n=== ISSUERS MISSING IN NEON ({len(missing_in_neon)}) ===")
-        for issuer in missing_in_neon[:10]:  # Show first 10
-            print(f"ID: {issuer['id']}, Name: {issuer['name']}, Ticker: {issuer['ticker']}")
-        if len(missing_in_neon) > 10:
-            print(f"... and {len(missing_in_neon) - 10} more")
-    
-    if missing_in_local:
-        print(f"\n=== ISSUERS MISSING IN LOCAL ({len(missing_in_local)}) ===")
-        for issuer in missing_in_local[:10]:  # Show first 10
-            print(f"ID: {issuer['id']}, Name: {issuer['name']}, Ticker: {issuer['ticker']}")
-        if len(missing_in_local) > 10:
-            print(f"... and {len(missing_in_local) - 10} more")
-    
-    if different_data:
-        print(f"\n=== ISSUERS WITH DIFFERENT DATA ({len(different_data)}) ===")
-        for issuer in different_data[:10]:  # Show first 10
-            print(f"ID: {issuer['id']}")
-            print(f"  Neon: {issuer['neon_name']} ({issuer['neon_ticker']})")
-            print(f"  Local: {issuer['local_name']} ({issuer['local_ticker']})")
-            print()
-        if len(different_data) > 10:
-            print(f"... and {len(different_data) - 10} more")
-    
+
+    show("ISSUERS MISSING IN NEON", missing_in_neon,
+         lambda i: f"ID: {i['id']}, Name: {i['name']}, Ticker: {i['ticker']}")
+    show("ISSUERS MISSING IN LOCAL", missing_in_local,
+         lambda i: f"ID: {i['id']}, Name: {i['name']}, Ticker: {i['ticker']}")
+    show("POSSIBLE ID DRIFT", result['id_drift'],
+         lambda d: f"Local {d['local_id']} -> Neon {d['remote_id']} ({d['confidence']:.2f}): "
+                   f"{d['local_name']} / {d['remote_name']}")
+    show("ISSUERS WITH DIFFERENT DATA", result['different_data'],
+         lambda d: f"ID: {d['id']} ({d['confidence']:.2f})\n"
+                   f"  Neon: {d['remote_name']} ({d['remote_ticker']})\n"
+                   f"  Local: {d['local_name']} ({d['local_ticker']})\n")
+
     # Save detailed results
-    with open('web/cross_check_results.json', 'w') as f:
+    with open(args.output, 'w') as f:
         json.dump({
             'missing_in_neon': missing_in_neon,
             'missing_in_local': missing_in_local,
-            'different_data': different_data
+            'different_data': result['different_data'],
+            'name_variants': result['name_variants'],
+            'id_drift': result['id_drift'],
         }, f, indent=2)
-    
-    print(f"\nDetailed results saved to web/cross_check_results.json")
+
+    print(f"\nDetailed results saved to {args.output}")
 
 if __name__ == '__main__':
     main()
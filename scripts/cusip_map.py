@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Cached CUSIP -> Issuer.ticker lookup for the SEC filing loaders.
+
+13F information tables identify securities by CUSIP and issuer name only, but
+Holdings13F.symbol references Issuer.ticker. Mappings live in a `cusips` table
+next to the issuer ticker cache (ticker_cache.sqlite), seeded from CSV files
+(cusip,ticker[,name], e.g. an OpenFIGI export). A CUSIP with no mapping is
+matched once by issuer name against the Issuer table (issuer_match.py), and that
+answer is cached too, negative ones with a shorter TTL, so a quarter with
+thousands of filings costs one SQLite read plus the handful of new CUSIPs.
+
+Usage:
+    python scripts/cusip_map.py import cusips.csv [more.csv ...]
+    python scripts/cusip_map.py stats
+    python scripts/cusip_map.py export cusip_map.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from issuer_match import IssuerIndex, IssuerTable
+from trade_sql import iter_sql_values
+
+DEFAULT_CACHE = 'ticker_cache.sqlite'
+DEFAULT_TTL_DAYS = 90
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+DEFAULT_MIN_SCORE = 0.92
+NAME_MATCH_SOURCE = 'name-match'
+DAY = 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cusips (
+    cusip      TEXT PRIMARY KEY,
+    name       TEXT,
+    ticker     TEXT,
+    source     TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_UPSERT = """INSERT INTO cusips (cusip, name, ticker, source, fetched_at)
+              VALUES (?, ?, ?, ?, ?)
+              ON CONFLICT (cusip) DO UPDATE SET
+                  name = excluded.name, ticker = excluded.ticker, source = excluded.source,
+                  fetched_at = excluded.fetched_at
+              WHERE excluded.fetched_at >= cusips.fetched_at"""
+
+
+def normalize_cusip(cusip):
+    return (cusip or '').strip().upper() or None
+
+
+class CusipCache:
+    """SQLite-backed CUSIP -> ticker cache with TTL and negative caching"""
+
+    def __init__(self, path=DEFAULT_CACHE, ttl_days=DEFAULT_TTL_DAYS, negative_ttl_days=DEFAULT_NEGATIVE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * DAY
+        self.negative_ttl = negative_ttl_days * DAY
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _is_fresh(self, ticker, fetched_at, now):
+        return now - fetched_at < (self.ttl if ticker else self.negative_ttl)
+
+    def snapshot(self, now=None):
+        """{cusip: ticker or None} for every fresh entry, read in one query"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._db.execute('SELECT cusip, ticker, fetched_at FROM cusips').fetchall()
+        return {cusip: ticker for cusip, ticker, fetched_at in rows if self._is_fresh(ticker, fetched_at, now)}
+
+    def put_many(self, entries, source=None, fetched_at=None):
+        """Record (cusip, name, ticker) entries in one transaction"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._db.executemany(_UPSERT, ((normalize_cusip(cusip), name, ticker or None, source, fetched_at)
+                                           for cusip, name, ticker in entries if normalize_cusip(cusip)))
+            self._db.commit()
+
+    def import_csv(self, path):
+        """Load a cusip,ticker[,name] CSV; newer entries already cached are kept"""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [(r.get('cusip'), r.get('name'), r.get('ticker')) for r in csv.DictReader(f)]
+        self.put_many(rows, source=os.path.basename(path), fetched_at=os.path.getmtime(path))
+        return len(rows)
+
+    def entries(self):
+        with self._lock:
+            rows = self._db.execute('SELECT cusip, name, ticker, source, fetched_at FROM cusips ORDER BY cusip').fetchall()
+        return [{'cusip': r[0], 'name': r[1], 'ticker': r[2], 'source': r[3], 'fetched_at': r[4]} for r in rows]
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        counts = {'entries': 0, 'with_ticker': 0, 'without_ticker': 0, 'name_matched': 0, 'stale': 0}
+        for entry in self.entries():
+            counts['entries'] += 1
+            counts['with_ticker' if entry['ticker'] else 'without_ticker'] += 1
+            counts['name_matched'] += entry['source'] == NAME_MATCH_SOURCE
+            if not self._is_fresh(entry['ticker'], entry['fetched_at'], now):
+                counts['stale'] += 1
+        return counts
+
+
+def load_issuer_rows(source, dsn=None):
+    """Issuer dicts (id, name, ticker) from issuers.json, an Issuer INSERT dump, or the database ('db')"""
+    if source == 'db':
+        from pg_loader import fetch_rows
+        if not dsn:
+            raise ValueError('A database URL is required to read issuers from the database')
+        return [{'id': str(r[0]), 'name': r[1], 'ticker': r[2]} for r in fetch_rows(dsn, 'Issuer', ('id', 'name', 'ticker'))]
+    if source.endswith('.json'):
+        with open(source, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [{'id': issuer_id, **issuer} for issuer_id, issuer in data.items()]
+        return [{'id': str(i['id']), 'name': i.get('name'), 'ticker': i.get('ticker')} for i in data]
+    # all_issuers.sql lists id, name, ticker first, like MODEL_COLUMNS['Issuer']
+    return [{'id': str(v[0]), 'name': v[1], 'ticker': v[2] if len(v) > 2 else None} for v in iter_sql_values(source)]
+
+
+class CusipMapper:
+    """Maps CUSIPs to tickers that exist in the Issuer table, filling the cache as it goes"""
+
+    def __init__(self, cache, issuers, min_score=DEFAULT_MIN_SCORE):
+        self.cache = cache
+        self.min_score = min_score
+        self.issuers = [i for i in issuers if i.get('ticker')]
+        self.known_tickers = frozenset(i['ticker'] for i in self.issuers)
+        self._ticker_by_id = {i['id']: i['ticker'] for i in self.issuers}
+        self.mapping = cache.snapshot()
+        self._index = None
+
+    def resolve(self, names):
+        """Name-match the CUSIPs in {cusip: issuer name} that have no cached answer; returns how many matched"""
+        todo = {cusip: name for cusip, name in names.items() if cusip not in self.mapping}
+        if not todo:
+            return 0
+        if self._index is None:
+            self._index = IssuerIndex(IssuerTable.from_rows(self.issuers), self.min_score)
+        ids = self._index.table.ids
+        entries = []
+        for cusip, name in todo.items():
+            best = self._index.search(name, limit=1)
+            ticker = self._ticker_by_id[ids[best[0][0]]] if best else None
+            self.mapping[cusip] = ticker
+            entries.append((cusip, name, ticker))
+        self.cache.put_many(entries, source=NAME_MATCH_SOURCE)
+        return sum(1 for _, _, ticker in entries if ticker)
+
+    def ticker(self, cusip):
+        """The Issuer ticker for a CUSIP, or None when unmapped or not a known Issuer"""
+        ticker = self.mapping.get(cusip)
+        return ticker if ticker in self.known_tickers else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cached CUSIP -> ticker mappings')
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help='load cusip,ticker[,name] CSV files')
+    p_import.add_argument('files', nargs='+')
+    sub.add_parser('stats', help='show cache counts')
+    p_export = sub.add_parser('export', help='write every cached mapping as CSV')
+    p_export.add_argument('output')
+    args = parser.parse_args()
+
+    with CusipCache(args.cache) as cache:
+        if args.command == 'import':
+            total = sum(cache.import_csv(path) for path in args.files)
+            print(f'📥 Imported {total} CUSIP mappings from {len(args.files)} files into {args.cache}')
+        elif args.command == 'stats':
+            stats = cache.stats()
+            print(f'📒 CUSIP cache: {args.cache}')
+            print(f'   Entries: {stats["entries"]} ({stats["name_matched"]} matched by name)')
+            print(f'   With ticker: {stats["with_ticker"]}')
+            print(f'   Without ticker: {stats["without_ticker"]}')
+            print(f'   Stale (past TTL): {stats["stale"]}')
+        elif args.command == 'export':
+            entries = cache.entries()
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(('cusip', 'ticker', 'name', 'source'))
+                for e in entries:
+                    writer.writerow((e['cusip'], e['ticker'] or '', e['name'] or '', e['source'] or ''))
+            print(f'📤 Exported {len(entries)} mappings to {args.output}')
+
+if __name__ == '__main__':
+    main()
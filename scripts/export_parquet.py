@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Export the trade, issuer and politician datasets as Parquet or Arrow IPC files.
+
+Trades are streamed from all_trades.sql (or a Trade.csv export), typed (UTC
+millisecond timestamps, Decimal sizes and prices, integer filing delays) and
+written partitioned by traded_at year and month in Hive layout:
+
+    exports/trades/year=2024/month=03/part-00000.parquet
+    exports/issuers.parquet
+    exports/politicians.parquet
+
+Each trade also carries its issuer's ticker and name and the politician's name,
+so "all NVDA trades in 2024" reads one year's partitions column-wise:
+
+    import pyarrow.dataset as ds
+    trades = ds.dataset('exports/trades', format='parquet', partitioning='hive')
+    trades.to_table(filter=(ds.field('year') == 2024) & (ds.field('ticker') == 'NVDA'))
+
+Requires pyarrow (pip install pyarrow).
+
+Usage:
+    python scripts/export_parquet.py [web/all_trades.sql | web/Trade.csv] [--issuers web/issuers.json]
+                                     [--politicians web/politicians.json] [--out-dir exports]
+                                     [--format parquet|arrow] [--rows-per-file 100000]
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from reconcile_trades import iter_csv_rows
+from trade_record import iter_trades
+
+DECIMAL_PRECISION = 24
+DECIMAL_SCALE = 6
+DEFAULT_ROWS_PER_FILE = 100_000
+# Flush every partition once this many trades are buffered across all of them
+MAX_BUFFERED_ROWS = 250_000
+
+# Hive's directory name for a NULL partition value (trades without a traded_at)
+HIVE_NULL = '__HIVE_DEFAULT_PARTITION__'
+
+FILE_SUFFIX = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+_QUANTUM = Decimal(1).scaleb(-DECIMAL_SCALE)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('pyarrow is required for Parquet/Arrow exports: pip install pyarrow')
+    return pyarrow
+
+
+def trade_schema(pa):
+    money = pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE)
+    ts = pa.timestamp('ms', tz='UTC')
+    return pa.schema([
+        ('id', pa.string()),
+        ('politician_id', pa.string()),
+        ('politician_name', pa.string()),
+        ('issuer_id', pa.string()),
+        ('issuer_name', pa.string()),
+        ('ticker', pa.string()),
+        ('traded_at', ts),
+        ('published_at', ts),
+        ('type', pa.string()),
+        ('size_min', money),
+        ('size_max', money),
+        ('price', money),
+        ('filed_after_days', pa.int32()),
+        ('owner', pa.string()),
+        ('source_url', pa.string()),
+        ('raw', pa.string()),
+        ('created_at', ts),
+    ])
+
+
+def issuer_schema(pa):
+    return pa.schema([
+        ('id', pa.string()), ('name', pa.string()), ('ticker', pa.string()), ('sector', pa.string()),
+        ('country', pa.string()), ('created_at', pa.timestamp('ms', tz='UTC')),
+    ])
+
+
+def politician_schema(pa):
+    return pa.schema([
+        ('id', pa.string()), ('name', pa.string()), ('party', pa.string()), ('chamber', pa.string()),
+        ('state', pa.string()), ('created_at', pa.timestamp('ms', tz='UTC')),
+    ])
+
+
+def parse_timestamp(value):
+    """Aware UTC datetime from '2025-08-14T16:00:00.000Z' / '2025-08-14 16:00:00'; None if not a timestamp"""
+    if value is None or value == '':
+        return None
+    text = str(value).strip().replace(' ', 'T', 1)
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        # NOW() and other expressions have no value until the database fills them in
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_decimal(value):
+    """Decimal rounded to DECIMAL_SCALE places; floats go through their shortest repr (192.76, not 192.7599...)"""
+    if value is None or value == '':
+        return None
+    try:
+        number = Decimal(repr(value) if isinstance(value, float) else str(value).strip())
+    except InvalidOperation:
+        return None
+    return number.quantize(_QUANTUM) if number.is_finite() else None
+
+
+def parse_int(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(Decimal(str(value)))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _text(value):
+    return None if value is None or value == '' else str(value)
+
+
+def load_lookup(path):
+    """{id: row} from issuers.json / politicians.json (a list, or a dict keyed by ID); {} if absent"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {str(row_id): {'id': row_id, **row} for row_id, row in data.items()}
+    return {str(row['id']): row for row in data}
+
+
+def iter_trade_rows(source):
+    """Trade rows as dicts of raw column values, from an INSERT dump or a CSV export"""
+    if source.endswith('.csv'):
+        for _, row in iter_csv_rows(source):
+            yield row
+    else:
+        for record in iter_trades(source):
+            yield {'id': record.id, 'politician_id': record.politician_id, 'issuer_id': record.issuer_id,
+                   'traded_at': record.traded_at, 'published_at': record.published_at, 'type': record.type,
+                   'size_min': record.size_min, 'size_max': record.size_max, 'price': record.price,
+                   'filed_after_days': record.filed_after_days, 'owner': record.owner,
+                   'source_url': record.source_url, 'raw': record.raw, 'created_at': record.created_at}
+
+
+def typed_trade(row, issuers, politicians):
+    """One trade as typed column values, with issuer and politician names and the ticker joined in"""
+    raw = row.get('raw')
+    try:
+        raw_data = json.loads(raw) if raw else {}
+    except ValueError:
+        raw_data = {}
+    if not isinstance(raw_data, dict):
+        raw_data = {}
+    issuer = issuers.get(str(row.get('issuer_id')), {})
+    politician = politicians.get(str(row.get('politician_id')), {})
+    return {
+        'id': _text(row.get('id')),
+        'politician_id': _text(row.get('politician_id')),
+        'politician_name': _text(politician.get('name') or raw_data.get('politicianName')),
+        'issuer_id': _text(row.get('issuer_id')),
+        'issuer_name': _text(issuer.get('name') or raw_data.get('issuerName')),
+        'ticker': _text(issuer.get('ticker') or raw_data.get('ticker')),
+        'traded_at': parse_timestamp(row.get('traded_at')),
+        'published_at': parse_timestamp(row.get('published_at')),
+        'type': _text(row.get('type')),
+        'size_min': parse_decimal(row.get('size_min')),
+        'size_max': parse_decimal(row.get('size_max')),
+        'price': parse_decimal(row.get('price')),
+        'filed_after_days': parse_int(row.get('filed_after_days')),
+        'owner': _text(row.get('owner')),
+        'source_url': _text(row.get('source_url')),
+        'raw': _text(raw),
+        'created_at': parse_timestamp(row.get('created_at')),
+    }
+
+
+class PartitionedWriter:
+    """Buffers typed rows per (year, month) and writes each buffer as one columnar file"""
+
+    def __init__(self, out_dir, schema, fmt='parquet', rows_per_file=DEFAULT_ROWS_PER_FILE):
+        self.pa = _pyarrow()
+        self.out_dir = out_dir
+        self.schema = schema
+        self.fmt = fmt
+        self.rows_per_file = rows_per_file
+        self.buffers = {}
+        self.buffered = 0
+        self.parts = {}
+        self.files = []
+        self.rows = 0
+
+    def add(self, row):
+        traded_at = row['traded_at']
+        key = (traded_at.year, traded_at.month) if traded_at else (None, None)
+        buffer = self.buffers.setdefault(key, [])
+        buffer.append(row)
+        self.buffered += 1
+        if len(buffer) >= self.rows_per_file:
+            self._flush(key)
+        elif self.buffered >= MAX_BUFFERED_ROWS:
+            for key in list(self.buffers):
+                self._flush(key)
+
+    def _flush(self, key):
+        rows = self.buffers.pop(key, None)
+        if not rows:
+            return
+        year, month = key
+        if year is None:
+            directory = os.path.join(self.out_dir, f'year={HIVE_NULL}', f'month={HIVE_NULL}')
+        else:
+            directory = os.path.join(self.out_dir, f'year={year}', f'month={month:02d}')
+        os.makedirs(directory, exist_ok=True)
+        part = self.parts.get(key, 0)
+        self.parts[key] = part + 1
+        path = os.path.join(directory, f'part-{part:05d}{FILE_SUFFIX[self.fmt]}')
+        write_table(self.pa, self.pa.Table.from_pylist(rows, schema=self.schema), path, self.fmt)
+        self.files.append(path)
+        self.rows += len(rows)
+        self.buffered -= len(rows)
+
+    def close(self):
+        for key in list(self.buffers):
+            self._flush(key)
+
+
+def write_table(pa, table, path, fmt):
+    if fmt == 'parquet':
+        pa.parquet.write_table(table, path, compression='zstd')
+    else:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+
+
+def export_trades(source, out_dir, issuers, politicians, fmt='parquet', rows_per_file=DEFAULT_ROWS_PER_FILE):
+    pa = _pyarrow()
+    trades_dir = os.path.join(out_dir, 'trades')
+    # Part files are numbered per run; clear the old export so none are left behind
+    shutil.rmtree(trades_dir, ignore_errors=True)
+    writer = PartitionedWriter(trades_dir, trade_schema(pa), fmt, rows_per_file)
+    for row in iter_trade_rows(source):
+        writer.add(typed_trade(row, issuers, politicians))
+    writer.close()
+    return writer
+
+
+def export_lookup(rows, path, schema, fmt='parquet'):
+    pa = _pyarrow()
+    typed = [{**{name: _text(row.get(name)) for name in schema.names if name != 'created_at'},
+              'created_at': parse_timestamp(row.get('created_at') or row.get('createdAt'))}
+             for row in rows]
+    write_table(pa, pa.Table.from_pylist(typed, schema=schema), path, fmt)
+    return len(typed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export trades, issuers and politicians as Parquet or Arrow')
+    parser.add_argument('trades', nargs='?', default='web/all_trades.sql', help='all_trades.sql or a Trade.csv export')
+    parser.add_argument('--issuers', default='web/issuers.json')
+    parser.add_argument('--politicians', default='web/politicians.json')
+    parser.add_argument('--out-dir', default='exports')
+    parser.add_argument('--format', choices=sorted(FILE_SUFFIX), default='parquet')
+    parser.add_argument('--rows-per-file', type=int, default=DEFAULT_ROWS_PER_FILE)
+    args = parser.parse_args()
+
+    pa = _pyarrow()
+    os.makedirs(args.out_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    issuers = load_lookup(args.issuers)
+    politicians = load_lookup(args.politicians)
+    suffix = FILE_SUFFIX[args.format]
+    if issuers:
+        count = export_lookup(issuers.values(), os.path.join(args.out_dir, 'issuers' + suffix),
+                              issuer_schema(pa), args.format)
+        print(f'🏢 Issuers: {count}')
+    if politicians:
+        count = export_lookup(politicians.values(), os.path.join(args.out_dir, 'politicians' + suffix),
+                              politician_schema(pa), args.format)
+        print(f'🏛️  Politicians: {count}')
+
+    print(f'📦 Exporting trades from {args.trades} as {args.format}...')
+    writer = export_trades(args.trades, args.out_dir, issuers, politicians, args.format, args.rows_per_file)
+    print(f'✅ Trades: {writer.rows} in {len(writer.files)} files over {len(writer.parts)} year/month partitions')
+    print(f'   Output: {args.out_dir}')
+    print(f'   Time: {time.perf_counter() - started:.2f}s')
+
+if __name__ == '__main__':
+    main()
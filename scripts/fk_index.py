@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Foreign-key pre-validation for "Trade" rows.
+
+A ForeignKeyIndex holds the known Politician and Issuer IDs, built once from the
+dumps (all_politicians.sql / all_issuers.sql, or politicians.json / issuers.json)
+or from the database. Trades are checked a chunk at a time: the distinct IDs of
+the chunk are diffed against the known sets in one set operation, and only rows
+that reference one of the (usually few) unknown IDs are set aside. Those orphans
+go to a quarantine JSONL file with the reasons, so no batch reaches the database
+with a row that would fail its foreign keys and abort the whole statement.
+
+Usage:
+    python scripts/fk_index.py [web/all_trades.sql] [--politicians web/all_politicians.sql] [--issuers web/all_issuers.sql]
+                               [--quarantine web/quarantine.jsonl]
+    DATABASE_URL=postgresql://... python scripts/fk_index.py web/all_trades.sql --politicians db --issuers db
+"""
+import argparse
+import json
+import os
+from itertools import islice
+
+from trade_record import iter_trades
+from trade_sql import TRADE_COLUMNS, iter_sql_values
+
+DEFAULT_CHUNK_ROWS = 10_000
+
+
+def load_ids(source, table, dsn=None):
+    """Set of IDs from an INSERT dump (.sql), a JSON export (.json), or the database ('db')"""
+    if source == 'db':
+        from pg_loader import fetch_ids
+        if not dsn:
+            raise ValueError(f'A database URL is required to read {table} IDs from the database')
+        return fetch_ids(dsn, table)
+    if source.endswith('.json'):
+        with open(source, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return {str(row_id) for row_id in data}
+        return {str(row['id']) for row in data}
+    # The ID is the first column, quoted or not (all_issuers.sql writes it unquoted)
+    return {str(values[0]) for values in iter_sql_values(source)}
+
+
+class ForeignKeyIndex:
+    """Known politician and issuer IDs, checked against trades in bulk"""
+
+    def __init__(self, politician_ids, issuer_ids):
+        self.politician_ids = frozenset(politician_ids)
+        self.issuer_ids = frozenset(issuer_ids)
+
+    @classmethod
+    def load(cls, politicians='web/all_politicians.sql', issuers='web/all_issuers.sql', dsn=None):
+        """Build from dumps, JSON exports or the database ('db' for either source)"""
+        return cls(load_ids(politicians, 'Politician', dsn), load_ids(issuers, 'Issuer', dsn))
+
+    def unknown(self, trades):
+        """(unknown politician IDs, unknown issuer IDs) referenced by a list of trades"""
+        return ({t.politician_id for t in trades} - self.politician_ids,
+                {t.issuer_id for t in trades} - self.issuer_ids)
+
+    def partition(self, trades):
+        """Split a list of trades into (valid, orphans); orphans are (trade, reasons) pairs"""
+        bad_politicians, bad_issuers = self.unknown(trades)
+        if not bad_politicians and not bad_issuers:
+            return list(trades), []
+        valid = []
+        orphans = []
+        for trade in trades:
+            reasons = []
+            if trade.politician_id in bad_politicians:
+                reasons.append(f'unknown politician_id {trade.politician_id}')
+            if trade.issuer_id in bad_issuers:
+                reasons.append(f'unknown issuer_id {trade.issuer_id}')
+            if reasons:
+                orphans.append((trade, reasons))
+            else:
+                valid.append(trade)
+        return valid, orphans
+
+    def iter_valid(self, trades, quarantine=None, chunk_rows=DEFAULT_CHUNK_ROWS, stats=None):
+        """Stream the trades that satisfy both foreign keys; orphans go to quarantine"""
+        trades = iter(trades)
+        while True:
+            chunk = list(islice(trades, chunk_rows))
+            if not chunk:
+                return
+            valid, orphans = self.partition(chunk)
+            if stats is not None:
+                stats['valid'] = stats.get('valid', 0) + len(valid)
+                stats['orphans'] = stats.get('orphans', 0) + len(orphans)
+            if quarantine is not None:
+                for trade, reasons in orphans:
+                    quarantine.add(trade, reasons)
+            yield from valid
+
+
+class Quarantine:
+    """JSONL file of rejected trades with the reasons they were rejected, one line per trade"""
+
+    def __init__(self, path, source=None, append=False):
+        self.path = path
+        self.source = source
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def add(self, trade, reasons, source=None):
+        entry = {'id': trade.id, 'reasons': reasons}
+        if source or self.source:
+            entry['source'] = source or self.source
+        entry['row'] = dict(zip(TRADE_COLUMNS, trade.as_tuple()))
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check trades against known politicians and issuers')
+    parser.add_argument('source', nargs='?', default='web/all_trades.sql')
+    parser.add_argument('--politicians', default='web/all_politicians.sql',
+                        help="all_politicians.sql, politicians.json, or 'db'")
+    parser.add_argument('--issuers', default='web/all_issuers.sql', help="all_issuers.sql, issuers.json, or 'db'")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--quarantine', default='web/quarantine.jsonl')
+    args = parser.parse_args()
+
+    index = ForeignKeyIndex.load(args.politicians, args.issuers, args.dsn)
+    print(f'📚 Known politicians: {len(index.politician_ids)}, issuers: {len(index.issuer_ids)}')
+
+    stats = {}
+    with Quarantine(args.quarantine, source=args.source) as quarantine:
+        for _ in index.iter_valid(iter_trades(args.source), quarantine, stats=stats):
+            pass
+
+    print(f'✅ Valid trades: {stats.get("valid", 0)}')
+    print(f'🚫 Orphan trades: {stats.get("orphans", 0)} (written to {args.quarantine})')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Quarter-over-quarter 13F position diff for every fund in one pass.
+
+Each fund's holdings for a quarter (from its latest 13F-HR or RESTATEMENT
+amendment for that periodOfReport, plus any later NEW HOLDINGS amendments, as
+loaded by sec_13f.py) are read for all funds at once as
+column lists sorted by (cik, position key), where the key is the CUSIP plus
+put/call. Rows sharing a key within a fund (a NEW HOLDINGS amendment
+repeating a position of the base filing) are added up into one position,
+kept on the base filing's row. The quarter and the one before it are then
+walked together in a single sorted merge, so there is no per-holding lookup:
+
+    both quarters   -> shares_held_prior, shares_change, shares_change_pct,
+                       is_increased / is_decreased
+    this quarter    -> is_new_position
+    prior quarter   -> a zero-share is_closed_position row in this quarter's filing
+
+Funds get total_holdings, total_portfolio_value, average_position_size,
+largest_position(_symbol), concentration_risk (weight of the top 10 positions,
+%), diversification_score (100 * (1 - Herfindahl index of the weights)),
+portfolio_change_pct, new_positions and closed_positions. A weight is market
+value over the sum of the fund's loaded positions; total_portfolio_value is the
+filings' reported total, which also covers positions sec_13f.py left unmapped. Everything is
+written back in one transaction through COPY into staging tables and
+UPDATE ... FROM. Rerunning a quarter replaces its closed-position rows.
+A fund without a filing for the prior quarter keeps NULL deltas; a fund whose
+filing has no mapped positions left closes all of its prior ones.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/holdings_diff.py [--period 2025-06-30] [--prior 2025-03-31]
+    DATABASE_URL=postgresql://... python scripts/holdings_diff.py --period 2025-06-30 --dry-run
+"""
+import argparse
+import heapq
+import io
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from model_ids import new_cuid
+from pg_loader import quoted_columns, require_psycopg2
+from trade_sql import copy_text_rows
+
+TOP_POSITIONS = 10
+
+# A NEW HOLDINGS amendment lists only the positions it adds, so it is merged
+# into the quarter's latest full filing (a 13F-HR or a RESTATEMENT) instead of
+# replacing it
+_FILINGS_SQL = """
+WITH quarter AS (
+    SELECT "id", "cik", "filing_date", "created_at", ("raw_data"->>'totalValue')::float8 AS "total",
+           COALESCE(("raw_data"->>'isAmendment')::boolean
+                    AND upper("raw_data"->>'amendmentType') = 'NEW HOLDINGS', false) AS "adds"
+    FROM "SECFiling"
+    WHERE "form_type" LIKE '13F-HR%%' AND "raw_data"->>'periodOfReport' = %s
+), base AS (
+    SELECT DISTINCT ON ("cik") "id", "cik", "filing_date" FROM quarter WHERE NOT "adds"
+    ORDER BY "cik", "filing_date" DESC, "created_at" DESC
+)
+SELECT q."id", q."cik", q."total", q."id" = b."id" AS "is_base"
+FROM base b JOIN quarter q ON q."cik" = b."cik"
+    AND (q."id" = b."id" OR (q."adds" AND q."filing_date" >= b."filing_date"))
+"""
+
+_POSITION_COLUMNS = ('cik', 'key', 'id', 'symbol', 'company_name', 'cusip', 'shares', 'value', 'is_options',
+                     'calls_puts', 'is_base')
+_POSITIONS_SQL = f"""
+SELECT * FROM (
+    SELECT f."cik", COALESCE(h."cusip", h."symbol") || '|' || COALESCE(h."calls_puts"->>'putCall', '') AS "key",
+           h."id", h."symbol", h."company_name", h."cusip", h."shares_held", h."market_value"::float8,
+           h."is_options", h."calls_puts", f."is_base"
+    FROM ({_FILINGS_SQL}) f JOIN "Holdings13F" h ON h."filing_id" = f."id"
+    WHERE NOT h."is_closed_position"
+) p
+-- Byte order, so the merge can compare keys with Python's < and ==; a repeated
+-- key lists the base filing's row first
+ORDER BY "cik" COLLATE "C", "key" COLLATE "C", "is_base" DESC, "id"
+"""
+
+UPDATE_COLUMNS = ('id', 'shares_held_prior', 'shares_change', 'shares_change_pct', 'is_new_position',
+                  'is_increased', 'is_decreased')
+CLOSED_COLUMNS = ('id', 'filing_id', 'symbol', 'company_name', 'cusip', 'shares_held', 'market_value',
+                  'percent_of_portfolio', 'shares_held_prior', 'shares_change', 'shares_change_pct',
+                  'is_closed_position', 'is_decreased', 'is_options', 'calls_puts')
+FUND_COLUMNS = ('cik', 'total_holdings', 'total_portfolio_value', 'average_position_size', 'largest_position',
+                'largest_position_symbol', 'concentration_risk', 'diversification_score', 'portfolio_change_pct',
+                'new_positions', 'closed_positions')
+
+_HOLDING_STAGE_SQL = """CREATE TEMP TABLE holdings_diff_stage (
+    "id" text, "shares_held_prior" bigint, "shares_change" bigint, "shares_change_pct" numeric,
+    "is_new_position" boolean, "is_increased" boolean, "is_decreased" boolean) ON COMMIT DROP"""
+_HOLDING_UPDATE_SQL = (
+    'UPDATE "Holdings13F" h SET '
+    + ', '.join(f'"{c}" = s."{c}"' for c in UPDATE_COLUMNS[1:])
+    + ' FROM holdings_diff_stage s WHERE h."id" = s."id"'
+)
+_FUND_STAGE_SQL = """CREATE TEMP TABLE fund_diff_stage (
+    "cik" text, "total_holdings" integer, "total_portfolio_value" numeric, "average_position_size" numeric,
+    "largest_position" numeric, "largest_position_symbol" text, "concentration_risk" numeric,
+    "diversification_score" numeric, "portfolio_change_pct" numeric, "new_positions" integer,
+    "closed_positions" integer) ON COMMIT DROP"""
+_FUND_UPDATE_SQL = (
+    'UPDATE "Fund" f SET '
+    + ', '.join(f'"{c}" = s."{c}"' for c in FUND_COLUMNS[1:])
+    + ', "updated_at" = NOW() FROM fund_diff_stage s WHERE f."cik" = s."cik"'
+)
+_DELETE_CLOSED_SQL = 'DELETE FROM "Holdings13F" WHERE "is_closed_position" AND "filing_id" = ANY(%s)'
+
+
+def previous_quarter_end(period):
+    """2025-06-30 -> 2025-03-31"""
+    first = date(period.year, (period.month - 1) // 3 * 3 + 1, 1)
+    return first - timedelta(days=1)
+
+
+def fetch_filings(conn, period):
+    """{cik: (filing id, total value)} for the latest full 13F-HR of each fund for a period.
+
+    The total includes the NEW HOLDINGS amendments merged into that filing.
+    """
+    filings = {}
+    with conn.cursor() as cur:
+        cur.execute(_FILINGS_SQL, (period.isoformat(),))
+        for filing_id, cik, total, is_base in cur:
+            base_id, base_total = filings.get(cik, (None, 0))
+            filings[cik] = (filing_id if is_base else base_id, base_total + (total or 0))
+    return filings
+
+
+def fetch_positions(conn, period):
+    """One quarter's positions for all funds as {column: tuple}, sorted by (cik, key)"""
+    with conn.cursor(name='quarter_positions') as cur:
+        cur.itersize = 50_000
+        cur.execute(_POSITIONS_SQL, (period.isoformat(),))
+        rows = cur.fetchall()
+    return merge_repeated_keys(rows)
+
+
+def merge_repeated_keys(rows):
+    """Add up consecutive rows with the same (cik, key) into one position.
+
+    The first row of a run keeps its id and descriptive columns; 'repeat_ids'
+    lists the ids of the rows folded into it.
+    """
+    cik_at, key_at, shares_at, value_at = (_POSITION_COLUMNS.index(c) for c in ('cik', 'key', 'shares', 'value'))
+    merged, repeat_ids = [], []
+    for row in rows:
+        if merged and merged[-1][cik_at] == row[cik_at] and merged[-1][key_at] == row[key_at]:
+            position = merged[-1]
+            position[shares_at] = (position[shares_at] or 0) + (row[shares_at] or 0)
+            position[value_at] = (position[value_at] or 0) + (row[value_at] or 0)
+            repeat_ids[-1].append(row[_POSITION_COLUMNS.index('id')])
+        else:
+            merged.append(list(row))
+            repeat_ids.append([])
+    columns = tuple(zip(*merged)) if merged else ((),) * len(_POSITION_COLUMNS)
+    positions = dict(zip(_POSITION_COLUMNS, columns))
+    positions['repeat_ids'] = tuple(repeat_ids)
+    return positions
+
+
+def _delta(shares, prior_shares):
+    change = shares - prior_shares
+    pct = round(change * 100 / prior_shares, 4) if prior_shares else None
+    return change, pct
+
+
+def _fund_row(cik, total, prior_total, values, symbols, new, closed):
+    count = len(values)
+    loaded = sum(values)
+    total = total if total is not None else loaded
+    largest = max(range(count), key=values.__getitem__) if count else None
+    # Weights against the loaded positions only: the reported total also counts
+    # unmapped positions that have no Holdings13F row, and a holding's stored
+    # percent_of_portfolio only covers its own filing
+    weights = [v / loaded for v in values] if loaded else [0.0] * count
+    return (
+        cik, count, total,
+        loaded / count if count else None,
+        values[largest] if count else None,
+        symbols[largest] if count else None,
+        round(sum(heapq.nlargest(TOP_POSITIONS, weights)) * 100, 4) if count else None,
+        round((1 - sum(w * w for w in weights)) * 100, 4) if count else None,
+        round((total - prior_total) * 100 / prior_total, 4) if prior_total else None,
+        new, closed,
+    )
+
+
+def diff_quarters(current, prior, filings, prior_filings):
+    """Sorted merge of two quarters; returns (holding updates, closed rows, fund rows)"""
+    updates, closed_rows, fund_rows = [], [], []
+    c_cik, c_key, c_id, c_shares = current['cik'], current['key'], current['id'], current['shares']
+    c_repeats = current['repeat_ids']
+    p_cik, p_key, p_shares = prior['cik'], prior['key'], prior['shares']
+    n, m = len(c_id), len(p_cik)
+    i = j = 0
+
+    def close(j, filing_id):
+        prior_shares = p_shares[j]
+        closed_rows.append((new_cuid(), filing_id, prior['symbol'][j], prior['company_name'][j], prior['cusip'][j],
+                            0, 0, 0, prior_shares, -prior_shares, -100 if prior_shares else None,
+                            True, True, prior['is_options'][j], prior['calls_puts'][j]))
+
+    # Every fund with a filing this quarter, including those without a single position left
+    for cik in sorted(filings):
+        while i < n and c_cik[i] < cik:
+            i += 1
+        while j < m and p_cik[j] < cik:
+            j += 1
+        filing_id, total = filings[cik]
+        has_prior = cik in prior_filings
+        start, new, closed = i, 0, 0
+        while i < n and c_cik[i] == cik:
+            key = c_key[i]
+            while j < m and p_cik[j] == cik and p_key[j] < key:
+                close(j, filing_id)
+                closed += 1
+                j += 1
+            shares = c_shares[i]
+            if j < m and p_cik[j] == cik and p_key[j] == key:
+                prior_shares = p_shares[j]
+                change, pct = _delta(shares, prior_shares)
+                updates.append((c_id[i], prior_shares, change, pct, False, change > 0, change < 0))
+                j += 1
+            elif has_prior:
+                updates.append((c_id[i], None, None, None, True, False, False))
+                new += 1
+            # Rows folded into this position carry no delta of their own
+            updates.extend((repeat_id, None, None, None, False, False, False) for repeat_id in c_repeats[i])
+            i += 1
+        while j < m and p_cik[j] == cik:
+            close(j, filing_id)
+            closed += 1
+            j += 1
+        prior_total = prior_filings[cik][1] if has_prior else None
+        fund_rows.append(_fund_row(cik, total, prior_total, current['value'][start:i], current['symbol'][start:i],
+                                   new if has_prior else None, closed if has_prior else None))
+    return updates, closed_rows, fund_rows
+
+
+def write_diff(conn, filings, updates, closed_rows, fund_rows):
+    """Write the diff in one transaction through COPY + UPDATE ... FROM"""
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(_DELETE_CLOSED_SQL, ([filing_id for filing_id, _ in filings.values()],))
+            cur.execute(_HOLDING_STAGE_SQL)
+            cur.copy_expert(f'COPY holdings_diff_stage ({quoted_columns(UPDATE_COLUMNS)}) FROM STDIN',
+                            io.StringIO(copy_text_rows(updates)))
+            cur.execute(_HOLDING_UPDATE_SQL)
+            cur.copy_expert(f'COPY "Holdings13F" ({quoted_columns(CLOSED_COLUMNS)}) FROM STDIN',
+                            io.StringIO(copy_text_rows(closed_rows)))
+            cur.execute(_FUND_STAGE_SQL)
+            cur.copy_expert(f'COPY fund_diff_stage ({quoted_columns(FUND_COLUMNS)}) FROM STDIN',
+                            io.StringIO(copy_text_rows(fund_rows)))
+            cur.execute(_FUND_UPDATE_SQL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quarter-over-quarter 13F position diff')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--period', type=date.fromisoformat, help='quarter end to diff (default: latest loaded)')
+    parser.add_argument('--prior', type=date.fromisoformat, help='quarter to compare with (default: the one before)')
+    parser.add_argument('--dry-run', action='store_true', help='compute and report, write nothing')
+    args = parser.parse_args()
+
+    if not args.dsn:
+        print('❌ Set DATABASE_URL or pass --dsn')
+        sys.exit(1)
+    conn = require_psycopg2().connect(args.dsn)
+    try:
+        if args.period is None:
+            with conn.cursor() as cur:
+                cur.execute('''SELECT MAX("raw_data"->>'periodOfReport') FROM "SECFiling" WHERE "form_type" LIKE '13F-HR%' ''')
+                latest, = cur.fetchone()
+            if latest is None:
+                print('❌ No 13F-HR filings loaded')
+                sys.exit(1)
+            args.period = date.fromisoformat(latest)
+        prior_period = args.prior or previous_quarter_end(args.period)
+        print(f'📊 Diffing {args.period} against {prior_period}')
+
+        start = time.time()
+        filings = fetch_filings(conn, args.period)
+        prior_filings = fetch_filings(conn, prior_period)
+        current = fetch_positions(conn, args.period)
+        prior = fetch_positions(conn, prior_period)
+        fetched = time.time()
+        print(f'   {len(filings)} funds with {len(current["id"])} positions, '
+              f'{len(prior_filings)} funds with {len(prior["id"])} prior positions ({fetched - start:.2f}s)')
+
+        updates, closed_rows, fund_rows = diff_quarters(current, prior, filings, prior_filings)
+        merged = time.time()
+        print(f'   Merged in {merged - fetched:.2f}s')
+        if not args.dry_run:
+            write_diff(conn, filings, updates, closed_rows, fund_rows)
+            print(f'   Written in {time.time() - merged:.2f}s')
+    finally:
+        conn.close()
+
+    new = sum(1 for u in updates if u[4])
+    compared = sum(1 for u in updates if u[1] is not None or u[4])
+    print(f'\n🎯 FINAL RESULTS:')
+    print(f'   Positions: {compared} compared ({new} new, '
+          f'{sum(1 for u in updates if u[5])} increased, {sum(1 for u in updates if u[6])} decreased)')
+    print(f'   Closed positions: {len(closed_rows)}')
+    print(f'   Funds updated: {len(fund_rows)} ({sum(1 for f in fund_rows if f[9] is None)} without a prior filing)')
+    print(f'   Time: {time.time() - start:.2f}s{" (dry run)" if args.dry_run else ""}')
+
+if __name__ == '__main__':
+    main()
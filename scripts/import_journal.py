@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Persistent import journal so interrupted loads resume instead of restarting.
+
+Every batch is recorded in a small SQLite file with its ID range, row count,
+content hash and database result, and every trade ID the database actually
+inserted is kept in a landed table. On a rerun the loader skips batches whose
+key and hash are already marked done and retries only the failed or new ones.
+A batch that failed after some of its pieces committed keeps their landed IDs,
+so the retry sends only the rows that did not land.
+
+Usage:
+    python scripts/import_journal.py [web/import_journal.sqlite] [--landed out.txt]
+"""
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+
+from trade_sql import format_values_row
+
+DEFAULT_JOURNAL = 'web/import_journal.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_key     TEXT PRIMARY KEY,
+    first_id      TEXT,
+    last_id       TEXT,
+    row_count     INTEGER NOT NULL,
+    content_hash  TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    rows_inserted INTEGER NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    error         TEXT,
+    updated_at    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS landed (
+    trade_id  TEXT PRIMARY KEY,
+    batch_key TEXT NOT NULL
+);
+"""
+
+
+def batch_content_hash(rows):
+    """SHA-256 over the canonical SQL rendering of every row in the batch"""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(format_values_row(row).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class ImportJournal:
+    """SQLite-backed record of batch outcomes; safe to share between worker threads"""
+
+    def __init__(self, path=DEFAULT_JOURNAL):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_done(self, batch_key, content_hash):
+        """True if this exact batch content was already loaded successfully"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, content_hash FROM batches WHERE batch_key = ?', (batch_key,)
+            ).fetchone()
+        return row is not None and row[0] == 'done' and row[1] == content_hash
+
+    def _record(self, batch_key, rows, content_hash, status, inserted_ids, error):
+        first_id = str(rows[0].id) if rows else None
+        last_id = str(rows[-1].id) if rows else None
+        with self._lock:
+            self._db.execute(
+                """INSERT INTO batches (batch_key, first_id, last_id, row_count, content_hash, status,
+                                        rows_inserted, attempts, error, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                   ON CONFLICT (batch_key) DO UPDATE SET
+                       first_id = excluded.first_id, last_id = excluded.last_id,
+                       row_count = excluded.row_count, content_hash = excluded.content_hash,
+                       status = excluded.status, rows_inserted = excluded.rows_inserted,
+                       attempts = batches.attempts + 1, error = excluded.error,
+                       updated_at = excluded.updated_at""",
+                (batch_key, first_id, last_id, len(rows), content_hash, status,
+                 len(inserted_ids), error, time.time()),
+            )
+            if inserted_ids:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO landed (trade_id, batch_key) VALUES (?, ?)',
+                    ((str(trade_id), batch_key) for trade_id in inserted_ids),
+                )
+            self._db.commit()
+
+    def record_success(self, batch_key, rows, content_hash, inserted_ids):
+        self._record(batch_key, rows, content_hash, 'done', inserted_ids, None)
+
+    def record_failure(self, batch_key, rows, content_hash, error, inserted_ids=()):
+        """Mark a batch failed, keeping the IDs that pieces committed before the failure"""
+        self._record(batch_key, rows, content_hash, 'failed', inserted_ids, str(error))
+
+    def failed_batches(self):
+        with self._lock:
+            return self._db.execute(
+                'SELECT batch_key, first_id, last_id, row_count, attempts, error FROM batches '
+                "WHERE status = 'failed' ORDER BY batch_key"
+            ).fetchall()
+
+    def landed_in(self, batch_key):
+        """Set of trade IDs already landed by earlier attempts at this batch"""
+        with self._lock:
+            return {row[0] for row in self._db.execute('SELECT trade_id FROM landed WHERE batch_key = ?',
+                                                       (batch_key,))}
+
+    def landed_ids(self):
+        """Every trade ID the database reported as newly inserted"""
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT trade_id FROM landed ORDER BY trade_id')]
+
+    def summary(self):
+        with self._lock:
+            counts = dict(self._db.execute('SELECT status, COUNT(*) FROM batches GROUP BY status').fetchall())
+            rows = self._db.execute(
+                "SELECT COALESCE(SUM(row_count), 0) FROM batches WHERE status = 'done'"
+            ).fetchone()[0]
+            landed = self._db.execute('SELECT COUNT(*) FROM landed').fetchone()[0]
+        return {
+            'done_batches': counts.get('done', 0),
+            'failed_batches': counts.get('failed', 0),
+            'rows_done': rows,
+            'trades_landed': landed,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report on an import journal')
+    parser.add_argument('journal', nargs='?', default=DEFAULT_JOURNAL)
+    parser.add_argument('--landed', help='write every landed trade ID to this file')
+    args = parser.parse_args()
+
+    with ImportJournal(args.journal) as journal:
+        summary = journal.summary()
+        print(f'📒 Import journal: {args.journal}')
+        print(f'   Done batches: {summary["done_batches"]} ({summary["rows_done"]} rows)')
+        print(f'   Failed batches: {summary["failed_batches"]}')
+        print(f'   Trades landed: {summary["trades_landed"]}')
+
+        for batch_key, first_id, last_id, row_count, attempts, error in journal.failed_batches():
+            print(f'   ❌ {batch_key} ({first_id}..{last_id}, {row_count} rows, {attempts} attempts): {error}')
+
+        if args.landed:
+            with open(args.landed, 'w') as f:
+                for trade_id in journal.landed_ids():
+                    f.write(f'{trade_id}\n')
+            print(f'   Landed trade IDs written to {args.landed}')
+
+if __name__ == '__main__':
+    main()
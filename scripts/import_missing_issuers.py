@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import json
-import sys
+
+from trade_sql import format_insert
 
 def create_missing_issuers_sql():
     """Create SQL to import the 21 missing issuers"""
@@ -13,17 +14,9 @@ def create_missing_issuers_sql():
     
     print(f"Creating SQL for {len(missing_issuers)} missing issuers...")
     
-    # Create SQL INSERT statements
-    sql_parts = []
-    for issuer in missing_issuers:
-        # Handle ticker - convert None to NULL
-        ticker_value = f"'{issuer['ticker']}'" if issuer['ticker'] else 'NULL'
-        
-        sql_parts.append(f"('{issuer['id']}', '{issuer['name']}', {ticker_value})")
-    
-    sql = f"""INSERT INTO "Issuer" ("id", "name", "ticker") VALUES
-{',\n'.join(sql_parts)}
-ON CONFLICT (id) DO NOTHING;"""
+    # One multi-row INSERT; format_insert escapes the names (O'Halleran etc.)
+    rows = [(str(issuer['id']), issuer['name'], issuer['ticker'] or None) for issuer in missing_issuers]
+    sql = format_insert('Issuer', ('id', 'name', 'ticker'), rows)
     
     # Write to file
     with open('web/missing_issuers_import.sql', 'w') as f:
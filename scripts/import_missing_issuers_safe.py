@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import json
 
+from trade_sql import format_insert
+
 def create_safe_missing_issuers_sql():
     """Create safe SQL to import the 21 missing issuers, handling apostrophes"""
     
@@ -15,14 +17,9 @@ def create_safe_missing_issuers_sql():
     # Create individual SQL INSERT statements
     sql_statements = []
     for issuer in missing_issuers:
-        # Handle ticker - convert None to NULL
-        ticker_value = f"'{issuer['ticker']}'" if issuer['ticker'] else 'NULL'
-        
-        # Escape single quotes in names
-        safe_name = issuer['name'].replace("'", "''")
-        
-        sql = f"INSERT INTO \"Issuer\" (\"id\", \"name\", \"ticker\") VALUES ('{issuer['id']}', '{safe_name}', {ticker_value}) ON CONFLICT (id) DO NOTHING;"
-        sql_statements.append(sql)
+        # format_insert escapes apostrophes in names and writes a missing ticker as NULL
+        row = (str(issuer['id']), issuer['name'], issuer['ticker'] or None)
+        sql_statements.append(format_insert('Issuer', ('id', 'name', 'ticker'), [row]))
     
     # Write to file
     with open('web/missing_issuers_safe.sql', 'w') as f:
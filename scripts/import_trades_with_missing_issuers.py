@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
-import re
 import os
-import sys
+
+from missing_issuers import find_missing_issuers, load_known_issuer_ids, missing_issuer_sql
+from trade_record import iter_trades
+from trade_sql import TRADE_COLUMNS, format_insert
 
 def import_trades_with_missing_issuers():
     """
@@ -15,6 +17,11 @@ def import_trades_with_missing_issuers():
         print(f"❌ Batch directory {batch_dir} not found!")
         return
     
+    # Load the known issuer IDs once
+    known_source = 'web/all_issuers.sql'
+    known_ids = load_known_issuer_ids(known_source)
+    print(f"📚 Loaded {len(known_ids)} known issuers from {known_source}")
+    
     # Get list of batch files
     batch_files = sorted([f for f in os.listdir(batch_dir) if f.endswith('.sql')])
     print(f"📁 Found {len(batch_files)} batch files to process")
@@ -22,79 +29,47 @@ def import_trades_with_missing_issuers():
     total_processed = 0
     total_imported = 0
     total_skipped = 0
+    batches = []
     
     for i, filename in enumerate(batch_files, 1):
         print(f"\n🔄 Processing batch {i}/{len(batch_files)}: {filename}")
         
-        with open(os.path.join(batch_dir, filename), 'r') as f:
-            content = f.read()
-        
         # Extract trade entries
-        trade_pattern = r"\(([^)]*?)\)(?:,\n|\nON CONFLICT \(id\) DO NOTHING;)"
-        trades = re.findall(trade_pattern, content)
-        
-        # Filter out INSERT statements
-        valid_trades = [t for t in trades if not t.startswith('INSERT INTO')]
+        valid_trades = list(iter_trades(os.path.join(batch_dir, filename)))
         
         print(f"  📊 Found {len(valid_trades)} trades in batch")
         
-        # Process each trade individually
-        batch_imported = 0
-        batch_skipped = 0
-        
-        for trade in valid_trades:
-            try:
-                # Extract trade data
-                parts = trade.split(',')
-                if len(parts) >= 14:  # Ensure we have all required fields
-                    trade_id = parts[0].strip().replace("'", "")
-                    politician_id = parts[1].strip().replace("'", "")
-                    issuer_id = parts[2].strip().replace("'", "")
-                    
-                    # Extract issuer name from raw JSON (last field)
-                    raw_json = parts[-2].strip()
-                    issuer_name = "Unknown Issuer"
-                    
-                    # Try to extract issuer name from raw JSON
-                    if '"issuerName":"' in raw_json:
-                        start = raw_json.find('"issuerName":"') + len('"issuerName":"')
-                        end = raw_json.find('"', start)
-                        if end > start:
-                            issuer_name = raw_json[start:end]
-                    
-                    # Create the trade SQL
-                    trade_sql = f"INSERT INTO \"Trade\" (\"id\", \"politician_id\", \"issuer_id\", \"traded_at\", \"type\", \"size_min\", \"size_max\", \"published_at\", \"filed_after_days\", \"owner\", \"price\", \"source_url\", \"raw\", \"created_at\") VALUES ({trade}) ON CONFLICT (id) DO NOTHING;"
-                    
-                    # First, ensure the issuer exists
-                    issuer_sql = f"""
-                    INSERT INTO "Issuer" ("id", "name", "ticker") 
-                    VALUES ('{issuer_id}', '{issuer_name.replace("'", "''")}', NULL) 
-                    ON CONFLICT (id) DO NOTHING;
-                    """
-                    
-                    # We'll need to execute these SQL statements
-                    # For now, let's just track what we would do
-                    print(f"    ✅ Would create issuer {issuer_id}: {issuer_name}")
-                    print(f"    ✅ Would import trade {trade_id}")
-                    
-                    batch_imported += 1
-                    
-            except Exception as e:
-                print(f"    ❌ Error processing trade: {e}")
-                batch_skipped += 1
-                continue
-        
+        batches.append(valid_trades)
         total_processed += len(valid_trades)
-        total_imported += batch_imported
-        total_skipped += batch_skipped
-        
-        print(f"  📈 Batch {i} results: {batch_imported} imported, {batch_skipped} skipped")
         
         # Break after first few batches for testing
         if i >= 3:
             print(f"\n🛑 Stopping after {i} batches for testing")
             break
     
+    # One pass over all trades: referenced issuers minus known issuers
+    stats = {}
+    missing = find_missing_issuers((trade for batch in batches for trade in batch), known_ids, stats)
+    issuer_sql = missing_issuer_sql(missing)
+    
+    # The missing issuers go in first, as a single statement, so every trade's FK resolves
+    # We'll need to execute these SQL statements
+    # For now, let's just track what we would do
+    print(f"\n🏢 {stats['missing']} of {stats['referenced']} referenced issuers are missing")
+    for issuer_id, (issuer_name, ticker) in sorted(missing.items()):
+        print(f"    ✅ Would create issuer {issuer_id}: {issuer_name}")
+    if issuer_sql:
+        print(f"    ✅ Would run 1 issuer insert ({len(issuer_sql)} bytes)")
+    
+    for i, valid_trades in enumerate(batches, 1):
+        try:
+            trade_sql = format_insert('Trade', TRADE_COLUMNS, valid_trades)
+            print(f"  ✅ Would import batch {i}: {len(valid_trades)} trades ({len(trade_sql)} bytes)")
+            total_imported += len(valid_trades)
+        except Exception as e:
+            print(f"  ❌ Error processing batch {i}: {e}")
+            total_skipped += len(valid_trades)
+    
     print(f"\n✅ Import Summary:")
     print(f"  Total trades processed: {total_processed}")
     print(f"  Successfully imported: {total_imported}")
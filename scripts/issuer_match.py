@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Fuzzy issuer matching with a token-key inverted index.
+
+Issuer names are normalized (case, punctuation, '&', legal suffixes such as
+Inc/Corp/PLC and share-class tails such as "-CL B" are dropped) into a columnar
+IssuerTable. An IssuerIndex files every row under short word-token keys; a
+search only scores the rows filed under the query's rarest keys or its ticker
+(blocking), so matching tens of thousands of names is a few short list scans
+per name instead of a quadratic compare. Scores are the Dice coefficient of the
+character trigram sets, nudged up when tickers agree and down when they conflict.
+"""
+import re
+from collections import defaultdict
+
+LEGAL_SUFFIXES = frozenset((
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'cos', 'company', 'companies',
+    'ltd', 'limited', 'plc', 'llc', 'lp', 'llp', 'sa', 'ag', 'nv', 'se', 'the',
+))
+
+_SHARE_CLASS = re.compile(r'[\s-]+(?:cl(?:ass)?|series|ser)\.?\s*[a-z]\b.*$', re.I)
+_APOSTROPHE = re.compile(r"['’`]")
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+TICKER_BONUS = 0.1
+TICKER_CONFLICT_FACTOR = 0.8
+DEFAULT_MIN_SCORE = 0.6
+BLOCK_KEY_LENGTH = 5
+PROBE_KEYS = 2
+
+
+def normalize_issuer_name(name):
+    """Comparable form of an issuer name, e.g. "BERKSHIRE HATHAWAY INC-CL B" -> "berkshire hathaway\""""
+    if not name:
+        return ''
+    text = _SHARE_CLASS.sub('', name.strip())
+    text = _APOSTROPHE.sub('', text.lower()).replace('&', ' and ')
+    tokens = [t for t in _NON_ALNUM.split(text) if t]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == 'the':
+        tokens.pop(0)
+    return ' '.join(tokens)
+
+
+def normalize_ticker(ticker):
+    if ticker is None:
+        return None
+    ticker = str(ticker).strip().upper()
+    return ticker if ticker and ticker not in ('NONE', 'NULL', 'N/A') else None
+
+
+def trigrams(text):
+    """Set of character trigrams of a normalized name, padded so short names still score"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IssuerTable:
+    """Column-oriented issuer rows: parallel lists of id, name, normalized name and ticker"""
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.norm_names = []
+        self.tickers = []
+        self.row_by_id = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from dicts with id, name and optional ticker"""
+        table = cls()
+        for row in rows:
+            table.append(row.get('id'), row.get('name'), row.get('ticker'))
+        return table
+
+    def append(self, issuer_id, name, ticker=None):
+        issuer_id = str(issuer_id)
+        self.row_by_id[issuer_id] = len(self.ids)
+        self.ids.append(issuer_id)
+        self.names.append(name or '')
+        self.norm_names.append(normalize_issuer_name(name))
+        self.tickers.append(normalize_ticker(ticker))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def blocking_keys(norm_name):
+    """Word-token keys a name is filed under: the first letters of each token.
+
+    Cutting tokens to BLOCK_KEY_LENGTH characters keeps "technology" and
+    "technologies", or a typo late in a word, under the same key.
+    """
+    return {token[:BLOCK_KEY_LENGTH] for token in norm_name.split() if len(token) > 1} or \
+        ({norm_name[:BLOCK_KEY_LENGTH]} if norm_name else set())
+
+
+class IssuerIndex:
+    """Token-key inverted index over one IssuerTable, used to block fuzzy name searches.
+
+    A query only looks at rows filed under its PROBE_KEYS rarest token keys (by
+    how many rows share them) or under its ticker, and scores just those rows,
+    so generic words such as "bank" or "district" never fan out to the whole table.
+    """
+
+    def __init__(self, table, min_score=DEFAULT_MIN_SCORE):
+        self.table = table
+        self.min_score = min_score
+        self.grams = [trigrams(name) for name in table.norm_names]
+        self.postings = defaultdict(list)
+        for row, name in enumerate(table.norm_names):
+            for key in blocking_keys(name):
+                self.postings[key].append(row)
+        self.by_ticker = defaultdict(list)
+        for row, ticker in enumerate(table.tickers):
+            if ticker:
+                self.by_ticker[ticker].append(row)
+
+    def candidates(self, norm_name, ticker=None):
+        postings = self.postings
+        keys = sorted(blocking_keys(norm_name), key=lambda k: (len(postings.get(k, ())), k))
+        rows = set()
+        for key in keys[:PROBE_KEYS]:
+            rows.update(postings.get(key, ()))
+        if ticker:
+            rows.update(self.by_ticker.get(ticker, ()))
+        return rows
+
+    def search(self, name, ticker=None, limit=3):
+        """Best matches for one issuer as [(row, score, name_score)], highest score first"""
+        norm = normalize_issuer_name(name)
+        ticker = normalize_ticker(ticker)
+        grams = trigrams(norm)
+        results = []
+        for row in self.candidates(norm, ticker):
+            name_score = similarity(grams, self.grams[row])
+            score = adjust_for_ticker(name_score, ticker, self.table.tickers[row])
+            if score >= self.min_score:
+                results.append((row, score, name_score))
+        results.sort(key=lambda r: (-r[1], -r[2], self.table.ids[r[0]]))
+        return results[:limit]
+
+
+def similarity(grams_a, grams_b):
+    """Dice coefficient of two trigram sets"""
+    if not grams_a or not grams_b:
+        return 0.0
+    return 2.0 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def adjust_for_ticker(name_score, ticker_a, ticker_b):
+    if ticker_a and ticker_b:
+        if ticker_a == ticker_b:
+            return min(1.0, name_score + TICKER_BONUS)
+        return name_score * TICKER_CONFLICT_FACTOR
+    return name_score
+
+
+def compare_rows(table_a, row_a, table_b, row_b):
+    """Confidence that two rows name the same issuer"""
+    name_score = similarity(trigrams(table_a.norm_names[row_a]), trigrams(table_b.norm_names[row_b]))
+    return adjust_for_ticker(name_score, table_a.tickers[row_a], table_b.tickers[row_b]), name_score
+
+
+def cross_check(local, remote, min_score=DEFAULT_MIN_SCORE):
+    """Compare two IssuerTables by ID and by fuzzy name.
+
+    Returns a dict of lists:
+      same            same ID, same normalized name and ticker
+      name_variants   same ID, names differ only in form (score >= min_score)
+      different_data  same ID, but name or ticker really differ
+      id_drift        an ID present on one side only whose best match on the other
+                      side is also unpaired, i.e. the same issuer under a new ID
+      missing_in_remote / missing_in_local  no ID and no confident name match
+    Every proposed match carries a confidence score in [0, 1].
+    """
+    result = {key: [] for key in ('same', 'name_variants', 'different_data', 'id_drift',
+                                  'missing_in_remote', 'missing_in_local')}
+
+    for row_a, issuer_id in enumerate(local.ids):
+        row_b = remote.row_by_id.get(issuer_id)
+        if row_b is None:
+            continue
+        score, name_score = compare_rows(local, row_a, remote, row_b)
+        entry = {
+            'id': issuer_id,
+            'local_name': local.names[row_a], 'remote_name': remote.names[row_b],
+            'local_ticker': local.tickers[row_a], 'remote_ticker': remote.tickers[row_b],
+            'confidence': round(score, 3),
+        }
+        ticker_conflict = (local.tickers[row_a] and remote.tickers[row_b]
+                           and local.tickers[row_a] != remote.tickers[row_b])
+        if local.norm_names[row_a] == remote.norm_names[row_b] and local.tickers[row_a] == remote.tickers[row_b]:
+            result['same'].append(issuer_id)
+        elif name_score >= min_score and not ticker_conflict:
+            result['name_variants'].append(entry)
+        else:
+            result['different_data'].append(entry)
+
+    local_only = [row for row, issuer_id in enumerate(local.ids) if issuer_id not in remote.row_by_id]
+    remote_only = {row for row, issuer_id in enumerate(remote.ids) if issuer_id not in local.row_by_id}
+
+    remote_index = IssuerIndex(remote, min_score)
+    claimed = set()
+    unmatched_local = []
+    for row_a in local_only:
+        match = None
+        for row_b, score, name_score in remote_index.search(local.names[row_a], local.tickers[row_a], limit=5):
+            if row_b in remote_only and row_b not in claimed:
+                match = row_b, score
+                break
+        if match is None:
+            unmatched_local.append(row_a)
+            continue
+        row_b, score = match
+        claimed.add(row_b)
+        result['id_drift'].append({
+            'local_id': local.ids[row_a], 'remote_id': remote.ids[row_b],
+            'local_name': local.names[row_a], 'remote_name': remote.names[row_b],
+            'local_ticker': local.tickers[row_a], 'remote_ticker': remote.tickers[row_b],
+            'confidence': round(score, 3),
+        })
+
+    for row_a in unmatched_local:
+        result['missing_in_remote'].append({'id': local.ids[row_a], 'name': local.names[row_a],
+                                            'ticker': local.tickers[row_a]})
+    for row_b in sorted(remote_only - claimed):
+        result['missing_in_local'].append({'id': remote.ids[row_b], 'name': remote.names[row_b],
+                                           'ticker': remote.tickers[row_b]})
+
+    result['id_drift'].sort(key=lambda d: -d['confidence'])
+    result['name_variants'].sort(key=lambda d: d['confidence'])
+    return result
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Synthesize the issuers that trades reference but the Issuer table lacks.
+
+The known issuer IDs are loaded once (from all_issuers.sql, issuers.json or the
+database), the trades are streamed once to collect referenced-minus-known IDs,
+and the result is a single multi-row INSERT INTO "Issuer" to run ahead of the
+trade load, instead of one ON CONFLICT DO NOTHING statement per trade. Issuer
+names (and tickers, when the scrape recorded one) come from each trade's raw
+JSON payload. A .sql dump is read through its compiled snapshot
+(trade_snapshot.py), so only the trades of missing issuers are parsed.
+
+Usage:
+    python scripts/missing_issuers.py web/all_trades.sql [--known web/all_issuers.sql] [--output web/missing_issuers.sql]
+    python scripts/missing_issuers.py web/all_trades.sql --known web/issuers.json
+    DATABASE_URL=postgresql://... python scripts/missing_issuers.py web/all_trades.sql --known db
+"""
+import argparse
+import os
+
+from fk_index import load_ids
+from trade_record import iter_trades
+from trade_snapshot import open_snapshot
+from trade_sql import format_insert
+
+ISSUER_COLUMNS = ('id', 'name', 'ticker')
+UNKNOWN_ISSUER_NAME = 'Unknown Issuer'
+
+
+def load_known_issuer_ids(source, dsn=None):
+    """Set of issuer IDs from an Issuer INSERT dump (.sql), issuers.json, or the database ('db')"""
+    return load_ids(source, 'Issuer', dsn)
+
+
+def find_missing_issuers(trades, known_ids, stats=None):
+    """One pass over trades: {issuer_id: (name, ticker)} for referenced IDs not in known_ids.
+
+    The first trade that carries a name (and ticker) for a missing issuer wins.
+    """
+    missing = {}
+    referenced = set()
+    for trade in trades:
+        issuer_id = trade.issuer_id
+        referenced.add(issuer_id)
+        if issuer_id in known_ids:
+            continue
+        name, ticker = missing.get(issuer_id, (None, None))
+        if name and ticker:
+            continue
+        raw = trade.raw_json()
+        missing[issuer_id] = (name or raw.get('issuerName'), ticker or raw.get('ticker'))
+    if stats is not None:
+        stats['referenced'] = len(referenced)
+        stats['missing'] = len(missing)
+    return {issuer_id: (name or UNKNOWN_ISSUER_NAME, ticker) for issuer_id, (name, ticker) in missing.items()}
+
+
+def find_missing_issuers_in_snapshot(snapshot, known_ids, stats=None):
+    """find_missing_issuers over a TradeSnapshot, parsing only the rows whose issuer is not known"""
+    issuer_ids = snapshot.issuer_ids()
+    rows = (snapshot.record(i) for i, issuer_id in enumerate(issuer_ids) if issuer_id not in known_ids)
+    missing = find_missing_issuers(rows, known_ids, stats)
+    if stats is not None:
+        stats['referenced'] = len(set(issuer_ids))
+    return missing
+
+
+def missing_issuer_sql(missing):
+    """One multi-row INSERT for the missing issuers, or '' when there are none"""
+    if not missing:
+        return ''
+    rows = [(issuer_id, name, ticker) for issuer_id, (name, ticker) in sorted(missing.items())]
+    return format_insert('Issuer', ISSUER_COLUMNS, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emit one INSERT for issuers referenced by trades but not known')
+    parser.add_argument('trades', nargs='?', default='web/all_trades.sql')
+    parser.add_argument('--known', default='web/all_issuers.sql',
+                        help="all_issuers.sql, issuers.json, or 'db' to query the Issuer table")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--output', default='web/missing_issuers.sql')
+    parser.add_argument('--no-snapshot', action='store_true', help='stream the dump instead of its snapshot')
+    args = parser.parse_args()
+
+    known_ids = load_known_issuer_ids(args.known, args.dsn)
+    print(f'📚 Known issuers: {len(known_ids)} ({args.known})')
+
+    stats = {}
+    if args.trades.endswith('.sql') and not args.no_snapshot:
+        with open_snapshot(args.trades) as snapshot:
+            missing = find_missing_issuers_in_snapshot(snapshot, known_ids, stats)
+    else:
+        missing = find_missing_issuers(iter_trades(args.trades), known_ids, stats)
+    print(f'🔍 Issuers referenced by trades: {stats["referenced"]}')
+    print(f'❓ Missing issuers: {stats["missing"]}')
+
+    with open(args.output, 'w') as f:
+        f.write(missing_issuer_sql(missing) + '\n')
+    print(f'✅ Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+OpenInsider CSV ingest with numeric columns and a bulk upsert of all three tables.
+
+openinsider_transactions keeps the scraped strings (quantity "+1,234", value
+"$5.6M", owned "12%") for display, and this loader also fills the numeric
+columns (quantity_numeric, shares_held_numeric, owned_pct, value_numeric) so
+size filters and sorts need no text casts. Each column is parsed in one pass
+that converts every distinct string once.
+
+Companies (by ticker) and owners (by name) are deduplicated in memory and
+upserted first, each with one COPY into a staging table and one
+INSERT ... ON CONFLICT; their IDs come back as ticker -> id and name -> id
+maps. Transactions are then upserted the same way. Transaction IDs are derived
+from the row content, so reloading an overlapping export updates rows instead
+of duplicating them; a staged transaction that matches an existing row on the
+natural key (company, owner, trade and transaction dates, type, quantity text
+and price) takes that row's ID first, so rows loaded earlier with cuid IDs by
+import_openinsider_data.js are updated too. This replaces the per-row lookup-then-insert of
+web/scripts/import_openinsider_data.js.
+Rows with a missing or malformed transaction or trade date (both required)
+are skipped and counted instead of failing the load. With --backfill, the
+numeric columns of rows already in the table are filled from their text
+columns instead.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/openinsider_load.py ../opensecret/insider_trades_2023_2025.csv
+    DATABASE_URL=postgresql://... python scripts/openinsider_load.py --backfill
+    python scripts/openinsider_load.py insider_trades.csv --dry-run
+"""
+import argparse
+import csv
+import hashlib
+import io
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from model_ids import new_cuid
+from pg_loader import quoted_columns, require_psycopg2
+from trade_sql import MODEL_COLUMNS, copy_text_rows
+
+_SCALES = {'K': 10 ** 3, 'M': 10 ** 6, 'B': 10 ** 9, '%': 1}
+# Same test as import_openinsider_data.js
+_INSTITUTION = re.compile(r'LLC|LP|LLP|Corp|Inc|Ltd|Partners|Capital|Fund|Management|Holdings|Group|Advisors|'
+                          r'Associates|Trust|Bank|Financial|Insurance|Mutual|Asset|Equity|Venture|Private|Hedge', re.I)
+
+_COMPANY_TABLE, _ = MODEL_COLUMNS['OpenInsiderCompany']
+_OWNER_TABLE, _ = MODEL_COLUMNS['OpenInsiderOwner']
+_TX_TABLE, _ = MODEL_COLUMNS['OpenInsiderTransaction']
+COMPANY_COLUMNS = ('id', 'ticker', 'name', 'updated_at')
+OWNER_COLUMNS = ('id', 'name', 'title', 'isInstitution', 'updated_at')
+TX_COLUMNS = ('id', 'transaction_date', 'trade_date', 'transaction_type', 'last_price', 'quantity', 'shares_held',
+              'owned', 'value', 'value_numeric', 'quantity_numeric', 'shares_held_numeric', 'owned_pct',
+              'company_id', 'owner_id', 'updated_at')
+NUMERIC_COLUMNS = ('id', 'quantity_numeric', 'shares_held_numeric', 'owned_pct', 'value_numeric')
+
+# (table, staging table, columns, conflict key, columns updated on conflict)
+_UPSERTS = {
+    'company': (_COMPANY_TABLE, 'oi_company_stage', COMPANY_COLUMNS, 'ticker', ('name',)),
+    'owner': (_OWNER_TABLE, 'oi_owner_stage', OWNER_COLUMNS, 'name', ('title', 'isInstitution')),
+    'transaction': (_TX_TABLE, 'oi_transaction_stage', TX_COLUMNS, 'id', TX_COLUMNS[1:-1]),
+}
+TX_NATURAL_KEY = ('company_id', 'owner_id', 'trade_date', 'transaction_date', 'transaction_type', 'quantity')
+# Adopt the ID of an existing row with the same natural key (last_price may be NULL on both sides)
+_MATCH_EXISTING_SQL = (
+    f'UPDATE oi_transaction_stage s SET "id" = t."id" FROM "{_TX_TABLE}" t WHERE '
+    + ' AND '.join(f't."{c}" = s."{c}"' for c in TX_NATURAL_KEY)
+    + ' AND t."last_price" IS NOT DISTINCT FROM s."last_price" AND t."id" <> s."id"'
+)
+
+
+def parse_number(text):
+    """'+1,234' -> 1234, '-$5.6M' -> -5600000, '12%' -> 12, '>999%' -> 999; 'New', 'n/a', '' -> None"""
+    if text is None:
+        return None
+    s = text.strip().lstrip('<>').replace(',', '').replace('$', '').replace(' ', '')
+    if s.startswith('(') and s.endswith(')'):
+        s = '-' + s[1:-1]
+    scale = _SCALES.get(s[-1:].upper())
+    if scale is not None:
+        s = s[:-1]
+    try:
+        number = Decimal(s)
+    except InvalidOperation:
+        return None
+    if not number.is_finite():
+        return None
+    return number * scale if scale and scale != 1 else number
+
+
+def parse_integer(text):
+    number = parse_number(text)
+    return int(number.to_integral_value()) if number is not None else None
+
+
+def parse_column(values, convert=parse_number):
+    """Parse a whole column, converting each distinct string once"""
+    memo = {value: convert(value) for value in set(values)}
+    return [memo[value] for value in values]
+
+
+def parse_timestamp(text):
+    """ISO date or timestamp (UTC unless it has an offset); '' or malformed -> None"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def transaction_id(ticker, owner, trade_date, transaction_date, transaction_type, quantity, price):
+    """Stable ID for one transaction line, so a reload upserts instead of duplicating"""
+    key = '\x1f'.join(str(part) for part in (ticker, owner, trade_date, transaction_date, transaction_type,
+                                              quantity, price))
+    return 'oi' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:23]
+
+
+def read_export(path):
+    """CSV rows (the columns import_openinsider_data.js reads) as a dict of columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = [r for r in csv.DictReader(f) if r.get('ticker') and r.get('owner_name')]
+    names = ('ticker', 'company_name', 'owner_name', 'Title', 'transaction_date', 'trade_date', 'transaction_type',
+             'last_price', 'Qty', 'shares_held', 'Owned', 'Value')
+    return {name: [(r.get(name) or '').strip() for r in rows] for name in names}
+
+
+def drop_undated(columns):
+    """(columns, skipped): the rows whose transaction or trade date is missing or malformed are moved to skipped.
+
+    Both dates are required columns, so one bad row would otherwise fail the
+    whole load. skipped holds (ticker, owner, transaction_date, trade_date) as read.
+    """
+    traded = parse_column(columns['transaction_date'], parse_timestamp)
+    trade_dates = parse_column(columns['trade_date'], parse_timestamp)
+    bad = [i for i, (a, b) in enumerate(zip(traded, trade_dates)) if a is None or b is None]
+    if not bad:
+        return columns, []
+    skipped = [(columns['ticker'][i], columns['owner_name'][i], columns['transaction_date'][i],
+                columns['trade_date'][i]) for i in bad]
+    bad = set(bad)
+    return {name: [v for i, v in enumerate(values) if i not in bad] for name, values in columns.items()}, skipped
+
+
+def build_rows(columns):
+    """(companies, owners, transactions) with the numeric columns parsed; IDs of the parents filled in later.
+
+    Every row needs a valid transaction and trade date (see drop_undated).
+    """
+    now = datetime.now(timezone.utc)
+    companies, owners = {}, {}
+    for ticker, name in zip(columns['ticker'], columns['company_name']):
+        companies.setdefault(ticker, (new_cuid(), ticker, name or ticker, now))
+    for name, title in zip(columns['owner_name'], columns['Title']):
+        if name not in owners:
+            owners[name] = (new_cuid(), name, title or None, bool(_INSTITUTION.search(name)), now)
+
+    prices = parse_column(columns['last_price'])
+    quantities = parse_column(columns['Qty'], parse_integer)
+    held = parse_column(columns['shares_held'], parse_integer)
+    owned = parse_column(columns['Owned'])
+    values = parse_column(columns['Value'])
+    traded = parse_column(columns['transaction_date'], parse_timestamp)
+    trade_dates = parse_column(columns['trade_date'], parse_timestamp)
+
+    transactions = {}
+    for i, (ticker, owner, kind) in enumerate(zip(columns['ticker'], columns['owner_name'],
+                                                  columns['transaction_type'])):
+        tx_id = transaction_id(ticker, owner, trade_dates[i], traded[i], kind, quantities[i], prices[i])
+        # The last copy of a repeated line wins, as with a second load
+        transactions[tx_id] = (tx_id, traded[i], trade_dates[i], kind, prices[i], columns['Qty'][i],
+                               columns['shares_held'][i], columns['Owned'][i], columns['Value'][i], values[i],
+                               quantities[i], held[i], owned[i], ticker, owner, now)
+    return companies, owners, list(transactions.values())
+
+
+def _upsert(cur, kind, rows, prepare_sql=None):
+    """COPY rows into a staging table, run prepare_sql on it, and upsert them; returns (inserted, updated)"""
+    table, stage, columns, key, updated = _UPSERTS[kind]
+    cur.execute(f'CREATE TEMP TABLE {stage} (LIKE "{table}" INCLUDING DEFAULTS) ON COMMIT DROP')
+    cur.copy_expert(f'COPY {stage} ({quoted_columns(columns)}) FROM STDIN', io.StringIO(copy_text_rows(rows)))
+    if prepare_sql:
+        cur.execute(prepare_sql)
+    changed = ' OR '.join(f't."{c}" IS DISTINCT FROM EXCLUDED."{c}"' for c in updated)
+    cur.execute(
+        f'INSERT INTO "{table}" AS t ({quoted_columns(columns)}) SELECT {quoted_columns(columns)} FROM {stage} '
+        f'ON CONFLICT ("{key}") DO UPDATE SET '
+        + ', '.join(f'"{c}" = EXCLUDED."{c}"' for c in updated + ('updated_at',))
+        + f' WHERE {changed} RETURNING (xmax = 0)'
+    )
+    flags = [inserted for inserted, in cur.fetchall()]
+    return sum(flags), len(flags) - sum(flags)
+
+
+def _id_map(cur, kind):
+    table, stage, _, key, _ = _UPSERTS[kind]
+    cur.execute(f'SELECT t."{key}", t."id" FROM "{table}" t JOIN {stage} s USING ("{key}")')
+    return dict(cur.fetchall())
+
+
+def load(conn, companies, owners, transactions):
+    """Upsert companies, owners, then transactions in one transaction; returns per-table (inserted, updated)"""
+    stats = {}
+    with conn:
+        with conn.cursor() as cur:
+            stats['companies'] = _upsert(cur, 'company', list(companies.values()))
+            company_ids = _id_map(cur, 'company')
+            stats['owners'] = _upsert(cur, 'owner', list(owners.values()))
+            owner_ids = _id_map(cur, 'owner')
+            rows = [row[:13] + (company_ids[row[13]], owner_ids[row[14]], row[15]) for row in transactions]
+            stats['transactions'] = _upsert(cur, 'transaction', rows, _MATCH_EXISTING_SQL)
+    return stats
+
+
+def backfill(conn):
+    """Fill the numeric columns of existing transactions from their text columns"""
+    with conn.cursor(name='openinsider_text') as cur:
+        cur.itersize = 50_000
+        cur.execute(f'SELECT "id", "quantity", "shares_held", "owned", "value" FROM "{_TX_TABLE}"')
+        rows = cur.fetchall()
+    if not rows:
+        return 0
+    ids, quantity, held, owned, value = zip(*rows)
+    updates = list(zip(ids, parse_column(quantity, parse_integer), parse_column(held, parse_integer),
+                       parse_column(owned), parse_column(value)))
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute('CREATE TEMP TABLE oi_numeric_stage ("id" text, "quantity_numeric" bigint, '
+                        '"shares_held_numeric" bigint, "owned_pct" numeric, "value_numeric" numeric) ON COMMIT DROP')
+            cur.copy_expert(f'COPY oi_numeric_stage ({quoted_columns(NUMERIC_COLUMNS)}) FROM STDIN',
+                            io.StringIO(copy_text_rows(updates)))
+            cur.execute(f'UPDATE "{_TX_TABLE}" t SET '
+                        + ', '.join(f'"{c}" = s."{c}"' for c in NUMERIC_COLUMNS[1:])
+                        + ' FROM oi_numeric_stage s WHERE t."id" = s."id" AND ('
+                        + ' OR '.join(f't."{c}" IS DISTINCT FROM s."{c}"' for c in NUMERIC_COLUMNS[1:]) + ')')
+            return cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load OpenInsider CSV exports with parsed numeric columns')
+    parser.add_argument('files', nargs='*', help='OpenInsider CSV exports')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--backfill', action='store_true', help='parse the text columns of rows already loaded')
+    parser.add_argument('--dry-run', action='store_true', help='parse only, write nothing')
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.dsn:
+        print('❌ Set DATABASE_URL or pass --dsn (or use --dry-run)')
+        sys.exit(1)
+    if not args.files and not args.backfill:
+        parser.error('give CSV files to load, or --backfill')
+
+    conn = None if args.dry_run else require_psycopg2().connect(args.dsn)
+    try:
+        for path in args.files:
+            start = time.time()
+            print(f'📁 {path}')
+            columns, skipped = drop_undated(read_export(path))
+            companies, owners, transactions = build_rows(columns)
+            unparsed = sum(1 for row in transactions if row[8] and row[9] is None)
+            print(f'   {len(columns["ticker"])} rows -> {len(companies)} companies, {len(owners)} owners, '
+                  f'{len(transactions)} transactions ({unparsed} values not numeric) in {time.time() - start:.2f}s')
+            if skipped:
+                print(f'   ⚠️  Skipped {len(skipped)} rows without a valid transaction and trade date, e.g. '
+                      + '; '.join(f'{t} / {o}: {a!r}, {b!r}' for t, o, a, b in skipped[:3]))
+            if conn is None:
+                continue
+            stats = load(conn, companies, owners, transactions)
+            for table, (inserted, updated) in stats.items():
+                print(f'   ✅ {table}: {inserted} inserted, {updated} updated')
+            print(f'   Time: {time.time() - start:.2f}s')
+        if args.backfill and conn is not None:
+            start = time.time()
+            print(f'🔢 Backfilled numeric columns of {backfill(conn)} transactions in {time.time() - start:.2f}s')
+    finally:
+        if conn is not None:
+            conn.close()
+
+if __name__ == '__main__':
+    main()
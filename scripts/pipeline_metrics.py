@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and volume metrics for the ETL scripts.
+
+A PipelineMetrics records, for each stage of a run (parse, filter, dedup,
+batch, load), its wall time, rows in and out, bytes read and written, and the
+process's peak RSS when the stage finished. Stages come in two shapes:
+
+    with metrics.stage('batch') as stage:         # a block of work
+        ...
+        stage.bytes_written += n
+
+    records = metrics.iter_stage('parse', iter_trades(path))   # a streaming step
+
+Streaming steps are timed only while they produce their next row, and the time
+a stage spends waiting on the stages feeding it is reported separately, so
+self_seconds says where a run actually spends its time even though the stages
+run interleaved. Every finished stage is appended as one JSON line to the
+metrics file, and summary_table() prints the run as a table.
+
+With profile='cprofile' (or 'pyinstrument', if installed) each stage() block
+is profiled on its own and the profile written to profile_dir; streaming steps
+are profiled as part of the block that consumes them.
+
+Usage:
+    python scripts/pipeline_metrics.py web/metrics.jsonl [--run RUN_ID]    # summary of a recorded run (default: the last)
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+PROFILERS = ('cprofile', 'pyinstrument')
+DEFAULT_PROFILE_DIR = 'profiles'
+
+
+def _pyinstrument():
+    try:
+        import pyinstrument
+    except ImportError:
+        raise ImportError('pyinstrument is required for --profile pyinstrument: pip install pyinstrument')
+    return pyinstrument
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+class StageMetrics:
+    """Counters for one stage; callers add to rows_in/bytes_read/bytes_written as they go"""
+
+    def __init__(self, name, upstream=None, **extra):
+        self.name = name
+        self.upstream = upstream
+        self.extra = extra
+        self.started_at = None
+        self.wall_seconds = 0.0
+        self.child_seconds = 0.0
+        self.rows_in = None
+        self.rows_out = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+        self._rss_start = None
+        self._profiler = None
+        self._started = None
+
+    @property
+    def self_seconds(self):
+        return max(self.wall_seconds - self.child_seconds, 0.0)
+
+    def as_dict(self):
+        rows_in = self.rows_in
+        if rows_in is None and self.upstream is not None:
+            rows_in = self.upstream.rows_out
+        return {
+            'stage': self.name,
+            'started_at': self.started_at,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'self_seconds': round(self.self_seconds, 6),
+            'rows_in': rows_in,
+            'rows_out': self.rows_out,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            'rss_growth_mb': round(self.rss_growth_mb, 1) if self.rss_growth_mb is not None else None,
+            **self.extra,
+        }
+
+
+class PipelineMetrics:
+    """Collects StageMetrics for one run and writes each finished stage to a JSONL file"""
+
+    def __init__(self, path=None, run_id=None, script=None, profile=None, profile_dir=DEFAULT_PROFILE_DIR):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f'Unknown profiler {profile!r}; expected one of {PROFILERS}')
+        self.path = path
+        self.run_id = run_id or time.strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        self.script = script or os.path.basename(sys.argv[0])
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages = []
+        self._active = []
+
+    def _begin(self, stage):
+        stage.started_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        stage._rss_start = peak_rss_mb()
+        self.stages.append(stage)
+
+    def _finish(self, stage):
+        stage.peak_rss_mb = peak_rss_mb()
+        stage.rss_growth_mb = stage.peak_rss_mb - stage._rss_start
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            entry = {'run': self.run_id, 'script': self.script, **stage.as_dict()}
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+
+    def _charge(self, stage, seconds):
+        stage.wall_seconds += seconds
+        if self._active:
+            self._active[-1].child_seconds += seconds
+
+    @contextmanager
+    def stage(self, name, upstream=None, **extra):
+        """Time a block of work as one stage; yields its StageMetrics"""
+        stage = self.begin_stage(name, upstream, **extra)
+        try:
+            yield stage
+        finally:
+            self.end_stage(stage)
+
+    def begin_stage(self, name, upstream=None, **extra):
+        """Start timing a stage that end_stage() closes, for code that is not one block"""
+        stage = StageMetrics(name, upstream, **extra)
+        self._begin(stage)
+        stage._profiler = self._start_profiler()
+        self._active.append(stage)
+        stage._started = time.perf_counter()
+        return stage
+
+    def end_stage(self, stage):
+        elapsed = time.perf_counter() - stage._started
+        self._active.remove(stage)
+        self._charge(stage, elapsed)
+        self._stop_profiler(stage._profiler, stage.name)
+        self._finish(stage)
+
+    def iter_stage(self, name, iterable, upstream=None, **extra):
+        """Pass an iterable through, timing only its own next() calls and counting rows out.
+
+        The stage is registered right away, so metrics.get(name) can add bytes
+        or rows_in to it before the rows start flowing.
+        """
+        stage = StageMetrics(name, upstream, **extra)
+        self._begin(stage)
+        return self._iterate(stage, iter(iterable))
+
+    def _iterate(self, stage, iterator):
+        try:
+            while True:
+                self._active.append(stage)
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = time.perf_counter() - started
+                    self._active.pop()
+                    self._charge(stage, elapsed)
+                stage.rows_out += 1
+                yield item
+        finally:
+            self._finish(stage)
+
+    def get(self, name):
+        """The last stage recorded under name, or None"""
+        for stage in reversed(self.stages):
+            if stage.name == name:
+                return stage
+        return None
+
+    def _start_profiler(self):
+        if self.profile == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == 'pyinstrument':
+            profiler = _pyinstrument().Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profiler(self, profiler, name):
+        if profiler is None:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, f'{self.run_id}-{name}')
+        if self.profile == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(base + '.prof')
+        else:
+            profiler.stop()
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                f.write(profiler.output_text())
+
+    def summary_table(self):
+        return summary_table([stage.as_dict() for stage in self.stages])
+
+    def print_summary(self):
+        print(f'\n⏱️  Stage metrics (run {self.run_id})')
+        print(self.summary_table())
+        if self.path:
+            print(f'   Metrics: {self.path}')
+
+
+def _mb(count):
+    return f'{count / 2 ** 20:,.1f}' if count else '-'
+
+
+def summary_table(entries):
+    """Fixed-width table of stage dicts (as written to the metrics file)"""
+    lines = [f'{"stage":<12} {"wall s":>9} {"self s":>9} {"rows in":>11} {"rows out":>11} '
+             f'{"rows/s":>10} {"read MB":>9} {"written MB":>10} {"peak MB":>8}']
+    for entry in entries:
+        rate = entry['rows_out'] / entry['self_seconds'] if entry['self_seconds'] else 0
+        rows_in = f'{entry["rows_in"]:,}' if entry['rows_in'] is not None else '-'
+        peak = f'{entry["peak_rss_mb"]:,.0f}' if entry['peak_rss_mb'] is not None else '-'
+        lines.append(f'{entry["stage"]:<12} {entry["wall_seconds"]:>9.2f} {entry["self_seconds"]:>9.2f} '
+                     f'{rows_in:>11} {entry["rows_out"]:>11,} {rate:>10,.0f} {_mb(entry["bytes_read"]):>9} '
+                     f'{_mb(entry["bytes_written"]):>10} {peak:>8}')
+    return '\n'.join(lines)
+
+
+def read_metrics(path, run_id=None):
+    """Stage entries of one run from a metrics file (default: the last run in it)"""
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries:
+        return None, []
+    run_id = run_id or entries[-1]['run']
+    return run_id, [entry for entry in entries if entry['run'] == run_id]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a run recorded in a metrics JSONL file')
+    parser.add_argument('path', nargs='?', default='web/metrics.jsonl')
+    parser.add_argument('--run', help='run ID (default: the last run in the file)')
+    args = parser.parse_args()
+
+    run_id, entries = read_metrics(args.path, args.run)
+    if not entries:
+        print(f'❌ No stage metrics for {args.run or "any run"} in {args.path}')
+        sys.exit(1)
+    print(f'⏱️  Run {run_id} ({entries[0].get("script")}, started {entries[0]["started_at"]})')
+    print(summary_table(entries))
+
+if __name__ == '__main__':
+    main()
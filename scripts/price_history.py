@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Daily OHLCV ingest into "PriceHistory" with rolling statistics computed in NumPy.
+
+Input is CSV (one file per symbol named SYMBOL.csv with Yahoo-style
+Date,Open,High,Low,Close,Adj Close,Volume columns, or one long file with a
+symbol/ticker column) or Parquet with the same columns. The inputs are first
+indexed by the symbols they hold, then loaded --group-symbols symbols at a
+time: each group's bars (and only its bars, so a long file is re-read per
+group) are read into typed arrays sorted by (symbol, date), and each rolling
+field is a handful of whole-array operations over the group; windows never
+reach back into the previous symbol, so groups are independent:
+
+    price_change_1d / 1w / 1m   close vs 1 / 5 / 21 trading days earlier, in %
+    volume_avg_30d              mean volume over the last 30 trading days
+    high_52w / low_52w          highest high / lowest low over 252 trading days
+
+The 52-week extremes use the van Herk/Gil-Werman block algorithm (two running
+max/min passes over fixed blocks), so they cost the same for any window.
+Every (symbol, date) not yet stored is inserted, keyed on @@unique([symbol,
+date]) with ON CONFLICT DO NOTHING; a stored bar wins over an input bar for the
+same date. For a symbol whose input only extends its history, the last 252
+stored rows are read back so the windows of the new rows are complete. For a
+symbol with a missing input bar dated on or before its last stored one (a
+backfill), its whole stored history is read back instead, and stored rows
+whose rolling fields change because of the older bars are updated as well.
+Symbols that are not an Issuer ticker are skipped (PriceHistory.symbol
+references Issuer.ticker). Every group is COPYed into the same staging tables
+and inserted and updated from there at the end, in one transaction.
+
+Requires numpy (pip install numpy); Parquet input also needs pyarrow.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/price_history.py prices/ [more.csv ...] [--group-symbols 100]
+    python scripts/price_history.py prices/ --dry-run
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from array import array
+
+from model_ids import new_cuids
+from pg_loader import fetch_rows, quoted_columns, require_psycopg2
+from trade_sql import copy_text_rows
+
+TRADING_DAYS = {'1d': 1, '1w': 5, '1m': 21}
+VOLUME_WINDOW = 30
+YEAR_WINDOW = 252
+DEFAULT_COPY_ROWS = 200_000
+# 100 symbols x 10 years is about 250k bars per group
+DEFAULT_GROUP_SYMBOLS = 100
+
+FIELDS = ('open', 'high', 'low', 'close', 'adjusted_close', 'volume')
+_ALIASES = {
+    'date': 'date', 'symbol': 'symbol', 'ticker': 'symbol',
+    'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume',
+    'adj_close': 'adjusted_close', 'adjclose': 'adjusted_close', 'adjusted_close': 'adjusted_close',
+}
+COLUMNS = ('id', 'symbol', 'date', 'open', 'high', 'low', 'close', 'volume', 'adjusted_close',
+           'price_change_1d', 'price_change_1w', 'price_change_1m', 'volume_avg_30d', 'high_52w', 'low_52w')
+
+_STAGE_SQL = 'CREATE TEMP TABLE price_stage (LIKE "PriceHistory" INCLUDING DEFAULTS) ON COMMIT DROP'
+_INSERT_SQL = (f'INSERT INTO "PriceHistory" ({quoted_columns(COLUMNS)}) SELECT {quoted_columns(COLUMNS)} FROM price_stage '
+               f'ON CONFLICT ("symbol", "date") DO NOTHING')
+DERIVED_COLUMNS = COLUMNS[9:]
+_STORED_FIELDS = FIELDS + DERIVED_COLUMNS
+_STORED_SQL = f"""
+SELECT t."id", t."symbol", to_char(t."date", 'YYYY-MM-DD'), {', '.join(f't."{f}"::float8' for f in _STORED_FIELDS)}
+FROM unnest(%s::text[]) s("symbol")
+CROSS JOIN LATERAL (
+    SELECT * FROM "PriceHistory" p WHERE p."symbol" = s."symbol" ORDER BY p."date" DESC {{limit}}
+) t
+"""
+_TAIL_SQL = _STORED_SQL.format(limit=f'LIMIT {YEAR_WINDOW}')
+_HISTORY_SQL = _STORED_SQL.format(limit='')
+_LAST_DATES_SQL = ('SELECT "symbol", to_char(MAX("date"), \'YYYY-MM-DD\') FROM "PriceHistory" '
+                   'WHERE "symbol" = ANY(%s) GROUP BY "symbol"')
+_MISSING_SQL = """
+SELECT DISTINCT i."symbol" FROM unnest(%s::text[], %s::date[]) i("symbol", "date")
+WHERE NOT EXISTS (SELECT 1 FROM "PriceHistory" p WHERE p."symbol" = i."symbol" AND p."date" = i."date")
+"""
+_UPDATE_STAGE_SQL = ('CREATE TEMP TABLE price_update_stage ("id" text, '
+                     + ', '.join(f'"{c}" numeric' for c in DERIVED_COLUMNS) + ') ON COMMIT DROP')
+_UPDATE_SQL = ('UPDATE "PriceHistory" p SET ' + ', '.join(f'"{c}" = s."{c}"' for c in DERIVED_COLUMNS)
+               + ' FROM price_update_stage s WHERE p."id" = s."id"')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for price history ingest: pip install numpy')
+    return numpy
+
+
+def _column_name(name):
+    return _ALIASES.get(name.strip().lower().replace(' ', '_'))
+
+
+def _float(text):
+    text = (text or '').strip().replace(',', '')
+    if not text or text.lower() in ('null', 'nan', 'n/a'):
+        return float('nan')
+    return float(text)
+
+
+def iter_input_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(('.csv', '.parquet')):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def _symbol_column(names):
+    for name in names:
+        if _column_name(name) == 'symbol':
+            return name
+    return None
+
+
+def file_symbols(path):
+    """Symbols with bars in one input file, reading only its symbol column (if it has one)"""
+    default_symbol = os.path.splitext(os.path.basename(path))[0].upper()
+    if path.lower().endswith('.parquet'):
+        from export_parquet import _pyarrow
+        pq = _pyarrow().parquet
+        column = _symbol_column(pq.read_schema(path).names)
+        if column is None:
+            return {default_symbol}
+        return {str(s).strip().upper() for s in pq.read_table(path, columns=[column]).column(0).unique().to_pylist()
+                if s is not None}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        column = _symbol_column(header)
+        if column is None:
+            return {default_symbol}
+        i = header.index(column)
+        return {row[i].strip().upper() for row in reader if len(row) > i}
+
+
+def index_inputs(paths):
+    """{path: symbols} for every input file, in input order"""
+    return {path: file_symbols(path) for path in iter_input_files(paths)}
+
+
+def iter_symbol_groups(index, symbols, size):
+    """(group symbols, [paths holding any of them]) for sorted runs of `size` symbols; paths keep input order"""
+    symbols = sorted(symbols)
+    for i in range(0, len(symbols), size):
+        group = set(symbols[i:i + size])
+        yield group, [path for path, held in index.items() if held & group]
+
+
+def read_prices(np, path, symbols=None):
+    """{symbol, date, open, ...: array} for one CSV or Parquet file, only for `symbols` if given"""
+    default_symbol = os.path.splitext(os.path.basename(path))[0].upper()
+    if path.lower().endswith('.parquet'):
+        from export_parquet import _pyarrow
+        pa = _pyarrow()
+        table = pa.parquet.read_table(path)
+        columns = {_column_name(k): k for k in table.column_names if _column_name(k)}
+        data = {'date': np.array([str(d)[:10] for d in table.column(columns['date']).to_pylist()],
+                                 dtype='datetime64[D]')}
+        if 'symbol' in columns:
+            data['symbol'] = np.char.upper(np.char.strip(np.asarray(
+                table.column(columns['symbol']).cast(pa.string()).fill_null('').to_numpy(zero_copy_only=False),
+                dtype=str)))
+        for field in FIELDS:
+            data[field] = (table.column(columns[field]).cast(pa.float64()).to_numpy(zero_copy_only=False)
+                           if field in columns else np.full(len(data['date']), np.nan))
+        if 'symbol' in data and symbols is not None:
+            keep = np.isin(data['symbol'], np.asarray(sorted(symbols), dtype=str))
+            data = {k: v[keep] for k, v in data.items()}
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = [_column_name(h) for h in next(reader)]
+            positions = {name: i for i, name in enumerate(header) if name}
+            date_at, symbol_at = positions['date'], positions.get('symbol')
+            fields = [(array('d'), positions.get(field)) for field in FIELDS]
+            dates, row_symbols = [], []
+            for row in reader:
+                if not row:
+                    continue
+                if symbol_at is not None:
+                    symbol = row[symbol_at].strip().upper() if symbol_at < len(row) else ''
+                    if symbols is not None and symbol not in symbols:
+                        continue
+                    row_symbols.append(symbol)
+                dates.append(row[date_at].strip()[:10] if date_at < len(row) else '')
+                for values, i in fields:
+                    values.append(_float(row[i]) if i is not None and i < len(row) else float('nan'))
+        data = {'date': np.array(dates, dtype='datetime64[D]')}
+        if symbol_at is not None:
+            data['symbol'] = np.array(row_symbols, dtype=str)
+        for field, (values, _) in zip(FIELDS, fields):
+            data[field] = np.frombuffer(values, dtype=float) if values else np.empty(0)
+    if 'symbol' not in data:
+        data['symbol'] = np.full(len(data['date']), default_symbol)
+    return data
+
+
+class PriceArrays:
+    """Columns of daily bars as NumPy arrays, sorted by (symbol, date) with group bookkeeping"""
+
+    def __init__(self, np, symbol, date, fields, is_new):
+        self.np = np
+        order = np.lexsort((date, symbol))
+        self.symbol, self.date, self.is_new = symbol[order], date[order], is_new[order]
+        self.fields = {name: values[order] for name, values in fields.items()}
+        n = len(self.symbol)
+        boundary = np.ones(n, dtype=bool)
+        if n:
+            boundary[1:] = self.symbol[1:] != self.symbol[:-1]
+        self.starts = np.flatnonzero(boundary)
+        self.sizes = np.diff(np.append(self.starts, n))
+        # Index of each row's first row in its symbol
+        self.row_start = np.repeat(self.starts, self.sizes)
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def pct_change(self, values, periods):
+        np = self.np
+        idx = np.arange(len(values))
+        prev = idx - periods
+        valid = prev >= self.row_start
+        base = values[np.where(valid, prev, idx)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (values / base - 1) * 100
+        return np.where(valid & (base != 0), np.round(change, 4), np.nan)
+
+    def rolling_mean(self, values, window):
+        """Trailing mean of whole numbers (volumes), skipping NaN; summed in int64 so long arrays stay exact"""
+        np = self.np
+        present = ~np.isnan(values)
+        sums = np.concatenate(([0], np.cumsum(np.where(present, values, 0).astype(np.int64))))
+        counts = np.concatenate(([0], np.cumsum(present)))
+        idx = np.arange(len(values))
+        lo = np.maximum(idx - window + 1, self.row_start)
+        total, count = sums[idx + 1] - sums[lo], counts[idx + 1] - counts[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(count > 0, np.round(total / count, 2), np.nan)
+
+    def rolling_extreme(self, values, window, fn):
+        """Trailing max (fn=np.fmax) or min (np.fmin) over `window` rows of the same symbol"""
+        np = self.np
+        n, pad = len(values), window - 1
+        if not n:
+            return values
+        # window - 1 NaN slots before every symbol keep windows inside it; fmax/fmin skip NaN
+        positions = np.arange(n) + np.repeat(np.arange(1, len(self.starts) + 1) * pad, self.sizes)
+        blocks = -(-(positions[-1] + 1) // window)
+        grid = np.full(blocks * window, np.nan)
+        grid[positions] = values
+        grid = grid.reshape(blocks, window)
+        prefix = fn.accumulate(grid, axis=1).ravel()
+        suffix = fn.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+        return fn(suffix[positions - pad], prefix[positions])
+
+    def rolling_fields(self):
+        """{column: array} of every derived PriceHistory column"""
+        np = self.np
+        close, volume = self.fields['close'], self.fields['volume']
+        high = np.where(np.isnan(self.fields['high']), close, self.fields['high'])
+        low = np.where(np.isnan(self.fields['low']), close, self.fields['low'])
+        derived = {f'price_change_{name}': self.pct_change(close, periods) for name, periods in TRADING_DAYS.items()}
+        derived['volume_avg_30d'] = self.rolling_mean(volume, VOLUME_WINDOW)
+        derived['high_52w'] = self.rolling_extreme(high, YEAR_WINDOW, np.fmax)
+        derived['low_52w'] = self.rolling_extreme(low, YEAR_WINDOW, np.fmin)
+        return derived
+
+
+def _nullable(values, integer=False):
+    """Array -> list with NaN as None (and whole numbers as int)"""
+    if integer:
+        return [None if v != v else int(v) for v in values.tolist()]
+    return [None if v != v else v for v in values.tolist()]
+
+
+def new_rows(prices, derived):
+    """PriceHistory rows (COLUMNS order) for the rows flagged new"""
+    np = prices.np
+    keep = np.flatnonzero(prices.is_new)
+    columns = [
+        prices.symbol[keep].tolist(),
+        np.datetime_as_string(prices.date[keep], unit='D').tolist(),
+        *(_nullable(prices.fields[f][keep]) for f in ('open', 'high', 'low', 'close')),
+        _nullable(prices.fields['volume'][keep], integer=True),
+        _nullable(prices.fields['adjusted_close'][keep]),
+        *(_nullable(derived[c][keep]) for c in DERIVED_COLUMNS),
+    ]
+    return [(row_id, *row) for row_id, row in zip(new_cuids(len(keep)), zip(*columns))]
+
+
+def changed_rows(prices, derived):
+    """(id, *DERIVED_COLUMNS) for stored rows of backfilled symbols whose rolling fields changed"""
+    np = prices.np
+    changed = np.zeros(len(prices), dtype=bool)
+    for c in DERIVED_COLUMNS:
+        new, old = derived[c], prices.fields[f'stored_{c}']
+        changed |= ~((new == old) | (np.isnan(new) & np.isnan(old)))
+    keep = np.flatnonzero(changed & prices.fields['recompute'])
+    columns = [prices.fields['id'][keep].tolist(), *(_nullable(derived[c][keep]) for c in DERIVED_COLUMNS)]
+    return list(zip(*columns))
+
+
+def build_arrays(np, batches, tails=(), histories=(), stored_through=None):
+    """PriceArrays from input batches plus stored tails and full histories.
+
+    Rows of a history batch have their stored rolling fields compared with the
+    recomputed ones (changed_rows); tails only complete the windows.
+    stored_through maps symbols whose every bar up to that date is stored, so
+    older input bars are dropped rather than computed over a partial window.
+    """
+    symbols, dates, is_new, recompute, ids = [], [], [], [], []
+    fields = {f: [] for f in FIELDS}
+    stored = {c: [] for c in DERIVED_COLUMNS}
+    parts = [(b, True, False) for b in batches] + [(t, False, False) for t in tails] + \
+            [(h, False, True) for h in histories]
+    for batch, new, full in parts:
+        n = len(batch['date'])
+        symbols.append(np.asarray(batch['symbol'], dtype=str))
+        dates.append(np.asarray(batch['date'], dtype='datetime64[D]'))
+        is_new.append(np.full(n, new))
+        recompute.append(np.full(n, full))
+        ids.append(np.asarray(batch['id'] if full else [''] * n, dtype=object))
+        for f in FIELDS:
+            fields[f].append(np.asarray(batch[f], dtype=float))
+        for c in DERIVED_COLUMNS:
+            stored[c].append(np.asarray(batch[c], dtype=float) if full else np.full(n, np.nan))
+    if not symbols:
+        return None
+    symbol, date, flags = np.concatenate(symbols), np.concatenate(dates), np.concatenate(is_new)
+    fields = {f: np.concatenate(v) for f, v in fields.items()}
+    fields.update({f'stored_{c}': np.concatenate(v) for c, v in stored.items()})
+    fields['recompute'] = np.concatenate(recompute)
+    fields['id'] = np.concatenate(ids)
+    keep = ~np.isnan(fields['close'])
+    if stored_through:
+        last = np.array([stored_through.get(s, '0001-01-01') for s in symbol.tolist()], dtype='datetime64[D]')
+        keep &= ~flags | (date > last)
+    # One row per (symbol, date): the last input row wins, and a stored row (later in the arrays) beats them all
+    rows = np.flatnonzero(keep)
+    rows = rows[np.lexsort((-rows, date[rows], symbol[rows]))]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (symbol[rows[1:]] != symbol[rows[:-1]]) | (date[rows[1:]] != date[rows[:-1]])
+    keep = rows[first]
+    return PriceArrays(np, symbol[keep], date[keep], {f: v[keep] for f, v in fields.items()}, flags[keep])
+
+
+def fetch_last_dates(conn, symbols):
+    """{symbol: last stored date} for the symbols that have stored bars"""
+    with conn.cursor() as cur:
+        cur.execute(_LAST_DATES_SQL, (sorted(symbols),))
+        return dict(cur.fetchall())
+
+
+def fetch_stored(conn, symbols, full=False):
+    """Stored bars of symbols as one batch: the last YEAR_WINDOW of each, or all of them with full"""
+    with conn.cursor() as cur:
+        cur.execute(_HISTORY_SQL if full else _TAIL_SQL, (sorted(symbols),))
+        rows = cur.fetchall()
+    batch = {'id': [r[0] for r in rows], 'symbol': [r[1] for r in rows], 'date': [r[2] for r in rows]}
+    for i, f in enumerate(_STORED_FIELDS, start=3):
+        batch[f] = [float('nan') if r[i] is None else r[i] for r in rows]
+    return batch
+
+
+def fetch_backfill_symbols(np, conn, batches, last_dates):
+    """Symbols with an input bar that is not stored yet but dated on or before their last stored date"""
+    pairs = set()
+    for batch in batches:
+        for symbol in np.unique(batch['symbol']).tolist():
+            if symbol not in last_dates:
+                continue
+            rows = (batch['symbol'] == symbol) & (batch['date'] <= np.datetime64(last_dates[symbol]))
+            pairs.update((symbol, day) for day in np.datetime_as_string(batch['date'][rows], unit='D').tolist())
+    if not pairs:
+        return set()
+    symbols, days = zip(*sorted(pairs))
+    with conn.cursor() as cur:
+        cur.execute(_MISSING_SQL, (list(symbols), list(days)))
+        return {symbol for symbol, in cur.fetchall()}
+
+
+def compute_group(np, batches, conn=None):
+    """New PriceHistory rows and changed stored rows for one group of symbols.
+
+    With a connection, stored bars complete the windows (see build_arrays);
+    returns (rows, updates, stored bars read).
+    """
+    tails, histories, stored_through = (), (), None
+    if conn is not None:
+        symbols = set()
+        for batch in batches:
+            symbols.update(np.unique(batch['symbol']).tolist())
+        last_dates = fetch_last_dates(conn, symbols)
+        backfill = fetch_backfill_symbols(np, conn, batches, last_dates)
+        stored_through = {s: d for s, d in last_dates.items() if s not in backfill}
+        tails = (fetch_stored(conn, set(stored_through)),)
+        if backfill:
+            histories = (fetch_stored(conn, backfill, full=True),)
+    stored = sum(len(b['date']) for b in tails + histories)
+    prices = build_arrays(np, batches, tails, histories, stored_through)
+    if prices is None:
+        return [], [], stored
+    derived = prices.rolling_fields()
+    return new_rows(prices, derived), changed_rows(prices, derived), stored
+
+
+def create_stages(cur):
+    """Staging tables every group is COPYed into; they go away with the transaction"""
+    cur.execute(_STAGE_SQL)
+    cur.execute(_UPDATE_STAGE_SQL)
+
+
+def stage_rows(cur, rows, updates=(), copy_rows=DEFAULT_COPY_ROWS):
+    """COPY one group's new rows and changed rolling fields into the staging tables, in chunks"""
+    for i in range(0, len(rows), copy_rows):
+        cur.copy_expert(f'COPY price_stage ({quoted_columns(COLUMNS)}) FROM STDIN',
+                        io.StringIO(copy_text_rows(rows[i:i + copy_rows])))
+    for i in range(0, len(updates), copy_rows):
+        cur.copy_expert(f'COPY price_update_stage ({quoted_columns(("id",) + DERIVED_COLUMNS)}) FROM STDIN',
+                        io.StringIO(copy_text_rows(updates[i:i + copy_rows])))
+
+
+def merge_stages(cur):
+    """Insert the staged (symbol, date) pairs and apply the staged updates; returns (rows inserted, rows updated)"""
+    cur.execute(_INSERT_SQL)
+    inserted = cur.rowcount
+    cur.execute(_UPDATE_SQL)
+    return inserted, cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load daily OHLCV into PriceHistory with rolling statistics')
+    parser.add_argument('inputs', nargs='+', help='CSV/Parquet files or directories of them')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--group-symbols', type=int, default=DEFAULT_GROUP_SYMBOLS,
+                        help='symbols read and computed at a time')
+    parser.add_argument('--dry-run', action='store_true', help='compute only, write nothing')
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.dsn:
+        print('❌ Set DATABASE_URL or pass --dsn (or use --dry-run)')
+        sys.exit(1)
+    np = _numpy()
+
+    start = time.time()
+    index = index_inputs(args.inputs)
+    symbols = set().union(*index.values())
+    print(f'📁 Indexed {len(symbols)} symbols in {len(index)} files in {time.time() - start:.2f}s')
+
+    totals = {'groups': 0, 'input': 0, 'stored': 0, 'rows': 0, 'updates': 0}
+    inserted = updated = 0
+
+    def run_groups(cur=None):
+        for group, paths in iter_symbol_groups(index, symbols, args.group_symbols):
+            started = time.time()
+            batches = [read_prices(np, path, group) for path in paths]
+            rows, updates, stored = compute_group(np, batches, conn)
+            if cur is not None:
+                stage_rows(cur, rows, updates)
+            totals['groups'] += 1
+            totals['input'] += sum(len(b['date']) for b in batches)
+            totals['stored'] += stored
+            totals['rows'] += len(rows)
+            totals['updates'] += len(updates)
+            print(f'   ✅ {len(group)} symbols: {len(rows)} new bars, {len(updates)} stored bars changed '
+                  f'in {time.time() - started:.2f}s ({totals["input"]} bars, {time.time() - start:.1f}s)')
+
+    conn = None if args.dry_run else require_psycopg2().connect(args.dsn)
+    try:
+        if conn is None:
+            run_groups()
+        else:
+            known = {t for t, in fetch_rows(args.dsn, 'Issuer', ('ticker',)) if t}
+            skipped = symbols - known
+            if skipped:
+                print(f'   ⚠️  Skipping {len(skipped)} symbols that are not Issuer tickers: '
+                      f'{", ".join(sorted(skipped)[:10])}{" ..." if len(skipped) > 10 else ""}')
+            symbols &= known
+            with conn:
+                with conn.cursor() as cur:
+                    create_stages(cur)
+                    run_groups(cur)
+                    written = time.time()
+                    inserted, updated = merge_stages(cur)
+            print(f'   ✅ Inserted {inserted} bars, updated {updated} in {time.time() - written:.2f}s')
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print(f'\n🎯 FINAL RESULTS:')
+    print(f'   Input bars: {totals["input"]} in {totals["groups"]} groups ({totals["stored"]} stored bars read)')
+    print(f'   New bars: {totals["rows"]}{" (dry run)" if args.dry_run else f", {inserted} inserted"}')
+    if totals['updates']:
+        print(f'   Stored bars with changed rolling fields: {totals["updates"]}, {updated} updated')
+    print(f'   Time: {time.time() - start:.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Reconcile a database export of "Trade" (Trade.csv) against the local SQL dump.
+
+Both sides are streamed, reduced to (id, content hash, canonical row) entries
+and externally sorted by ID: entries are cut into sorted runs on disk and the
+runs are combined with heapq.merge, so only one run is ever held in memory.
+A single merge pass over the two sorted streams then yields three lists:
+
+    missing_in_db.txt  IDs in the dump but not in the export
+    extra_in_db.txt    IDs in the export but not in the dump
+    changed.jsonl      IDs on both sides whose content hash differs, with the differing fields
+
+The content hash is the canonical one from trade_hash.py, so formatting
+differences between the CSV export and the dump (timestamps, 1000 vs 1000.00,
+jsonb key order) do not show up as changes.
+
+Usage:
+    python scripts/reconcile_trades.py web/Trade.csv [web/all_trades.sql] [--out-dir reconcile] [--run-rows 50000]
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from trade_hash import HASHED_COLUMNS, canonical_hash, canonical_trade
+from trade_record import iter_trades
+
+DEFAULT_RUN_ROWS = 50_000
+
+MISSING_FILE = 'missing_in_db.txt'
+EXTRA_FILE = 'extra_in_db.txt'
+CHANGED_FILE = 'changed.jsonl'
+SUMMARY_FILE = 'reconcile_summary.json'
+
+
+def iter_dump_rows(path):
+    """(id, row) pairs from an INSERT dump"""
+    for record in iter_trades(path):
+        yield record.id, record.as_tuple()
+
+
+def iter_csv_rows(path):
+    """(id, row) pairs from a CSV export with a header row of column names"""
+    csv.field_size_limit(sys.maxsize)
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            trade_id = (row.get('id') or '').strip()
+            if trade_id:
+                yield trade_id, row
+
+
+def _entry_line(trade_id, seq, row):
+    canonical = canonical_trade(row)
+    fields = json.dumps(canonical, separators=(',', ':'), ensure_ascii=False)
+    # json.dumps escapes tabs and newlines, so one entry is always one line; the
+    # zero-padded input position sorts repeated IDs in input order
+    return f'{trade_id}\t{seq:012d}\t{canonical_hash(canonical)}\t{fields}\n'
+
+
+def _parse_line(line):
+    trade_id, _, content_hash, fields = line.rstrip('\n').split('\t', 3)
+    return trade_id, content_hash, fields
+
+
+def sorted_entries(rows, tmp_dir, run_rows=DEFAULT_RUN_ROWS):
+    """Yield (id, hash, canonical_json) sorted by ID using sorted runs on disk.
+
+    Lines start with the ID followed by a tab, which sorts below every digit, so
+    plain string order of the lines is string order of the IDs, and entries
+    with the same ID come out in input order.
+    """
+    run_paths = []
+    run = []
+    for seq, (trade_id, row) in enumerate(rows):
+        run.append(_entry_line(trade_id, seq, row))
+        if len(run) >= run_rows:
+            run.sort()
+            path = os.path.join(tmp_dir, f'run_{len(run_paths):05d}.tsv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(run)
+            run_paths.append(path)
+            run = []
+    run.sort()
+
+    if not run_paths:
+        for line in run:
+            yield _parse_line(line)
+        return
+
+    files = [open(path, encoding='utf-8') for path in run_paths]
+    try:
+        for line in heapq.merge(run, *files):
+            yield _parse_line(line)
+    finally:
+        for f in files:
+            f.close()
+
+
+def _dedupe_sorted(entries, counter, side):
+    """Drop repeated IDs from a sorted stream, keeping the first and counting the rest"""
+    last_id = None
+    for entry in entries:
+        if entry[0] == last_id:
+            counter[side] += 1
+            continue
+        last_id = entry[0]
+        yield entry
+
+
+def merge_diff(local, remote):
+    """Merge two ID-sorted entry streams into ('missing' | 'extra' | 'changed' | 'same', local, remote)"""
+    local = iter(local)
+    remote = iter(remote)
+    left = next(local, None)
+    right = next(remote, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[0] < right[0]):
+            yield 'missing', left, None
+            left = next(local, None)
+        elif left is None or right[0] < left[0]:
+            yield 'extra', None, right
+            right = next(remote, None)
+        else:
+            yield ('same' if left[1] == right[1] else 'changed'), left, right
+            left = next(local, None)
+            right = next(remote, None)
+
+
+def changed_fields(local_fields, remote_fields):
+    """{column: {"dump": value, "db": value}} for every column whose canonical value differs"""
+    local_values = json.loads(local_fields)
+    remote_values = json.loads(remote_fields)
+    return {column: {'dump': a, 'db': b}
+            for column, a, b in zip(HASHED_COLUMNS, local_values, remote_values) if a != b}
+
+
+def reconcile(export_path, dump_path, out_dir='reconcile', run_rows=DEFAULT_RUN_ROWS):
+    """Diff a CSV export against the dump, write the three lists to out_dir and return a summary"""
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    counts = {'missing_in_db': 0, 'extra_in_db': 0, 'changed': 0, 'unchanged': 0}
+    duplicates = {'dump': 0, 'export': 0}
+    tmp_dir = tempfile.mkdtemp(prefix='reconcile_', dir=out_dir)
+    try:
+        local_dir = os.path.join(tmp_dir, 'dump')
+        remote_dir = os.path.join(tmp_dir, 'export')
+        os.makedirs(local_dir)
+        os.makedirs(remote_dir)
+        local = _dedupe_sorted(sorted_entries(iter_dump_rows(dump_path), local_dir, run_rows), duplicates, 'dump')
+        remote = _dedupe_sorted(sorted_entries(iter_csv_rows(export_path), remote_dir, run_rows),
+                                duplicates, 'export')
+
+        with open(os.path.join(out_dir, MISSING_FILE), 'w') as missing, \
+                open(os.path.join(out_dir, EXTRA_FILE), 'w') as extra, \
+                open(os.path.join(out_dir, CHANGED_FILE), 'w', encoding='utf-8') as changed:
+            for kind, left, right in merge_diff(local, remote):
+                if kind == 'missing':
+                    counts['missing_in_db'] += 1
+                    missing.write(f'{left[0]}\n')
+                elif kind == 'extra':
+                    counts['extra_in_db'] += 1
+                    extra.write(f'{right[0]}\n')
+                elif kind == 'changed':
+                    counts['changed'] += 1
+                    changed.write(json.dumps({
+                        'id': left[0], 'dump_hash': left[1], 'db_hash': right[1],
+                        'fields': changed_fields(left[2], right[2]),
+                    }, ensure_ascii=False) + '\n')
+                else:
+                    counts['unchanged'] += 1
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    summary = {
+        'export': export_path,
+        'dump': dump_path,
+        'dump_trades': counts['missing_in_db'] + counts['changed'] + counts['unchanged'],
+        'export_trades': counts['extra_in_db'] + counts['changed'] + counts['unchanged'],
+        **counts,
+        'duplicate_ids': duplicates,
+        'missing_path': os.path.join(out_dir, MISSING_FILE),
+        'extra_path': os.path.join(out_dir, EXTRA_FILE),
+        'changed_path': os.path.join(out_dir, CHANGED_FILE),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    with open(os.path.join(out_dir, SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff a Trade CSV export against the local SQL dump')
+    parser.add_argument('export', help='CSV export of the "Trade" table')
+    parser.add_argument('dump', nargs='?', default='web/all_trades.sql')
+    parser.add_argument('--out-dir', default='reconcile')
+    parser.add_argument('--run-rows', type=int, default=DEFAULT_RUN_ROWS,
+                        help='entries per sorted run held in memory')
+    args = parser.parse_args()
+
+    print(f'🔍 Reconciling {args.export} against {args.dump}')
+    summary = reconcile(args.export, args.dump, args.out_dir, args.run_rows)
+
+    print(f'\n📋 SUMMARY:')
+    print(f'  Database export: {summary["export_trades"]} trades')
+    print(f'  Local dump: {summary["dump_trades"]} trades')
+    print(f'  Missing in DB: {summary["missing_in_db"]} ({summary["missing_path"]})')
+    print(f'  Extra in DB: {summary["extra_in_db"]} ({summary["extra_path"]})')
+    print(f'  Changed: {summary["changed"]} ({summary["changed_path"]})')
+    print(f'  Unchanged: {summary["unchanged"]}')
+    if summary['duplicate_ids']['dump'] or summary['duplicate_ids']['export']:
+        print(f'  ⚠️  Repeated IDs skipped: {summary["duplicate_ids"]["dump"]} in dump, '
+              f'{summary["duplicate_ids"]["export"]} in export')
+    print(f'  Time: {summary["seconds"]:.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Append-only scrape checkpoints: JSON Lines segments plus a small manifest.
+
+The issuer scrape used to dump the full list every 25 pages into
+backups/issuers_progress_{N}_pages_*.json, so each checkpoint rewrote everything
+before it and recovery meant parsing the biggest file. Here a checkpoint only
+appends the rows of the pages just scraped to the current segment and rewrites
+manifest.json (last completed page plus the committed length of each segment),
+so checkpointing every page costs O(new rows):
+
+    checkpoints/issuers/
+        manifest.json
+        segment_000001.jsonl    pages 1-100, one row per line
+        segment_000002.jsonl    pages 101-...
+
+Bytes past a segment's committed length (a crash mid-append) are ignored on
+read and overwritten by the next append. Reads stream line by line, and
+compaction folds all segments into one (optionally keeping only the last row
+per key).
+
+Usage:
+    python scripts/scrape_checkpoint.py import backups/issuers_progress_*.json [--dir checkpoints/issuers]
+    python scripts/scrape_checkpoint.py status [--dir checkpoints/issuers]
+    python scripts/scrape_checkpoint.py compact [--dir checkpoints/issuers] [--key id]
+    python scripts/scrape_checkpoint.py export issuers.json [--dir checkpoints/issuers] [--key id]
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+MANIFEST_FILE = 'manifest.json'
+DEFAULT_DIR = 'checkpoints/issuers'
+DEFAULT_SEGMENT_PAGES = 100
+
+_LEGACY_PAGES = re.compile(r'_(\d+)_pages_')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _write_json_atomic(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _dedupe_last(rows, key):
+    """Rows with the last occurrence of each key kept, in first-seen order"""
+    latest = {}
+    for row in rows:
+        latest[row.get(key)] = row
+    return iter(latest.values())
+
+
+class ScrapeCheckpoint:
+    """Checkpoint directory for one scrape: append pages, stream rows back, compact"""
+
+    def __init__(self, directory=DEFAULT_DIR, segment_pages=DEFAULT_SEGMENT_PAGES):
+        self.directory = directory
+        self.segment_pages = segment_pages
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'version': 1, 'last_page': 0, 'rows': 0, 'segments': [], 'updated_at': None}
+
+    @property
+    def last_page(self):
+        """Last page whose rows are safely on disk; resume from last_page + 1"""
+        return self.manifest['last_page']
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, segment['file'])
+
+    def _next_segment_name(self):
+        numbers = [int(s['file'].split('_')[1].split('.')[0]) for s in self.manifest['segments']]
+        return f'segment_{max(numbers, default=0) + 1:06d}.jsonl'
+
+    def _open_segment(self, first_page):
+        segments = self.manifest['segments']
+        current = segments[-1] if segments else None
+        if current is None or first_page - current['first_page'] >= self.segment_pages:
+            current = {'file': self._next_segment_name(), 'first_page': first_page,
+                       'last_page': first_page, 'rows': 0, 'bytes': 0}
+            segments.append(current)
+        return current
+
+    def append(self, rows, page, first_page=None):
+        """Checkpoint the rows of pages first_page..page (default: just page).
+
+        Pages at or below last_page were already checkpointed and are skipped,
+        so a resumed scrape can replay its last page safely. Returns the number
+        of rows written.
+        """
+        if page <= self.last_page:
+            return 0
+        first_page = page if first_page is None else max(first_page, self.last_page + 1)
+        segment = self._open_segment(first_page)
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        count = len(rows) if hasattr(rows, '__len__') else data.count(b'\n')
+
+        path = self._segment_path(segment)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            # Drop anything an interrupted append left past the committed length
+            f.seek(segment['bytes'])
+            f.truncate()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        segment['bytes'] += len(data)
+        segment['rows'] += count
+        segment['last_page'] = page
+        self.manifest['last_page'] = page
+        self.manifest['rows'] += count
+        self.manifest['updated_at'] = _now()
+        _write_json_atomic(self.manifest_path, self.manifest)
+        return count
+
+    def iter_rows(self):
+        """Stream every checkpointed row in scrape order"""
+        for segment in self.manifest['segments']:
+            remaining = segment['bytes']
+            with open(self._segment_path(segment), 'rb') as f:
+                for line in f:
+                    if remaining <= 0:
+                        break
+                    remaining -= len(line)
+                    if remaining < 0:
+                        break
+                    yield json.loads(line)
+
+    def compact(self, key=None):
+        """Fold all segments into one; with key, keep only the last row per key value"""
+        rows = self.iter_rows()
+        if key:
+            # Needs one row per key in memory, which is the size of the result anyway
+            rows = _dedupe_last(rows, key)
+        segments = self.manifest['segments']
+        name = self._next_segment_name()
+        path = os.path.join(self.directory, name)
+        count = 0
+        size = 0
+        with open(f'{path}.tmp', 'wb') as f:
+            for row in rows:
+                data = (json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8')
+                f.write(data)
+                count += 1
+                size += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f'{path}.tmp', path)
+
+        old = [self._segment_path(s) for s in segments]
+        first_page = segments[0]['first_page'] if segments else 1
+        self.manifest['segments'] = [{'file': name, 'first_page': first_page, 'last_page': self.last_page,
+                                      'rows': count, 'bytes': size}]
+        self.manifest['rows'] = count
+        self.manifest['updated_at'] = _now()
+        _write_json_atomic(self.manifest_path, self.manifest)
+        for path in old:
+            os.remove(path)
+        return count
+
+
+def legacy_pages(path):
+    """Page count from a backups/issuers_progress_{N}_pages_*.json name, or None"""
+    match = _LEGACY_PAGES.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def import_legacy(checkpoint, paths):
+    """Append old cumulative snapshots; only rows beyond the checkpoint's row count are new.
+
+    Each snapshot holds every row scraped so far in order, so the pages a later
+    snapshot adds are exactly its rows past the previous snapshot's length.
+    """
+    imported = 0
+    for path in sorted(paths, key=lambda p: legacy_pages(p) or 0):
+        pages = legacy_pages(path)
+        if pages is None or pages <= checkpoint.last_page:
+            continue
+        with open(path) as f:
+            rows = json.load(f)
+        imported += checkpoint.append(rows[checkpoint.rows:], pages, first_page=checkpoint.last_page + 1)
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append-only scrape checkpoints')
+    parser.add_argument('--dir', default=DEFAULT_DIR, help='checkpoint directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help='convert backups/issuers_progress_*.json snapshots')
+    p_import.add_argument('snapshots', nargs='+')
+
+    sub.add_parser('status', help='show the manifest')
+
+    p_compact = sub.add_parser('compact', help='fold segments into one file')
+    p_compact.add_argument('--key', help='keep only the last row per value of this field (e.g. id)')
+
+    p_export = sub.add_parser('export', help='write all rows as one JSON list')
+    p_export.add_argument('output')
+    p_export.add_argument('--key', help='keep only the last row per value of this field (e.g. id)')
+
+    args = parser.parse_args()
+    checkpoint = ScrapeCheckpoint(args.dir)
+
+    if args.command == 'import':
+        imported = import_legacy(checkpoint, args.snapshots)
+        print(f'📥 Imported {imported} rows from {len(args.snapshots)} snapshots into {args.dir}')
+        print(f'   Last page: {checkpoint.last_page}, rows: {checkpoint.rows}')
+
+    elif args.command == 'status':
+        print(f'📒 Checkpoint: {args.dir}')
+        print(f'   Last page: {checkpoint.last_page}')
+        print(f'   Rows: {checkpoint.rows}')
+        print(f'   Segments: {len(checkpoint.manifest["segments"])}')
+        for segment in checkpoint.manifest['segments']:
+            print(f'     {segment["file"]}: pages {segment["first_page"]}-{segment["last_page"]}, '
+                  f'{segment["rows"]} rows, {segment["bytes"]} bytes')
+        print(f'   Updated: {checkpoint.manifest["updated_at"]}')
+
+    elif args.command == 'compact':
+        before = len(checkpoint.manifest['segments'])
+        count = checkpoint.compact(key=args.key)
+        print(f'🗜️  Compacted {before} segments into 1 ({count} rows)')
+
+    elif args.command == 'export':
+        rows = checkpoint.iter_rows()
+        if args.key:
+            rows = _dedupe_last(rows, args.key)
+        count = 0
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for row in rows:
+                f.write(',\n  ' if count else '\n  ')
+                f.write(json.dumps(row, ensure_ascii=False))
+                count += 1
+            f.write('\n]\n')
+        print(f'📤 Exported {count} rows to {args.output}')
+
+if __name__ == '__main__':
+    main()
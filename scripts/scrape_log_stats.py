@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Page latency, retry and idle-wait statistics from scraper logs.
+
+The scrapers log one block per page:
+
+    === Processing issuers page 7 of 268 ===
+    Starting to scrape issuers page 7...
+    Waiting for page content on page 7...
+    Successfully scraped 12 issuers from page 7
+    ✅ Issuers page 7 completed successfully with 12 issuers
+    Waiting 1.2 seconds before next page...
+
+The log is streamed line by line. Lines may start with a timestamp
+('2025-09-23T17:25:51.370Z ...' or '[2025-09-23 17:25:51] ...'), and then each page's
+latency is measured directly: page start to next page start, split into fixed
+sleeps ("Waiting 1.2 seconds"), selector waits ("Waiting for table" until the
+next line) and the rest. scraping.log has no per-line timestamps, only a few
+anchors ("Start time: ...", "Timestamp: ...", "Completed at: ..."). There each
+stretch between two anchors is shared out evenly over its pages after taking
+out the logged sleeps, so latencies are estimates (flagged as such) and pages
+after the last anchor have none. Selector waits cannot be measured there, so
+idle share is left unmeasured, and only the mean latency is reported, since
+every page in a stretch gets the same estimate.
+
+A page seen more than once counts as a retry; error/timeout lines are counted
+against the page they occur in. Reports per-section totals, latency percentiles,
+idle-wait share and a timeline of page buckets.
+
+Usage:
+    python scripts/scrape_log_stats.py [scraping.log ...] [--bucket 250] [--json scrape_stats.json] [--no-timeline]
+"""
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_BUCKET = 250
+PERCENTILES = (50, 90, 99)
+
+_LINE_TIMESTAMP = re.compile(
+    r'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\]?\s+')
+_PAGE = re.compile(r'^=== Processing (?:(\w+) )?page (\d+) of (\d+) ===')
+_SCRAPED = re.compile(r'^Successfully scraped (\d+) \w+ from page (\d+)')
+_COMPLETED = re.compile(r'page (\d+) completed successfully with (\d+)', re.IGNORECASE)
+_SLEEP = re.compile(r'^Waiting ([\d.]+) seconds?')
+_SELECTOR_WAIT = re.compile(r'^Waiting for (?:table|page content) on page \d+')
+_ERROR = re.compile(r'\b(error|failed|timeout|timed out|retry|retrying)\b', re.IGNORECASE)
+_SUMMARY_COUNT = re.compile(r'^(Failed|Successful|Total \w+( scraped)?): ')
+_ISO_ANCHOR = re.compile(r'^(?:Timestamp|Completed at): (\S+)')
+_START_TIME = re.compile(r'Start time: \w{3} (\w{3}) +(\d+) (\d{2}):(\d{2}):(\d{2}) (\w+) (\d{4})')
+
+# date(1) prints zone abbreviations; these are the ones the scrape hosts use
+_ZONES = {'UTC': 0, 'GMT': 0, 'HKT': 8, 'SGT': 8, 'JST': 9, 'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5,
+          'PST': -8, 'PDT': -7, 'BST': 1, 'CET': 1, 'CEST': 2}
+_MONTHS = {m: i + 1 for i, m in enumerate(('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct',
+                                          'Nov', 'Dec'))}
+
+
+def parse_iso(text):
+    text = text.strip().replace(' ', 'T', 1)
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def parse_start_time(match):
+    """'Wed Sep 24 01:25:50 HKT 2025' -> epoch seconds, or None for an unknown zone"""
+    month, day, hour, minute, second, zone, year = match.groups()
+    if zone not in _ZONES or month not in _MONTHS:
+        return None
+    dt = datetime(int(year), _MONTHS[month], int(day), int(hour), int(minute), int(second),
+                  tzinfo=timezone(timedelta(hours=_ZONES[zone])))
+    return dt.timestamp()
+
+
+class PageStats:
+    """One page of one section, across every attempt at it"""
+    __slots__ = ('section', 'page', 'attempts', 'items', 'completed', 'errors', 'sleep_seconds',
+                 'selector_seconds', 'started', 'last_seen', 'latency', 'line_no', 'estimated')
+
+    def __init__(self, section, page, line_no, started):
+        self.section = section
+        self.page = page
+        self.attempts = 0
+        self.items = 0
+        self.completed = False
+        self.errors = 0
+        self.sleep_seconds = 0.0
+        self.selector_seconds = 0.0
+        self.started = started
+        self.last_seen = started
+        self.latency = None
+        self.line_no = line_no
+        self.estimated = False
+
+
+class ScrapeLogParser:
+    """Streams log lines into PageStats, then assigns latencies from timestamps or anchors"""
+
+    def __init__(self):
+        self.pages = {}
+        self.order = []
+        self.anchors = []
+        self.sections = {}
+        self.line_no = 0
+        self.timed_lines = 0
+        self._current = None
+        self._selector_started = None
+
+    def feed(self, line):
+        self.line_no += 1
+        line = line.rstrip('\n')
+        now = None
+        match = _LINE_TIMESTAMP.match(line)
+        if match:
+            try:
+                now = parse_iso(match.group(1))
+                line = line[match.end():]
+                self.timed_lines += 1
+            except ValueError:
+                now = None
+        if now is not None and self._current is not None:
+            if self._selector_started is not None:
+                self._current.selector_seconds += now - self._selector_started
+            self._current.last_seen = now
+        self._selector_started = None
+        line = line.strip()
+        if not line:
+            return
+
+        match = _PAGE.match(line)
+        if match:
+            section = (match.group(1) or 'trades').lower()
+            page = int(match.group(2))
+            self.sections[section] = int(match.group(3))
+            key = (section, page)
+            stats = self.pages.get(key)
+            if stats is None:
+                stats = self.pages[key] = PageStats(section, page, self.line_no, now)
+                self.order.append(stats)
+            stats.attempts += 1
+            if now is not None and stats.started is None:
+                stats.started = stats.last_seen = now
+            self._current = stats
+            return
+
+        match = _ISO_ANCHOR.match(line)
+        if match:
+            try:
+                self.anchors.append((self.line_no, parse_iso(match.group(1))))
+            except ValueError:
+                pass
+            return
+        match = _START_TIME.search(line)
+        if match:
+            anchor = parse_start_time(match)
+            if anchor is not None:
+                self.anchors.append((self.line_no, anchor))
+            return
+
+        stats = self._current
+        if stats is None:
+            return
+        match = _SLEEP.match(line)
+        if match:
+            stats.sleep_seconds += float(match.group(1))
+            if now is not None:
+                # The page is not over until its sleep is
+                stats.last_seen = now + float(match.group(1))
+            return
+        if _SELECTOR_WAIT.match(line):
+            if now is not None:
+                self._selector_started = now
+            return
+        match = _SCRAPED.match(line)
+        if match:
+            stats.items = int(match.group(1))
+            return
+        match = _COMPLETED.search(line)
+        if match:
+            stats.completed = True
+            return
+        if _ERROR.search(line) and not _SUMMARY_COUNT.match(line):
+            stats.errors += 1
+
+    def finish(self):
+        """Assign each page its latency; returns the pages in log order"""
+        timed = [p for p in self.order if p.started is not None]
+        if not timed:
+            self._estimate_from_anchors()
+            return self.order
+        # Page start to the next page's start; a section's last page ends at its last timestamped line
+        for page, following in zip(timed, timed[1:] + [None]):
+            if following is not None and following.section == page.section and following.started >= page.started:
+                page.latency = following.started - page.started
+            else:
+                page.latency = max(page.last_seen - page.started, 0.0)
+        return self.order
+
+    def _estimate_from_anchors(self):
+        anchors = sorted(self.anchors)
+        for (start_line, start_time), (end_line, end_time) in zip(anchors, anchors[1:]):
+            pages = [p for p in self.order if start_line < p.line_no < end_line]
+            if not pages:
+                continue
+            span = end_time - start_time
+            sleeps = sum(p.sleep_seconds for p in pages)
+            work = max(span - sleeps, 0.0) / len(pages)
+            for page in pages:
+                page.latency = work + page.sleep_seconds
+                page.estimated = True
+            clock = start_time
+            for page in pages:
+                page.started = clock
+                clock += page.latency
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def section_summary(section, pages, total_pages):
+    latencies = sorted(p.latency for p in pages if p.latency is not None)
+    elapsed = sum(latencies)
+    sleep = sum(p.sleep_seconds for p in pages if p.latency is not None)
+    selector = sum(p.selector_seconds for p in pages if p.latency is not None)
+    completed = sum(p.completed for p in pages)
+    estimated = any(p.estimated for p in pages)
+    summary = {
+        'section': section,
+        'pages_total': total_pages,
+        'pages_seen': len(pages),
+        'pages_completed': completed,
+        'pages_failed': len(pages) - completed,
+        'retries': sum(p.attempts - 1 for p in pages),
+        'error_lines': sum(p.errors for p in pages),
+        'items': sum(p.items for p in pages),
+        'pages_timed': len(latencies),
+        'estimated': estimated,
+        'elapsed_seconds': elapsed,
+        'sleep_seconds': sleep,
+        'selector_wait_seconds': None if estimated else selector,
+        'idle_share': (sleep + selector) / elapsed if elapsed and not estimated else None,
+        'mean_latency': elapsed / len(latencies) if latencies else None,
+        'pages_per_hour': len(latencies) * 3600 / elapsed if elapsed else None,
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}_latency'] = None if estimated else percentile(latencies, pct)
+    if summary['mean_latency'] and total_pages:
+        summary['projected_full_hours'] = summary['mean_latency'] * total_pages / 3600
+    return summary
+
+
+def timeline(pages, bucket):
+    """Per-section buckets of `bucket` pages: when they ran, throughput and idle share"""
+    rows = []
+    by_section = {}
+    for page in pages:
+        by_section.setdefault(page.section, []).append(page)
+    for section, section_pages in by_section.items():
+        for i in range(0, len(section_pages), bucket):
+            chunk = section_pages[i:i + bucket]
+            timed = [p for p in chunk if p.latency is not None]
+            elapsed = sum(p.latency for p in timed)
+            idle = sum(p.sleep_seconds + p.selector_seconds for p in timed)
+            estimated = any(p.estimated for p in timed)
+            started = timed[0].started if timed else None
+            rows.append({
+                'section': section,
+                'first_page': chunk[0].page,
+                'last_page': chunk[-1].page,
+                'started_at': (datetime.fromtimestamp(started, timezone.utc).strftime('%Y-%m-%d %H:%M:%SZ')
+                               if started is not None else None),
+                'elapsed_seconds': elapsed if timed else None,
+                'pages_per_hour': len(timed) * 3600 / elapsed if elapsed else None,
+                'items': sum(p.items for p in chunk),
+                'retries': sum(p.attempts - 1 for p in chunk),
+                'idle_share': idle / elapsed if elapsed and not estimated else None,
+            })
+    return rows
+
+
+def analyze(paths, bucket=DEFAULT_BUCKET):
+    parser = ScrapeLogParser()
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                parser.feed(line)
+    pages = parser.finish()
+    sections = [section_summary(section, [p for p in pages if p.section == section], total)
+                for section, total in parser.sections.items()]
+    return {
+        'logs': list(paths),
+        'lines': parser.line_no,
+        'timestamped_lines': parser.timed_lines,
+        'anchors': len(parser.anchors),
+        'sections': sections,
+        'timeline': timeline(pages, bucket),
+    }
+
+
+def _fmt(value, spec='.2f', suffix=''):
+    return '-' if value is None else f'{value:{spec}}{suffix}'
+
+
+def print_report(report, show_timeline=True):
+    print(f'📜 {", ".join(report["logs"])}: {report["lines"]:,} lines, '
+          f'{report["timestamped_lines"]:,} timestamped, {report["anchors"]} time anchors')
+    if not report['timestamped_lines']:
+        print('   ⚠️  No per-line timestamps: latencies are estimated between anchors')
+    for s in report['sections']:
+        flag = ' (estimated)' if s['estimated'] else ''
+        print(f'\n📊 {s["section"]}: {s["pages_seen"]:,}/{s["pages_total"]:,} pages seen, '
+              f'{s["pages_completed"]:,} completed, {s["pages_failed"]} failed, {s["retries"]} retries, '
+              f'{s["error_lines"]} error lines, {s["items"]:,} items')
+        if not s['pages_timed']:
+            print('   No timing information for this section')
+            continue
+        print(f'   Timed pages: {s["pages_timed"]:,}{flag}, elapsed {s["elapsed_seconds"] / 3600:.2f} h, '
+              f'{_fmt(s["pages_per_hour"], ",.0f")} pages/hour')
+        if s['estimated']:
+            print(f'   Latency: mean {_fmt(s["mean_latency"])}s (estimated)')
+            print(f'   Idle: {s["sleep_seconds"]:,.1f}s fixed sleeps, selector waits and idle share '
+                  f'unmeasured (no per-line timestamps)')
+        else:
+            print(f'   Latency: mean {_fmt(s["mean_latency"])}s, '
+                  + ', '.join(f'p{pct} {_fmt(s[f"p{pct}_latency"])}s' for pct in PERCENTILES))
+            print(f'   Idle: {s["sleep_seconds"]:,.1f}s fixed sleeps + {s["selector_wait_seconds"]:,.1f}s selector '
+                  f'waits = {_fmt(s["idle_share"], ".1%")} of elapsed')
+        if s.get('projected_full_hours'):
+            print(f'   Projected full scrape ({s["pages_total"]:,} pages): {s["projected_full_hours"]:.1f} h')
+
+    if show_timeline and report['timeline']:
+        print(f'\n🕒 Timeline')
+        print(f'{"section":<12} {"pages":>13} {"started":>21} {"hours":>7} {"pages/h":>8} {"items":>8} '
+              f'{"retries":>8} {"idle":>7}')
+        for row in report['timeline']:
+            elapsed = row['elapsed_seconds'] / 3600 if row['elapsed_seconds'] is not None else None
+            print(f'{row["section"]:<12} {row["first_page"]:>6}-{row["last_page"]:<6} {row["started_at"] or "-":>21} '
+                  f'{_fmt(elapsed):>7} {_fmt(row["pages_per_hour"], ",.0f"):>8} {row["items"]:>8,} '
+                  f'{row["retries"]:>8} {_fmt(row["idle_share"], ".1%"):>7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Page latency, retry and idle-wait statistics from scraper logs')
+    parser.add_argument('logs', nargs='*', default=['scraping.log'])
+    parser.add_argument('--bucket', type=int, default=DEFAULT_BUCKET, help='pages per timeline row')
+    parser.add_argument('--json', help='also write the full report to this file')
+    parser.add_argument('--no-timeline', action='store_true')
+    args = parser.parse_args()
+
+    report = analyze(args.logs, args.bucket)
+    if not report['sections']:
+        print(f'❌ No page blocks found in {", ".join(args.logs)}')
+        sys.exit(1)
+    print_report(report, show_timeline=not args.no_timeline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\n📝 Report written to {args.json}')
+
+if __name__ == '__main__':
+    main()
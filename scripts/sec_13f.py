@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Streaming 13F-HR ingest: EDGAR information tables -> Fund, SECFiling, Holdings13F.
+
+Each filing is a directory named after its accession number holding the EDGAR
+primary_doc.xml cover page and the information-table XML (any other .xml file),
+as downloaded from https://www.sec.gov/Archives/edgar/data/<cik>/<accession>/.
+Filings are parsed in a process pool with ElementTree.iterparse, clearing each
+<infoTable> once read, so a 5,000-position filing never sits in memory as a
+tree. Positions are summed per (CUSIP, put/call) and valued in dollars
+(tables for periods before 2022-12-31 report thousands).
+
+CUSIPs are mapped to Issuer.ticker through the cached lookup in cusip_map.py;
+positions whose CUSIP has no known Issuer ticker cannot satisfy the
+Holdings13F.symbol foreign key and are written to --unmapped instead.
+Filings are loaded in groups, one transaction each: funds are inserted with
+ON CONFLICT (cik) DO NOTHING, filings with ON CONFLICT (accession_number)
+DO NOTHING, and only the holdings of newly inserted filings are COPYed, so a
+rerun over the same fixtures is a no-op; an accession found under more than
+one path is loaded once, from the first. The one fund conflict that updates is
+an ISSUER_FUND_TYPE row sec_form4.py made for an issuer CIK: it takes the
+filer's name and loses the issuer mark. Prior-quarter fields (shares_held_prior,
+shares_change, is_new_position, ...) are left to the quarter-over-quarter diff.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/sec_13f.py fixtures/13f/2025q2 [--workers 4]
+    python scripts/sec_13f.py fixtures/13f/2025q2 --dry-run --issuers web/issuers.json
+    python scripts/sec_13f.py fixtures/13f/2025q2 --cusip-csv cusips.csv --unmapped web/unmapped_cusips.jsonl
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+from cusip_map import DEFAULT_CACHE, CusipCache, CusipMapper, load_issuer_rows, normalize_cusip
+from model_ids import new_cuid
+from pg_loader import quoted_columns, require_psycopg2
+from pipeline_metrics import PROFILERS, PipelineMetrics
+from trade_sql import MODEL_COLUMNS, copy_text_rows
+
+DEFAULT_WORKERS = 4
+DEFAULT_GROUP_FILINGS = 200
+PRIMARY_DOC = 'primary_doc.xml'
+ARCHIVE_URL = 'https://www.sec.gov/Archives/edgar/data'
+# Filings from 2023-01-03 on (periods ending 2022-12-31 and later) report whole dollars
+DOLLAR_VALUES_FROM = date(2022, 12, 31)
+
+_FUND_TABLE, _FUND_COLUMNS = MODEL_COLUMNS['Fund']
+_FILING_TABLE, _FILING_COLUMNS = MODEL_COLUMNS['SECFiling']
+_HOLDING_TABLE, _HOLDING_COLUMNS = MODEL_COLUMNS['Holdings13F']
+
+# Fund rows sec_form4.py creates for an issuer's CIK; a 13F from that CIK makes it a real filer
+ISSUER_FUND_TYPE = 'Issuer'
+
+_FUND_SQL = (f'INSERT INTO "{_FUND_TABLE}" ({quoted_columns(_FUND_COLUMNS)}) VALUES %s '
+             f'ON CONFLICT ("cik") DO UPDATE SET "name" = EXCLUDED."name", "fund_type" = NULL, '
+             f'"updated_at" = EXCLUDED."updated_at" WHERE "{_FUND_TABLE}"."fund_type" = \'{ISSUER_FUND_TYPE}\'')
+_FILING_SQL = (f'INSERT INTO "{_FILING_TABLE}" ({quoted_columns(_FILING_COLUMNS)}) VALUES %s '
+               f'ON CONFLICT ("accession_number") DO NOTHING RETURNING "accession_number"')
+_HOLDING_COPY_SQL = f'COPY "{_HOLDING_TABLE}" ({quoted_columns(_HOLDING_COLUMNS)}) FROM STDIN'
+
+
+def _local(tag):
+    return tag.rpartition('}')[2]
+
+
+def _int(text):
+    return int(float(text.replace(',', ''))) if text else 0
+
+
+def _date(text):
+    """13F dates are MM-DD-YYYY; ISO dates are accepted too, anything else is None"""
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text.strip(), '%m-%d-%Y').date()
+    except ValueError:
+        pass
+    try:
+        return date.fromisoformat(text.strip())
+    except ValueError:
+        return None
+
+
+def iter_info_table(path):
+    """Yield one {field: text} dict per <infoTable>, with namespaces stripped"""
+    root = None
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if root is None:
+            root = elem
+        if event != 'end' or _local(elem.tag) != 'infoTable':
+            continue
+        fields = {}
+        for child in elem.iter():
+            text = child.text.strip() if child.text else ''
+            if text:
+                fields[_local(child.tag)] = text
+        yield fields
+        # Drop the parsed entry (and the root's reference to it) to keep memory flat
+        elem.clear()
+        root.clear()
+
+
+def parse_primary_doc(path):
+    """Cover-page fields of a 13F primary_doc.xml (first occurrence of each tag, plus managerName)"""
+    fields = {}
+    for _, elem in ET.iterparse(path, events=('end',)):
+        tag = _local(elem.tag)
+        if tag == 'filingManager':
+            # The cover page has other <name> elements (other managers, signatures)
+            for child in elem:
+                if _local(child.tag) == 'name' and child.text:
+                    fields['managerName'] = child.text.strip()
+        elif elem.text and elem.text.strip() and tag not in fields:
+            fields[tag] = elem.text.strip()
+    return fields
+
+
+def info_table_path(filing_dir):
+    for name in sorted(os.listdir(filing_dir)):
+        if name.lower().endswith('.xml') and name != PRIMARY_DOC:
+            return os.path.join(filing_dir, name)
+    return None
+
+
+def iter_filing_dirs(root):
+    """Every directory under root that contains a primary_doc.xml, in sorted order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if PRIMARY_DOC in filenames:
+            yield dirpath
+
+
+def filing_urls(cik, accession, info_table):
+    base = f'{ARCHIVE_URL}/{int(cik)}/{accession.replace("-", "")}'
+    return (f'{base}/{os.path.basename(info_table)}' if info_table else None,
+            f'{base}/{accession}-index.htm',
+            f'{base}/{accession}.txt')
+
+
+def parse_filing(filing_dir):
+    """Parse one filing directory into a picklable dict (runs in the worker processes)"""
+    primary = os.path.join(filing_dir, PRIMARY_DOC)
+    cover = parse_primary_doc(primary)
+    accession = os.path.basename(os.path.normpath(filing_dir))
+    cik = cover.get('cik', '').zfill(10)
+    period = _date(cover.get('periodOfReport') or cover.get('reportCalendarOrQuarter'))
+    multiplier = 1 if period is None or period >= DOLLAR_VALUES_FROM else 1000
+
+    positions = {}
+    rows = 0
+    table = info_table_path(filing_dir)
+    bytes_read = os.path.getsize(primary)
+    if table:
+        bytes_read += os.path.getsize(table)
+        for entry in iter_info_table(table):
+            rows += 1
+            cusip = normalize_cusip(entry.get('cusip'))
+            if not cusip:
+                continue
+            put_call = entry.get('putCall', '').capitalize() or None
+            key = (cusip, put_call)
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = {'name': entry.get('nameOfIssuer') or cusip, 'shares': 0, 'value': 0}
+            position['shares'] += _int(entry.get('sshPrnamt'))
+            position['value'] += _int(entry.get('value')) * multiplier
+
+    total = sum(p['value'] for p in positions.values())
+    filing_id = new_cuid()
+    holdings = []
+    for (cusip, put_call), p in positions.items():
+        percent = round(p['value'] * 100 / total, 6) if total else 0
+        calls_puts = {'putCall': put_call, 'shares': p['shares'], 'value': p['value']} if put_call else None
+        holdings.append((new_cuid(), filing_id, cusip, p['name'], p['shares'], p['value'], percent,
+                         put_call is not None, calls_puts))
+
+    return {
+        'id': filing_id,
+        'accession': accession,
+        'cik': cik,
+        'name': cover.get('managerName') or cik,
+        'form_type': cover.get('submissionType', '13F-HR'),
+        'filing_date': _date(cover.get('signatureDate')) or period,
+        'period': period,
+        'urls': filing_urls(cik, accession, table),
+        'raw': {
+            'periodOfReport': period.isoformat() if period else None,
+            'reportType': cover.get('reportType'),
+            'isAmendment': cover.get('isAmendment') == 'true',
+            'amendmentType': cover.get('amendmentType'),
+            'tableEntryTotal': _int(cover.get('tableEntryTotal')),
+            'tableValueTotal': _int(cover.get('tableValueTotal')) * multiplier,
+            'infoTableRows': rows,
+            'valueMultiplier': multiplier,
+            'totalValue': total,
+        },
+        'rows': rows,
+        'bytes': bytes_read,
+        'holdings': holdings,
+    }
+
+
+def iter_filings(root, workers=DEFAULT_WORKERS):
+    """Parsed filings in directory order, parsed ahead by a process pool"""
+    dirs = list(iter_filing_dirs(root))
+    if workers <= 1:
+        yield from map(parse_filing, dirs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(parse_filing, dirs, chunksize=4)
+
+
+def count_bytes(filings, stage):
+    """Add each filing's size to a stage as it passes, so the stage has it before it is written out"""
+    for filing in filings:
+        stage.bytes_read += filing['bytes']
+        yield filing
+
+
+def iter_groups(filings, size):
+    group = []
+    for filing in filings:
+        group.append(filing)
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def first_per_accession(group):
+    """The group with only the first filing (in path order) of every accession number"""
+    by_accession = {}
+    for filing in group:
+        by_accession.setdefault(filing['accession'], filing)
+    return list(by_accession.values())
+
+
+class UnmappedCusips:
+    """Per-CUSIP totals of positions that could not be loaded for lack of an Issuer ticker"""
+
+    def __init__(self):
+        self.cusips = {}
+        self.positions = 0
+
+    def add(self, cusip, name, value):
+        entry = self.cusips.get(cusip)
+        if entry is None:
+            entry = self.cusips[cusip] = {'cusip': cusip, 'name': name, 'positions': 0, 'value': 0}
+        entry['positions'] += 1
+        entry['value'] += value
+        self.positions += 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for entry in sorted(self.cusips.values(), key=lambda e: -e['value']):
+                f.write(json.dumps(entry) + '\n')
+
+
+def map_group(group, mapper, unmapped):
+    """Resolve the group's new CUSIPs and return ready Holdings13F rows per accession number"""
+    mapper.resolve({h[2]: h[3] for filing in group for h in filing['holdings'] if h[2] not in mapper.mapping})
+    mapped = {}
+    for filing in first_per_accession(group):
+        rows = mapped[filing['accession']] = []
+        for holding_id, filing_id, cusip, name, shares, value, percent, is_options, calls_puts in filing['holdings']:
+            symbol = mapper.ticker(cusip)
+            if symbol is None:
+                unmapped.add(cusip, name, value)
+                continue
+            rows.append((holding_id, filing_id, symbol, name, cusip, shares, value, percent, is_options, calls_puts))
+    return mapped
+
+
+def load_group(conn, group, mapped):
+    """Insert one group of filings in a single transaction; returns (filings inserted, holdings inserted, bytes)"""
+    from psycopg2.extras import execute_values
+    now = datetime.now(timezone.utc)
+    # A copy of a filing under a second path must not replace the one whose id is inserted
+    group = first_per_accession(group)
+    funds = {f['cik']: (new_cuid(), f['cik'], f['name'], now) for f in group}
+    filings = [(f['id'], f['accession'], f['cik'], f['name'], f['form_type'], f['filing_date'], *f['urls'],
+                json.dumps(f['raw']), now) for f in group]
+    with conn:
+        with conn.cursor() as cur:
+            execute_values(cur, _FUND_SQL, list(funds.values()))
+            inserted = {a for a, in execute_values(cur, _FILING_SQL, filings, fetch=True)}
+            rows = [row for accession in inserted for row in mapped[accession]]
+            payload = copy_text_rows(rows)
+            if rows:
+                cur.copy_expert(_HOLDING_COPY_SQL, io.StringIO(payload))
+    return len(inserted), len(rows), len(payload.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load 13F-HR information tables into Holdings13F')
+    parser.add_argument('fixtures', help='directory of <accession>/primary_doc.xml + information table filings')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--issuers', help="issuers.json, an Issuer INSERT dump, or 'db' (default: db, "
+                                          "or web/issuers.json with --dry-run)")
+    parser.add_argument('--cusip-cache', default=DEFAULT_CACHE)
+    parser.add_argument('--cusip-csv', action='append', default=[],
+                        help='cusip,ticker[,name] CSV to import into the cache first (repeatable)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--group-filings', type=int, default=DEFAULT_GROUP_FILINGS,
+                        help='filings per load transaction')
+    parser.add_argument('--unmapped', default='web/unmapped_cusips.jsonl')
+    parser.add_argument('--dry-run', action='store_true', help='parse and map only, write nothing to the database')
+    parser.add_argument('--metrics', help='append per-stage metrics to this JSONL file')
+    parser.add_argument('--profile', choices=PROFILERS, help='profile the load stage')
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.dsn:
+        print('❌ Set DATABASE_URL or pass --dsn (or use --dry-run)')
+        sys.exit(1)
+    issuers_source = args.issuers or ('web/issuers.json' if args.dry_run else 'db')
+
+    cache = CusipCache(args.cusip_cache)
+    for path in args.cusip_csv:
+        print(f'📥 Imported {cache.import_csv(path)} CUSIP mappings from {path}')
+    mapper = CusipMapper(cache, load_issuer_rows(issuers_source, args.dsn))
+    print(f'🔑 {len(mapper.known_tickers)} issuer tickers, {len(mapper.mapping)} cached CUSIPs')
+
+    conn = None if args.dry_run else require_psycopg2().connect(args.dsn)
+    metrics = PipelineMetrics(args.metrics, profile=args.profile)
+    unmapped = UnmappedCusips()
+    totals = {'filings': 0, 'rows': 0, 'positions': 0, 'filings_inserted': 0, 'holdings_inserted': 0}
+    undated = []
+    start = time.time()
+    print(f'🚀 Parsing {args.fixtures} with {args.workers} workers')
+    try:
+        filings = metrics.iter_stage('parse', iter_filings(args.fixtures, args.workers))
+        parse_stage = metrics.get('parse')
+        filings = count_bytes(filings, parse_stage)
+        with metrics.stage('load', parse_stage) as load_stage:
+            for group in iter_groups(filings, args.group_filings):
+                # SECFiling.filing_date is NOT NULL; one undated filing would roll back its whole group
+                undated += [f['accession'] for f in group if f['filing_date'] is None]
+                group = [f for f in group if f['filing_date'] is not None]
+                if not group:
+                    continue
+                totals['filings'] += len(group)
+                totals['rows'] += sum(f['rows'] for f in group)
+                totals['positions'] += sum(len(f['holdings']) for f in group)
+                mapped = map_group(group, mapper, unmapped)
+                if conn is None:
+                    continue
+                inserted, holdings, sent = load_group(conn, group, mapped)
+                totals['filings_inserted'] += inserted
+                totals['holdings_inserted'] += holdings
+                load_stage.bytes_written += sent
+                print(f'   ✅ {len(group)} filings: {inserted} new, {holdings} holdings '
+                      f'({totals["filings"]} filings, {time.time() - start:.1f}s)')
+            load_stage.rows_in = totals['positions']
+            load_stage.rows_out = totals['holdings_inserted']
+    finally:
+        if conn is not None:
+            conn.close()
+        cache.close()
+
+    unmapped.write(args.unmapped)
+    elapsed = time.time() - start
+    print(f'\n🎯 FINAL RESULTS:')
+    print(f'   Filings parsed: {totals["filings"]} ({totals["rows"]} information-table rows, '
+          f'{totals["positions"]} positions after merging by CUSIP and put/call)')
+    if undated:
+        print(f'   ⚠️  Skipped {len(undated)} filings without a signature date or period of report: '
+              f'{", ".join(undated[:10])}{" ..." if len(undated) > 10 else ""}')
+    if conn is not None:
+        print(f'   Filings inserted: {totals["filings_inserted"]} '
+              f'({totals["filings"] - totals["filings_inserted"]} already loaded)')
+        print(f'   Holdings inserted: {totals["holdings_inserted"]}')
+    print(f'   Unmapped CUSIPs: {len(unmapped.cusips)} ({unmapped.positions} positions, {args.unmapped})')
+    print(f'   Time: {elapsed:.2f}s ({totals["rows"] / elapsed if elapsed else 0:,.0f} rows/sec)')
+    metrics.print_summary()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Form 4 insider-transaction ingest: ownershipDocument XML -> SECFiling, InsiderTrade.
+
+Every *.xml file under the fixtures directory is one Form 4 (or 4/A) primary
+document, named after its accession number (0000320193-25-000071.xml) or kept
+in a directory of that name, as downloaded from EDGAR. Filings are small, so
+they are parsed whole with ElementTree in a process pool, many per task, and
+each non-derivative and derivative transaction becomes one InsiderTrade row.
+
+The derived columns are computed per load group, column by column over all of
+its transactions at once:
+
+    calculated_total_value   shares x price (NULL without a price)
+    transaction_category     the SEC transaction code spelled out (P -> Purchase)
+    is_acquisition / _disp.  the A/D code
+    trade_size_category      calculated value bucketed by TRADE_SIZE_BUCKETS
+    price_category           price per share bucketed by PRICE_BUCKETS
+    ownership_impact         shares traded against the holding before the trade
+
+SECFiling.cik is the issuer CIK, and because it references Fund.cik a Fund row
+named after the issuer is created when missing, as sec_13f.py does for filers.
+Those rows get fund_type ISSUER_FUND_TYPE so fund listings can leave them out,
+until a 13F from the same CIK turns them into a filer (sec_13f.py).
+Filings are inserted with ON CONFLICT (accession_number) DO NOTHING and only
+the transactions of newly inserted filings are COPYed, so reruns are no-ops.
+When a directory holds more than one document for an accession, only the
+first (in path order) is loaded. SECFiling.filing_date is required, so a
+filing with neither a signatureDate nor a periodOfReport is skipped and listed.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/sec_form4.py fixtures/form4/2025q2 [--workers 4]
+    python scripts/sec_form4.py fixtures/form4/2025q2 --dry-run
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from model_ids import new_cuid
+from pg_loader import quoted_columns, require_psycopg2
+from pipeline_metrics import PROFILERS, PipelineMetrics
+from sec_13f import (ISSUER_FUND_TYPE, _FILING_SQL, _FUND_COLUMNS, _FUND_TABLE, count_bytes, filing_urls,
+                     first_per_accession, iter_groups)
+from trade_sql import MODEL_COLUMNS, copy_text_rows
+
+DEFAULT_WORKERS = 4
+DEFAULT_GROUP_FILINGS = 2000
+DEFAULT_CHUNKSIZE = 64
+
+_ACCESSION = re.compile(r'\d{10}-\d{2}-\d{6}')
+
+TRANSACTION_CATEGORIES = {
+    'P': 'Purchase', 'S': 'Sale', 'V': 'Voluntary Report', 'A': 'Grant/Award', 'D': 'Disposition to Issuer',
+    'F': 'Tax Withholding', 'I': 'Discretionary', 'M': 'Option Exercise', 'C': 'Conversion',
+    'E': 'Expiration (Short)', 'H': 'Expiration (Long)', 'O': 'Exercise (Out of the Money)',
+    'X': 'Exercise (In the Money)', 'G': 'Gift', 'L': 'Small Acquisition', 'W': 'Will/Inheritance',
+    'Z': 'Voting Trust', 'J': 'Other', 'K': 'Equity Swap', 'U': 'Tender of Shares',
+}
+# (upper bounds, labels): one more label than bounds, values at a bound go up a bucket
+TRADE_SIZE_BUCKETS = ((10_000, 100_000, 1_000_000, 10_000_000), ('Micro', 'Small', 'Medium', 'Large', 'Mega'))
+PRICE_BUCKETS = ((1, 10, 50, 200), ('Penny', 'Low', 'Mid', 'High', 'Premium'))
+OWNERSHIP_IMPACT_BUCKETS = ((Decimal('0.1'), Decimal('0.5')), ('Minor', 'Significant', 'Major'))
+
+# Columns parsed from the XML; derive_columns appends DERIVED_COLUMNS
+_TRADE_TABLE, TRADE_COLUMNS = MODEL_COLUMNS['InsiderTrade']
+DERIVED_COLUMNS = ('transaction_category', 'calculated_total_value', 'is_acquisition', 'is_disposition',
+                   'trade_size_category', 'price_category', 'ownership_impact')
+PARSED_COLUMNS = TRADE_COLUMNS[:-len(DERIVED_COLUMNS)]
+assert TRADE_COLUMNS[len(PARSED_COLUMNS):] == DERIVED_COLUMNS
+
+_CODE, _SHARES, _PRICE, _AFTER, _AD = map(PARSED_COLUMNS.index, (
+    'transaction_code', 'shares_traded', 'price_per_share', 'ownership_after', 'acquisition_disposition'))
+_TRADE_COPY_SQL = f'COPY "{_TRADE_TABLE}" ({quoted_columns(TRADE_COLUMNS)}) FROM STDIN'
+
+# Fund rows created only to satisfy SECFiling.cik for an issuer are marked ISSUER_FUND_TYPE
+_ISSUER_FUND_SQL = (f'INSERT INTO "{_FUND_TABLE}" ({quoted_columns(_FUND_COLUMNS + ("fund_type",))}) VALUES %s '
+                    f'ON CONFLICT ("cik") DO NOTHING')
+
+
+def _local(tag):
+    return tag.rpartition('}')[2]
+
+
+def _value(elem, path):
+    """Text of path or path/value (Form 4 wraps most fields in <value>), or None"""
+    node = elem.find(path)
+    if node is None:
+        return None
+    inner = node.find('value')
+    text = (inner if inner is not None else node).text
+    return text.strip() or None if text else None
+
+
+def _decimal(text):
+    if not text:
+        return None
+    try:
+        return Decimal(text.replace(',', '').replace('$', ''))
+    except InvalidOperation:
+        return None
+
+
+def _shares(text):
+    number = _decimal(text)
+    return int(number.to_integral_value()) if number is not None else None
+
+
+def _date(text):
+    if not text:
+        return None
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return None
+
+
+def _flag(text):
+    return (text or '').strip().lower() in ('1', 'true')
+
+
+def _relationship(owner):
+    rel = owner.find('reportingOwnerRelationship')
+    if rel is None:
+        return None, None
+    roles = [label for tag, label in (('isDirector', 'Director'), ('isOfficer', 'Officer'),
+                                      ('isTenPercentOwner', '10% Owner'), ('isOther', 'Other'))
+             if _flag(rel.findtext(tag))]
+    title = (rel.findtext('officerTitle') or rel.findtext('otherText') or '').strip() or None
+    return ', '.join(roles) or None, title
+
+
+def accession_for(path):
+    """Accession number from the file name, else from the enclosing directory"""
+    match = _ACCESSION.search(os.path.basename(path)) or _ACCESSION.search(os.path.basename(os.path.dirname(path)))
+    return match.group(0) if match else os.path.splitext(os.path.basename(path))[0]
+
+
+def iter_filing_paths(root):
+    """Every Form 4 XML file under root, in sorted order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith('.xml'):
+                yield os.path.join(dirpath, name)
+
+
+def _transaction_row(tx, filing_id, owner_name, relationship, title, derivative):
+    ad = _value(tx, 'transactionAmounts/transactionAcquiredDisposedCode')
+    after = _shares(_value(tx, 'postTransactionAmounts/sharesOwnedFollowingTransaction'))
+    direct = _value(tx, 'ownershipNature/directOrIndirectOwnership')
+    return (
+        new_cuid(), filing_id, owner_name, title, relationship,
+        _value(tx, 'transactionCoding/transactionCode'),
+        _date(_value(tx, 'transactionDate')),
+        _shares(_value(tx, 'transactionAmounts/transactionShares')) or 0,
+        _decimal(_value(tx, 'transactionAmounts/transactionPricePerShare')),
+        None,
+        after,
+        _shares(_value(tx, 'underlyingSecurity/underlyingSecurityShares')) if derivative else None,
+        _decimal(_value(tx, 'conversionOrExercisePrice')) if derivative else None,
+        _date(_value(tx, 'expirationDate')) if derivative else None,
+        _value(tx, 'underlyingSecurity/underlyingSecurityTitle') if derivative else None,
+        _value(tx, 'ownershipNature/natureOfOwnership'),
+        ad,
+        _flag(_value(tx, 'transactionCoding/equitySwapInvolved')),
+        after if direct == 'D' else None,
+        after if direct == 'I' else None,
+    )
+
+
+def parse_filing(path):
+    """Parse one Form 4 XML file into a picklable dict (runs in the worker processes)"""
+    root = ET.parse(path).getroot()
+    if root.tag.startswith('{'):
+        for elem in root.iter():
+            elem.tag = _local(elem.tag)
+    accession = accession_for(path)
+    cik = (_value(root, 'issuer/issuerCik') or '').zfill(10)
+    issuer_name = _value(root, 'issuer/issuerName') or cik
+    owners = root.findall('reportingOwner')
+    owner_names = [_value(o, 'reportingOwnerId/rptOwnerName') for o in owners]
+    relationship, title = _relationship(owners[0]) if owners else (None, None)
+    owner_name = owner_names[0] if owner_names and owner_names[0] else 'Unknown'
+    period = _date(_value(root, 'periodOfReport'))
+
+    filing_id = new_cuid()
+    trades = [_transaction_row(tx, filing_id, owner_name, relationship, title, False)
+              for tx in root.iterfind('nonDerivativeTable/nonDerivativeTransaction')]
+    trades += [_transaction_row(tx, filing_id, owner_name, relationship, title, True)
+               for tx in root.iterfind('derivativeTable/derivativeTransaction')]
+    document_url, html_url, txt_url = filing_urls(cik, accession, path)
+    return {
+        'id': filing_id,
+        'accession': accession,
+        'cik': cik,
+        'name': issuer_name,
+        'form_type': _value(root, 'documentType') or '4',
+        'filing_date': _date(_value(root, 'ownerSignature/signatureDate')) or period,
+        'urls': (document_url, html_url, txt_url),
+        'raw': {
+            'periodOfReport': period.isoformat() if period else None,
+            'issuerTradingSymbol': _value(root, 'issuer/issuerTradingSymbol'),
+            'reportingOwners': [{'cik': _value(o, 'reportingOwnerId/rptOwnerCik'), 'name': name}
+                                for o, name in zip(owners, owner_names)],
+            'transactions': len(trades),
+        },
+        'bytes': os.path.getsize(path),
+        'trades': trades,
+    }
+
+
+def iter_filings(root, workers=DEFAULT_WORKERS, chunksize=DEFAULT_CHUNKSIZE):
+    """Parsed filings in path order; small files go to the pool in chunks to amortize IPC"""
+    paths = list(iter_filing_paths(root))
+    if workers <= 1:
+        yield from map(parse_filing, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(parse_filing, paths, chunksize=chunksize)
+
+
+def _bucket(value, buckets):
+    bounds, labels = buckets
+    return labels[bisect_right(bounds, value)] if value is not None else None
+
+
+def _ownership_impact(shares, after, ad):
+    if after is None or ad not in ('A', 'D'):
+        return None
+    before = after - shares if ad == 'A' else after + shares
+    if before <= 0:
+        return 'New Position' if ad == 'A' else None
+    if ad == 'D' and after == 0:
+        return 'Full Exit'
+    return _bucket(Decimal(shares) / before, OWNERSHIP_IMPACT_BUCKETS)
+
+
+def derive_columns(rows):
+    """Append DERIVED_COLUMNS to parsed InsiderTrade rows, one column at a time"""
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    codes, shares, prices, after, ad = (columns[i] for i in (_CODE, _SHARES, _PRICE, _AFTER, _AD))
+    # A $0 price (awards, gifts) is a real price: value 0, lowest bucket
+    values = [s * p if p is not None else None for s, p in zip(shares, prices)]
+    derived = zip(
+        map(TRANSACTION_CATEGORIES.get, codes),
+        values,
+        [a == 'A' for a in ad],
+        [a == 'D' for a in ad],
+        [_bucket(v, TRADE_SIZE_BUCKETS) for v in values],
+        [_bucket(p, PRICE_BUCKETS) for p in prices],
+        list(map(_ownership_impact, shares, after, ad)),
+    )
+    return [row + extra for row, extra in zip(rows, derived)]
+
+
+def load_group(conn, group, trades):
+    """Insert one group of filings in a single transaction; returns (filings inserted, trades inserted, bytes)"""
+    from psycopg2.extras import execute_values
+    now = datetime.now(timezone.utc)
+    # Several documents under one accession directory: only the first becomes the SECFiling
+    unique = first_per_accession(group)
+    funds = {f['cik']: (new_cuid(), f['cik'], f['name'], now, ISSUER_FUND_TYPE) for f in unique}
+    filings = [(f['id'], f['accession'], f['cik'], f['name'], f['form_type'], f['filing_date'], *f['urls'],
+                json.dumps(f['raw']), now) for f in unique]
+    with conn:
+        with conn.cursor() as cur:
+            execute_values(cur, _ISSUER_FUND_SQL, list(funds.values()), page_size=len(funds))
+            inserted = {a for a, in execute_values(cur, _FILING_SQL, filings, page_size=len(filings), fetch=True)}
+            if len(inserted) < len(group):
+                new_ids = {f['id'] for f in unique if f['accession'] in inserted}
+                trades = [t for t in trades if t[1] in new_ids]
+            payload = copy_text_rows(trades)
+            if trades:
+                cur.copy_expert(_TRADE_COPY_SQL, io.StringIO(payload))
+    return len(inserted), len(trades), len(payload.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load Form 4 filings into SECFiling and InsiderTrade')
+    parser.add_argument('fixtures', help='directory of Form 4 XML files named by accession number')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='filings per pool task')
+    parser.add_argument('--group-filings', type=int, default=DEFAULT_GROUP_FILINGS,
+                        help='filings per load transaction')
+    parser.add_argument('--dry-run', action='store_true', help='parse and derive only, write nothing')
+    parser.add_argument('--metrics', help='append per-stage metrics to this JSONL file')
+    parser.add_argument('--profile', choices=PROFILERS, help='profile the load stage')
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.dsn:
+        print('❌ Set DATABASE_URL or pass --dsn (or use --dry-run)')
+        sys.exit(1)
+
+    conn = None if args.dry_run else require_psycopg2().connect(args.dsn)
+    metrics = PipelineMetrics(args.metrics, profile=args.profile)
+    totals = {'filings': 0, 'trades': 0, 'filings_inserted': 0, 'trades_inserted': 0}
+    undated = []
+    categories = {}
+    start = time.time()
+    print(f'🚀 Parsing {args.fixtures} with {args.workers} workers')
+    try:
+        filings = metrics.iter_stage('parse', iter_filings(args.fixtures, args.workers, args.chunksize))
+        parse_stage = metrics.get('parse')
+        filings = count_bytes(filings, parse_stage)
+        with metrics.stage('load', parse_stage) as load_stage:
+            for group in iter_groups(filings, args.group_filings):
+                undated += [f['accession'] for f in group if f['filing_date'] is None]
+                group = [f for f in group if f['filing_date'] is not None]
+                if not group:
+                    continue
+                trades = derive_columns([t for f in group for t in f['trades']])
+                totals['filings'] += len(group)
+                totals['trades'] += len(trades)
+                for t in trades:
+                    categories[t[-3]] = categories.get(t[-3], 0) + 1
+                if conn is None:
+                    continue
+                inserted, sent, size = load_group(conn, group, trades)
+                totals['filings_inserted'] += inserted
+                totals['trades_inserted'] += sent
+                load_stage.bytes_written += size
+                elapsed = time.time() - start
+                print(f'   ✅ {len(group)} filings: {inserted} new, {sent} trades '
+                      f'({totals["filings"]} filings, {totals["filings"] / elapsed:,.0f} filings/sec)')
+            load_stage.rows_in = totals['trades']
+            load_stage.rows_out = totals['trades_inserted']
+    finally:
+        if conn is not None:
+            conn.close()
+
+    elapsed = time.time() - start
+    print(f'\n🎯 FINAL RESULTS:')
+    print(f'   Filings parsed: {totals["filings"]} ({totals["trades"]} transactions)')
+    if undated:
+        print(f'   ⚠️  Skipped {len(undated)} filings without a signature date or period of report: '
+              f'{", ".join(undated[:10])}{" ..." if len(undated) > 10 else ""}')
+    if conn is not None:
+        print(f'   Filings inserted: {totals["filings_inserted"]} '
+              f'({totals["filings"] - totals["filings_inserted"]} already loaded)')
+        print(f'   Trades inserted: {totals["trades_inserted"]}')
+    print(f'   Trade sizes: ' + ', '.join(f'{label or "no price"} {count}' for label, count in
+                                          sorted(categories.items(), key=lambda kv: -kv[1])))
+    print(f'   Time: {elapsed:.2f}s ({totals["filings"] / elapsed if elapsed else 0:,.0f} filings/sec)')
+    metrics.print_summary()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Persistent issuer -> (ticker, exchange) cache for ticker resolution.
+
+Ticker lookups used to be checkpointed by rewriting every result so far into a
+new ticker_parallel_N_*.json / ticker_remaining_N_*.json file every 50 issuers,
+and a restart could not pick them up. The cache is a single SQLite table with
+one row per issuer, written as each result arrives, so resolution resumes
+where it stopped and only asks the resolver about issuers with no fresh entry.
+"No ticker" answers are cached too (negative caching) with their own, shorter
+TTL so municipal bonds and private funds are not looked up on every run.
+
+Usage:
+    python scripts/ticker_cache.py import ticker_*.json          # seed from the old snapshots
+    python scripts/ticker_cache.py resolve web/issuers.json --resolver mymodule:lookup [--workers 8]
+    python scripts/ticker_cache.py stats
+    python scripts/ticker_cache.py export ticker_results.json    # same shape as ticker_*_final_*.json
+
+A resolver is any callable ``lookup(name) -> (ticker, exchange)`` that returns
+``(None, None)`` when the issuer has no listed ticker and raises on transient
+failures (those are retried on the next run, not cached).
+"""
+import argparse
+import glob
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+DEFAULT_CACHE = 'ticker_cache.sqlite'
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+DAY = 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickers (
+    issuer_id  TEXT PRIMARY KEY,
+    name       TEXT,
+    ticker     TEXT,
+    exchange   TEXT,
+    source     TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def _iso_to_epoch(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class TickerCache:
+    """SQLite-backed ticker cache with TTL and negative caching; safe to share between threads"""
+
+    def __init__(self, path=DEFAULT_CACHE, ttl_days=DEFAULT_TTL_DAYS, negative_ttl_days=DEFAULT_NEGATIVE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * DAY
+        self.negative_ttl = negative_ttl_days * DAY
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _is_fresh(self, ticker, fetched_at, now):
+        return now - fetched_at < (self.ttl if ticker else self.negative_ttl)
+
+    def get(self, issuer_id, now=None):
+        """Fresh cache entry as a dict (ticker None for a cached "no ticker"), or None on a miss"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT name, ticker, exchange, source, fetched_at FROM tickers WHERE issuer_id = ?',
+                (str(issuer_id),),
+            ).fetchone()
+        if row is None or not self._is_fresh(row[1], row[4], time.time() if now is None else now):
+            return None
+        return {'id': str(issuer_id), 'name': row[0], 'ticker': row[1], 'exchange': row[2],
+                'source': row[3], 'fetched_at': row[4]}
+
+    def put(self, issuer_id, name, ticker, exchange=None, source=None, fetched_at=None):
+        """Record one result; one row write and commit, whatever the cache size"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._db.execute(
+                """INSERT INTO tickers (issuer_id, name, ticker, exchange, source, fetched_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (issuer_id) DO UPDATE SET
+                       name = excluded.name, ticker = excluded.ticker, exchange = excluded.exchange,
+                       source = excluded.source, fetched_at = excluded.fetched_at
+                   WHERE excluded.fetched_at >= tickers.fetched_at""",
+                (str(issuer_id), name, ticker or None, exchange or None, source, fetched_at),
+            )
+            self._db.commit()
+
+    def fresh_ids(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._db.execute('SELECT issuer_id, ticker, fetched_at FROM tickers').fetchall()
+        return {issuer_id for issuer_id, ticker, fetched_at in rows if self._is_fresh(ticker, fetched_at, now)}
+
+    def pending(self, issuers, now=None):
+        """Issuers (dicts with id and name) that have no fresh entry"""
+        fresh = self.fresh_ids(now)
+        return [issuer for issuer in issuers if str(issuer['id']) not in fresh]
+
+    def entries(self):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT issuer_id, name, ticker, exchange, source, fetched_at FROM tickers ORDER BY issuer_id'
+            ).fetchall()
+        return [{'id': r[0], 'name': r[1], 'ticker': r[2], 'exchange': r[3], 'source': r[4], 'fetched_at': r[5]}
+                for r in rows]
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        counts = {'entries': 0, 'with_ticker': 0, 'without_ticker': 0, 'stale': 0}
+        for entry in self.entries():
+            counts['entries'] += 1
+            counts['with_ticker' if entry['ticker'] else 'without_ticker'] += 1
+            if not self._is_fresh(entry['ticker'], entry['fetched_at'], now):
+                counts['stale'] += 1
+        return counts
+
+    def import_snapshot(self, path):
+        """Load one old ticker_*.json snapshot; newer entries already cached are kept"""
+        with open(path) as f:
+            data = json.load(f)
+        results = data.get('results', []) if isinstance(data, dict) else data
+        fetched_at = _iso_to_epoch(data.get('timestamp')) if isinstance(data, dict) else None
+        if fetched_at is None:
+            fetched_at = os.path.getmtime(path)
+        source = os.path.basename(path)
+        with self._lock:
+            self._db.executemany(
+                """INSERT INTO tickers (issuer_id, name, ticker, exchange, source, fetched_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (issuer_id) DO UPDATE SET
+                       name = excluded.name, ticker = excluded.ticker, exchange = excluded.exchange,
+                       source = excluded.source, fetched_at = excluded.fetched_at
+                   WHERE excluded.fetched_at >= tickers.fetched_at""",
+                ((str(r['id']), r.get('name'), r.get('ticker') or None, r.get('exchange') or None,
+                  source, fetched_at) for r in results if r.get('id') is not None),
+            )
+            self._db.commit()
+        return len(results)
+
+
+def load_resolver(spec):
+    """Import ``module:function`` (module path relative to the current directory is fine)"""
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f'Resolver must look like module:function, got {spec!r}')
+    sys.path.insert(0, os.getcwd())
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def resolve_issuers(issuers, resolver, cache, workers=8, source=None, on_result=None):
+    """Resolve every issuer without a fresh cache entry and cache each answer as it arrives.
+
+    ``on_result(issuer, ticker, exchange, error)`` is called per lookup. Failed
+    lookups are not cached, so a rerun retries exactly those.
+    """
+    todo = cache.pending(issuers)
+    stats = {'total': len(issuers), 'cached': len(issuers) - len(todo), 'resolved': 0,
+             'with_ticker': 0, 'without_ticker': 0, 'errors': 0}
+
+    def lookup(issuer):
+        return resolver(issuer['name'])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(lookup, issuer): issuer for issuer in todo}
+        for future in as_completed(futures):
+            issuer = futures[future]
+            try:
+                ticker, exchange = future.result() or (None, None)
+                error = None
+            except Exception as e:
+                ticker, exchange, error = None, None, e
+            if error is None:
+                cache.put(issuer['id'], issuer['name'], ticker, exchange, source)
+                stats['resolved'] += 1
+                stats['with_ticker' if ticker else 'without_ticker'] += 1
+            else:
+                stats['errors'] += 1
+            if on_result:
+                on_result(issuer, ticker, exchange, error)
+    return stats
+
+
+def load_issuers(path):
+    """Issuers from issuers.json (list or id->issuer dict)"""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [{'id': issuer_id, **issuer} for issuer_id, issuer in data.items()]
+    return [{'id': str(i['id']), 'name': i.get('name', '')} for i in data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Persistent ticker resolution cache')
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--ttl-days', type=float, default=DEFAULT_TTL_DAYS)
+    parser.add_argument('--negative-ttl-days', type=float, default=DEFAULT_NEGATIVE_TTL_DAYS)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help='seed the cache from ticker_*.json snapshots')
+    p_import.add_argument('snapshots', nargs='*')
+
+    p_resolve = sub.add_parser('resolve', help='resolve issuers missing from the cache')
+    p_resolve.add_argument('issuers', nargs='?', default='web/issuers.json')
+    p_resolve.add_argument('--resolver', required=True, help='module:function taking a name, returning (ticker, exchange)')
+    p_resolve.add_argument('--workers', type=int, default=8)
+
+    sub.add_parser('stats', help='show cache counts')
+
+    p_export = sub.add_parser('export', help='write all cached results as JSON')
+    p_export.add_argument('output')
+
+    args = parser.parse_args()
+
+    with TickerCache(args.cache, args.ttl_days, args.negative_ttl_days) as cache:
+        if args.command == 'import':
+            # Oldest first, so later snapshots win on equal timestamps
+            paths = sorted(args.snapshots or glob.glob('ticker_*.json'), key=os.path.getmtime)
+            total = 0
+            for path in paths:
+                total += cache.import_snapshot(path)
+            print(f'📥 Imported {total} results from {len(paths)} snapshots into {args.cache}')
+            print(f'   Distinct issuers cached: {cache.stats()["entries"]}')
+
+        elif args.command == 'resolve':
+            issuers = load_issuers(args.issuers)
+            resolver = load_resolver(args.resolver)
+
+            def progress(issuer, ticker, exchange, error):
+                if error is not None:
+                    print(f'   ❌ {issuer["id"]} {issuer["name"]}: {error}')
+                else:
+                    print(f'   {"✅" if ticker else "➖"} {issuer["id"]} {issuer["name"]}: {ticker or "no ticker"}')
+
+            print(f'🔎 Resolving tickers for {len(issuers)} issuers ({args.cache})')
+            stats = resolve_issuers(issuers, resolver, cache, workers=args.workers, source=args.resolver,
+                                    on_result=progress)
+            print(f'\n📊 Already cached: {stats["cached"]}')
+            print(f'   Resolved now: {stats["resolved"]} ({stats["with_ticker"]} with ticker, '
+                  f'{stats["without_ticker"]} without)')
+            print(f'   Errors (will retry next run): {stats["errors"]}')
+
+        elif args.command == 'stats':
+            stats = cache.stats()
+            print(f'📒 Ticker cache: {args.cache}')
+            print(f'   Entries: {stats["entries"]}')
+            print(f'   With ticker: {stats["with_ticker"]}')
+            print(f'   Without ticker: {stats["without_ticker"]}')
+            print(f'   Stale (past TTL): {stats["stale"]}')
+
+        elif args.command == 'export':
+            entries = cache.entries()
+            results = [{'id': e['id'], 'name': e['name'], 'ticker': e['ticker'], 'exchange': e['exchange']}
+                       for e in entries]
+            with_ticker = sum(1 for r in results if r['ticker'])
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                    'total': len(results),
+                    'withTicker': with_ticker,
+                    'withoutTicker': len(results) - with_ticker,
+                    'results': results,
+                }, f, indent=2)
+            print(f'📤 Exported {len(results)} cached results to {args.output}')
+
+if __name__ == '__main__':
+    main()
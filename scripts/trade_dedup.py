@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Deduplication stage for the trade batching pipeline.
+
+Exact duplicates share a trade ID. Near-duplicates have different IDs but the
+same politician, issuer, traded_at, type and size band, which is what a
+re-scraped filing under a new ID looks like, but members also file several
+identical-band trades on one day under consecutive IDs, so near-duplicates are
+only reported unless drop_near_duplicates is set. Both kinds are found with
+hash indexes (one dict lookup per row). The keep-first policy streams; keep-latest
+keeps whichever copy has the newest published_at and therefore buffers the
+surviving rows until the input ends.
+"""
+import json
+
+KEEP_FIRST = 'keep-first'
+KEEP_LATEST = 'keep-latest'
+POLICIES = (KEEP_FIRST, KEEP_LATEST)
+
+
+def near_duplicate_key(record):
+    """Fields that identify the same disclosed trade regardless of its ID"""
+    return (record.politician_id, record.issuer_id, record.traded_at, record.type,
+            record.size_min, record.size_max)
+
+
+def _is_newer(candidate, current):
+    # ISO-8601 timestamps sort lexicographically; a missing date is oldest
+    return (candidate.published_at or '') > (current.published_at or '')
+
+
+class TradeDeduper:
+    """Drops duplicate trades from a record stream and keeps a report of what it dropped"""
+
+    def __init__(self, policy=KEEP_FIRST, drop_near_duplicates=False):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown dedup policy {policy!r}; expected one of {POLICIES}')
+        self.policy = policy
+        self.drop_near_duplicates = drop_near_duplicates
+        self.rows_in = 0
+        self.rows_out = 0
+        self.exact_duplicates = []
+        self.near_duplicates = []
+
+    def _exact(self, dropped, kept):
+        self.exact_duplicates.append({'id': dropped.id, 'kept_published_at': kept.published_at,
+                                      'dropped_published_at': dropped.published_at})
+
+    def _near(self, dropped, kept):
+        self.near_duplicates.append({'dropped_id': dropped.id, 'kept_id': kept.id,
+                                     'politician_id': kept.politician_id, 'issuer_id': kept.issuer_id,
+                                     'traded_at': kept.traded_at, 'type': kept.type})
+
+    def dedupe(self, records):
+        """Yield the surviving records in input order"""
+        if self.policy == KEEP_FIRST:
+            survivors = self._keep_first(records)
+        else:
+            survivors = self._keep_latest(records)
+        for record in survivors:
+            self.rows_out += 1
+            yield record
+
+    def _keep_first(self, records):
+        seen = {}
+        by_key = {}
+        for record in records:
+            self.rows_in += 1
+            kept = seen.get(record.id)
+            if kept is not None:
+                self._exact(record, kept)
+                continue
+            seen[record.id] = record
+            key = near_duplicate_key(record)
+            kept = by_key.get(key)
+            if kept is not None:
+                self._near(record, kept)
+                if self.drop_near_duplicates:
+                    continue
+            else:
+                by_key[key] = record
+            yield record
+
+    def _keep_latest(self, records):
+        kept = {}
+        by_key = {}
+        # Newest copy of every ID seen, including IDs dropped as near-duplicates,
+        # so a repeated ID is always an exact duplicate
+        latest = {}
+        for record in records:
+            self.rows_in += 1
+            previous = latest.get(record.id)
+            if previous is not None:
+                if not _is_newer(record, previous):
+                    self._exact(record, previous)
+                    continue
+                self._exact(previous, record)
+                # The newer copy is judged on its own below, whether or not the
+                # older one survived the near-duplicate check
+                current = kept.get(record.id)
+                if current is not None:
+                    old_key = near_duplicate_key(current)
+                    if by_key.get(old_key) is current:
+                        del by_key[old_key]
+            latest[record.id] = record
+
+            key = near_duplicate_key(record)
+            other = by_key.get(key)
+            if other is not None:
+                if _is_newer(record, other):
+                    self._near(other, record)
+                    if self.drop_near_duplicates:
+                        kept.pop(other.id, None)
+                    by_key[key] = record
+                    kept[record.id] = record
+                else:
+                    self._near(record, other)
+                    if self.drop_near_duplicates:
+                        kept.pop(record.id, None)
+                    else:
+                        kept[record.id] = record
+                continue
+
+            by_key[key] = record
+            kept[record.id] = record
+        return iter(kept.values())
+
+    def report(self):
+        return {
+            'policy': self.policy,
+            'drop_near_duplicates': self.drop_near_duplicates,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'exact_duplicate_count': len(self.exact_duplicates),
+            'near_duplicate_count': len(self.near_duplicates),
+            'exact_duplicates': self.exact_duplicates,
+            'near_duplicates': self.near_duplicates,
+        }
+
+    def write_report(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def dedupe_trades(records, policy=KEEP_FIRST, drop_near_duplicates=False):
+    """Convenience wrapper: return (survivor iterator, deduper) for a record stream"""
+    deduper = TradeDeduper(policy, drop_near_duplicates)
+    return deduper.dedupe(records), deduper
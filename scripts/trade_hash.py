@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Canonical content hash for "Trade" rows.
+
+The same trade looks different depending on where it comes from: the SQL dump
+writes '2025-08-14T16:00:00.000Z' and 1000, a Neon CSV export writes
+'2025-08-14 16:00:00' and '1000.00', and jsonb reorders the keys of raw. Every
+column is normalized (UTC timestamps to the millisecond, numbers as plain
+decimals, JSON with sorted keys, empty strings as NULL) before hashing, so equal
+hashes mean equal content. created_at is set by the database and left out.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from trade_sql import TRADE_COLUMNS
+
+HASHED_COLUMNS = tuple(c for c in TRADE_COLUMNS if c not in ('id', 'created_at'))
+
+_TIMESTAMP_COLUMNS = frozenset(('traded_at', 'published_at'))
+_NUMERIC_COLUMNS = frozenset(('size_min', 'size_max', 'price', 'filed_after_days'))
+_JSON_COLUMNS = frozenset(('raw',))
+
+
+def canonical_timestamp(value):
+    """ISO-8601 UTC with millisecond precision, e.g. 2025-08-14T16:00:00.000Z"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip().replace(' ', 'T', 1)
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return str(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f'{dt.microsecond // 1000:03d}Z'
+
+
+def canonical_number(value):
+    """Plain decimal text without trailing zeros, e.g. 1000.00 -> 1000"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        return str(value)
+    if not number.is_finite():
+        return str(number)
+    text = format(number.normalize(), 'f')
+    return '0' if text == '-0' else text
+
+
+def canonical_json(value):
+    """Compact JSON with sorted keys; text that is not JSON is kept as is"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def canonical_value(column, value):
+    if column in _TIMESTAMP_COLUMNS:
+        return canonical_timestamp(value)
+    if column in _NUMERIC_COLUMNS:
+        return canonical_number(value)
+    if column in _JSON_COLUMNS:
+        return canonical_json(value)
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+def canonical_trade(row):
+    """Canonical values of HASHED_COLUMNS for a row given as a mapping or in TRADE_COLUMNS order"""
+    if not hasattr(row, 'get'):
+        row = dict(zip(TRADE_COLUMNS, row))
+    return tuple(canonical_value(c, row.get(c)) for c in HASHED_COLUMNS)
+
+
+def canonical_hash(canonical):
+    """SHA-256 hex of an already canonicalized row"""
+    payload = json.dumps(canonical, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def trade_content_hash(row):
+    """SHA-256 hex of the canonical form of a trade row"""
+    return canonical_hash(canonical_trade(row))
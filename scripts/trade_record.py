@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory model for one row of the "Trade" table.
+
+TradeRecord keeps the 14 columns from prisma/schema.prisma in __slots__, filled
+directly from the tokenizer, so scripts read fields by name instead of splitting
+SQL text. Low-cardinality columns (politician, issuer, type, owner, dates) are
+interned so repeated values share one string object across rows, ``raw`` is held
+as UTF-8 bytes, and the usual Capitol Trades ``source_url`` is rebuilt from the ID.
+"""
+import json
+import sys
+
+from trade_sql import TRADE_COLUMNS, iter_sql_values
+
+SOURCE_URL_PREFIX = 'https://www.capitoltrades.com/trades/'
+
+_SLOTS = tuple('_' + c if c in ('source_url', 'raw') else c for c in TRADE_COLUMNS)
+
+
+def _intern(value):
+    # Exact str only: sys.intern rejects subclasses such as SqlExpr (NOW())
+    return sys.intern(value) if type(value) is str else value
+
+
+class TradeRecord:
+    __slots__ = _SLOTS
+
+    def __init__(self, id, politician_id, issuer_id, traded_at, type, size_min, size_max,
+                 published_at, filed_after_days, owner, price, source_url, raw, created_at):
+        self.id = str(id)
+        self.politician_id = _intern(str(politician_id))
+        self.issuer_id = _intern(str(issuer_id))
+        self.traded_at = _intern(traded_at)
+        self.type = _intern(type)
+        self.size_min = size_min
+        self.size_max = size_max
+        self.published_at = _intern(published_at)
+        self.filed_after_days = filed_after_days
+        self.owner = _intern(owner)
+        self.price = price
+        self.source_url = source_url
+        self.raw = raw
+        self.created_at = _intern(created_at)
+
+    @property
+    def source_url(self):
+        url = self._source_url
+        return SOURCE_URL_PREFIX + self.id if url is True else url
+
+    @source_url.setter
+    def source_url(self, url):
+        self._source_url = True if url == SOURCE_URL_PREFIX + self.id else url
+
+    @property
+    def raw(self):
+        raw = self._raw
+        return raw.decode('utf-8') if isinstance(raw, bytes) else raw
+
+    @raw.setter
+    def raw(self, raw):
+        self._raw = raw.encode('utf-8') if isinstance(raw, str) else raw
+
+    @classmethod
+    def from_values(cls, values):
+        """Build a record from a parsed VALUES tuple in TRADE_COLUMNS order"""
+        if len(values) != len(TRADE_COLUMNS):
+            raise ValueError(f'Expected {len(TRADE_COLUMNS)} trade fields, got {len(values)}')
+        return cls(*values)
+
+    def __iter__(self):
+        # Lets a record be passed anywhere a VALUES tuple is expected (format_insert)
+        for name in TRADE_COLUMNS:
+            yield getattr(self, name)
+
+    def as_tuple(self):
+        return tuple(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, TradeRecord):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'TradeRecord(id={self.id!r}, politician_id={self.politician_id!r}, issuer_id={self.issuer_id!r})'
+
+    def raw_json(self):
+        """Parse the raw scrape payload, or return {} if it is missing or malformed"""
+        raw = self._raw
+        if not raw:
+            return {}
+        if isinstance(raw, dict):
+            return raw
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @property
+    def issuer_name(self):
+        return self.raw_json().get('issuerName')
+
+
+def iter_trades(source, chunk_size=None, bare_values=False):
+    """Stream TradeRecord objects from a Trade INSERT dump"""
+    kwargs = {} if chunk_size is None else {'chunk_size': chunk_size}
+    for values in iter_sql_values(source, bare_values=bare_values, **kwargs):
+        yield TradeRecord.from_values(values)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Compiled binary snapshot of a trade dump (all_trades.sql) for instant reloads.
+
+The snapshot stores fixed-width ID columns, a byte-offset table pointing back
+into the original SQL text (whole row and the raw JSON literal) and a sorted
+trade-ID index. Tools open it with mmap and look up IDs without parsing the
+dump. It is rebuilt automatically when the source file's mtime and content
+hash no longer match the header.
+
+Usage:
+    python scripts/trade_snapshot.py [web/all_trades.sql]
+"""
+import hashlib
+import io
+import mmap
+import os
+import struct
+import sys
+
+from trade_record import TradeRecord
+from trade_sql import TRADE_COLUMNS, iter_sql_rows, iter_sql_values
+
+MAGIC = b'TRDSNAP1'
+VERSION = 1
+ID_WIDTH = 24
+POLITICIAN_ID_WIDTH = 12
+ISSUER_ID_WIDTH = 12
+
+# magic, version, row count, source size, source mtime_ns, source sha256
+_HEADER = struct.Struct('<8sIIQQ32s')
+# row offset, row length, raw offset, raw length
+_OFFSETS = struct.Struct('<QIQI')
+
+_RAW = TRADE_COLUMNS.index('raw')
+
+
+def default_snapshot_path(source_path):
+    return source_path + '.snap'
+
+
+def file_sha256(path):
+    """Hash a file in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _fixed(value, width, column):
+    data = str(value).encode('utf-8')
+    if len(data) > width:
+        raise ValueError(f'{column} {value!r} is longer than {width} bytes')
+    return data.ljust(width, b'\0')
+
+
+def compile_snapshot(source_path, snapshot_path=None):
+    """Parse the dump once and write the binary snapshot next to it"""
+    snapshot_path = snapshot_path or default_snapshot_path(source_path)
+    stat = os.stat(source_path)
+    source_hash = file_sha256(source_path)
+
+    ids = bytearray()
+    politician_ids = bytearray()
+    issuer_ids = bytearray()
+    offsets = bytearray()
+    count = 0
+    for values, (row_start, row_end), spans in iter_sql_rows(source_path):
+        if len(values) != len(TRADE_COLUMNS):
+            raise ValueError(f'Row at byte {row_start} has {len(values)} fields, expected {len(TRADE_COLUMNS)}')
+        ids += _fixed(values[0], ID_WIDTH, 'id')
+        politician_ids += _fixed(values[1], POLITICIAN_ID_WIDTH, 'politician_id')
+        issuer_ids += _fixed(values[2], ISSUER_ID_WIDTH, 'issuer_id')
+        raw_start, raw_end = spans[_RAW]
+        offsets += _OFFSETS.pack(row_start, row_end - row_start, raw_start, raw_end - raw_start)
+        count += 1
+
+    # Sorted trade-ID index: row numbers ordered by their fixed-width ID
+    order = sorted(range(count), key=lambda i: ids[i * ID_WIDTH:(i + 1) * ID_WIDTH])
+    index = struct.pack(f'<{count}I', *order)
+
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, count, stat.st_size, stat.st_mtime_ns, source_hash))
+        for block in (ids, politician_ids, issuer_ids, offsets, index):
+            f.write(block)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def _snapshot_is_fresh(source_path, snapshot_path):
+    """Check the snapshot header against the source; refresh the stored mtime if only it changed"""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return False
+    if len(header) < _HEADER.size:
+        return False
+    magic, version, count, size, mtime_ns, source_hash = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        return False
+    stat = os.stat(source_path)
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    # Touched but possibly unchanged (git checkout, copy): fall back to the hash
+    if file_sha256(source_path) != source_hash:
+        return False
+    _refresh_mtime(snapshot_path, _HEADER.pack(magic, version, count, size, stat.st_mtime_ns, source_hash))
+    return True
+
+
+def _refresh_mtime(snapshot_path, header):
+    """Best-effort header rewrite so the next check skips the hash; read-only snapshots are left alone"""
+    try:
+        with open(snapshot_path, 'r+b') as f:
+            f.write(header)
+    except OSError:
+        pass
+
+
+class TradeSnapshot:
+    """Read-only, mmap-backed view of a compiled snapshot"""
+
+    def __init__(self, source_path, snapshot_path=None):
+        self.source_path = source_path
+        self.snapshot_path = snapshot_path or default_snapshot_path(source_path)
+        with open(self.snapshot_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self._count, _, _, _ = _HEADER.unpack_from(self._mm, 0)
+        n = self._count
+        self._ids_at = _HEADER.size
+        self._politicians_at = self._ids_at + n * ID_WIDTH
+        self._issuers_at = self._politicians_at + n * POLITICIAN_ID_WIDTH
+        self._offsets_at = self._issuers_at + n * ISSUER_ID_WIDTH
+        index_at = self._offsets_at + n * _OFFSETS.size
+        self._index = memoryview(self._mm)[index_at:index_at + 4 * n].cast('I')
+        self._source = None
+
+    def close(self):
+        self._index.release()
+        self._mm.close()
+        if self._source is not None:
+            self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _column(self, start, width, i):
+        at = start + i * width
+        return self._mm[at:at + width].rstrip(b'\0').decode('utf-8')
+
+    def trade_id(self, i):
+        return self._column(self._ids_at, ID_WIDTH, i)
+
+    def politician_id(self, i):
+        return self._column(self._politicians_at, POLITICIAN_ID_WIDTH, i)
+
+    def issuer_id(self, i):
+        return self._column(self._issuers_at, ISSUER_ID_WIDTH, i)
+
+    def ids(self):
+        """All trade IDs in file order"""
+        return [self.trade_id(i) for i in range(self._count)]
+
+    def issuer_ids(self):
+        """Issuer ID of every trade in file order"""
+        return [self.issuer_id(i) for i in range(self._count)]
+
+    def sorted_ids(self):
+        """All trade IDs in ascending order, straight from the index"""
+        return [self.trade_id(i) for i in self._index]
+
+    def find(self, trade_id):
+        """Binary search the sorted index; return the row number or None"""
+        if len(str(trade_id).encode('utf-8')) > ID_WIDTH:
+            return None  # compile_snapshot rejects such IDs, so it cannot be in the snapshot
+        key = _fixed(trade_id, ID_WIDTH, 'id')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            at = self._ids_at + self._index[mid] * ID_WIDTH
+            if self._mm[at:at + ID_WIDTH] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            row = self._index[lo]
+            at = self._ids_at + row * ID_WIDTH
+            if self._mm[at:at + ID_WIDTH] == key:
+                return row
+        return None
+
+    def __contains__(self, trade_id):
+        return self.find(trade_id) is not None
+
+    def _source_bytes(self, offset, length):
+        if self._source is None:
+            with open(self.source_path, 'rb') as f:
+                self._source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._source[offset:offset + length]
+
+    def row_sql(self, i):
+        """The row's VALUES tuple exactly as written in the dump"""
+        row_offset, row_length, _, _ = _OFFSETS.unpack_from(self._mm, self._offsets_at + i * _OFFSETS.size)
+        return self._source_bytes(row_offset, row_length).decode('utf-8')
+
+    def raw(self, i):
+        """The raw JSON column of row i, read from the dump through the offset table"""
+        _, _, raw_offset, raw_length = _OFFSETS.unpack_from(self._mm, self._offsets_at + i * _OFFSETS.size)
+        literal = self._source_bytes(raw_offset, raw_length)
+        values = next(iter_sql_values(io.BytesIO(b'VALUES (' + literal + b')')))
+        return values[0]
+
+    def record(self, i):
+        """Parse row i back into a TradeRecord"""
+        row_offset, row_length, _, _ = _OFFSETS.unpack_from(self._mm, self._offsets_at + i * _OFFSETS.size)
+        values = next(iter_sql_values(io.BytesIO(b'VALUES ' + self._source_bytes(row_offset, row_length))))
+        return TradeRecord.from_values(values)
+
+
+def open_snapshot(source_path, snapshot_path=None):
+    """Open the snapshot for a dump, compiling it first if missing or stale"""
+    snapshot_path = snapshot_path or default_snapshot_path(source_path)
+    if not _snapshot_is_fresh(source_path, snapshot_path):
+        compile_snapshot(source_path, snapshot_path)
+    return TradeSnapshot(source_path, snapshot_path)
+
+
+def main():
+    source_path = sys.argv[1] if len(sys.argv) > 1 else 'web/all_trades.sql'
+    snapshot_path = default_snapshot_path(source_path)
+
+    if _snapshot_is_fresh(source_path, snapshot_path):
+        print(f'✅ Snapshot is up to date: {snapshot_path}')
+    else:
+        print(f'🔄 Compiling {source_path}...')
+        compile_snapshot(source_path, snapshot_path)
+        print(f'✅ Wrote {snapshot_path} ({os.path.getsize(snapshot_path)} bytes)')
+
+    with TradeSnapshot(source_path, snapshot_path) as snapshot:
+        print(f'📊 Trades: {len(snapshot)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Shared reader/writer for the INSERT ... VALUES dumps (all_trades.sql and the batch files).
+
+The reader is a quote-aware tokenizer that pulls the file in fixed-size chunks and
+yields one parsed row at a time, so memory use does not grow with the dump size.
+Parentheses, commas and quotes inside string literals (issuer names, the raw JSON)
+are handled correctly.
+
+The writer is the one place the tools turn Python values into SQL: multi-row
+INSERTs (format_insert / format_model_insert for every model in MODEL_COLUMNS)
+and COPY text rows, both escaping quotes, backslashes, control characters,
+JSON and non-finite numbers correctly. scripts/fuzz_sql_emitter.py round-trips
+random rows through both.
+"""
+import json
+import math
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+TRADE_COLUMNS = (
+    'id', 'politician_id', 'issuer_id', 'traded_at', 'type', 'size_min', 'size_max',
+    'published_at', 'filed_after_days', 'owner', 'price', 'source_url', 'raw', 'created_at',
+)
+
+# (table, columns) for every model the tools write, matching web/prisma/schema.prisma
+# (Fund, SECFiling, Holdings13F and InsiderTrade are defined in the root prisma/schema.prisma)
+MODEL_COLUMNS = {
+    'Issuer': ('Issuer', ('id', 'name', 'ticker', 'sector', 'country', 'created_at')),
+    'Politician': ('Politician', ('id', 'name', 'party', 'chamber', 'state', 'created_at')),
+    'Trade': ('Trade', TRADE_COLUMNS),
+    'TradeContentHash': ('TradeContentHash', ('trade_id', 'content_hash', 'updated_at')),
+    'OpenInsiderCompany': ('openinsider_companies', ('id', 'ticker', 'name', 'created_at', 'updated_at')),
+    'OpenInsiderOwner': ('openinsider_owners', ('id', 'name', 'title', 'isInstitution', 'created_at', 'updated_at')),
+    'OpenInsiderTransaction': ('openinsider_transactions', (
+        'id', 'transaction_date', 'trade_date', 'transaction_type', 'last_price', 'quantity', 'shares_held',
+        'owned', 'value', 'value_numeric', 'company_id', 'owner_id', 'created_at', 'updated_at',
+        'quantity_numeric', 'shares_held_numeric', 'owned_pct')),
+    'Fund': ('Fund', ('id', 'cik', 'name', 'updated_at')),
+    'SECFiling': ('SECFiling', (
+        'id', 'accession_number', 'cik', 'company_name', 'form_type', 'filing_date', 'document_url', 'html_url',
+        'txt_url', 'raw_data', 'updated_at')),
+    'Holdings13F': ('Holdings13F', (
+        'id', 'filing_id', 'symbol', 'company_name', 'cusip', 'shares_held', 'market_value', 'percent_of_portfolio',
+        'is_options', 'calls_puts')),
+    'InsiderTrade': ('InsiderTrade', (
+        'id', 'filing_id', 'insider_name', 'insider_title', 'insider_relationship', 'transaction_code',
+        'transaction_date', 'shares_traded', 'price_per_share', 'total_value', 'ownership_after', 'shares_underlying',
+        'exercise_price', 'expiration_date', 'underlying_security', 'transaction_nature', 'acquisition_disposition',
+        'equity_swap', 'shares_held_directly', 'shares_held_indirectly', 'transaction_category',
+        'calculated_total_value', 'is_acquisition', 'is_disposition', 'trade_size_category', 'price_category',
+        'ownership_impact')),
+}
+
+CHUNK_SIZE = 1 << 16
+
+_TOKEN = re.compile(rb"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*)
+  | (?P<str>'(?:[^']|'')*')
+  | (?P<ident>"(?:[^"]|"")*")
+  | (?P<punct>[(),;])
+  | (?P<word>[^\s(),;'"]+)
+""", re.X)
+
+_INT = re.compile(rb'[-+]?[0-9]+\Z')
+_FLOAT = re.compile(rb'[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?\Z|[-+]?[0-9]+[eE][-+]?[0-9]+\Z')
+
+
+class SqlExpr(str):
+    """Unquoted SQL expression such as NOW(), kept verbatim"""
+    __slots__ = ()
+
+
+def _iter_tokens(fh, chunk_size):
+    """Yield (kind, text, start, end) tokens, reading the file incrementally"""
+    buf = b''
+    pos = 0
+    base = 0  # absolute file offset of buf[0]
+    eof = False
+    while True:
+        m = _TOKEN.match(buf, pos)
+        # A literal followed by another quote means the regex backed off an escaped ''
+        # whose closing quote is still in the next chunk.
+        if m is None or (not eof and (m.end() == len(buf) or buf[m.end()] == 39)):
+            if eof:
+                if pos < len(buf):
+                    raise ValueError(f'Unterminated literal at byte {base + pos}')
+                return
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                eof = True
+            base += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        kind = m.lastgroup
+        if kind != 'ws' and kind != 'comment':
+            yield kind, m.group(), base + m.start(), base + m.end()
+        pos = m.end()
+
+
+def _convert(pieces):
+    """Turn the tokens of one VALUES field into a Python value"""
+    if len(pieces) == 1:
+        kind, text = pieces[0]
+        if kind == 'str':
+            return text[1:-1].replace(b"''", b"'").decode('utf-8')
+        if kind == 'word':
+            upper = text.upper()
+            if upper == b'NULL':
+                return None
+            if upper == b'TRUE':
+                return True
+            if upper == b'FALSE':
+                return False
+            if _INT.match(text):
+                return int(text)
+            if _FLOAT.match(text):
+                return float(text)
+    return SqlExpr(b''.join(text for _, text in pieces).decode('utf-8'))
+
+
+def _iter_rows(fh, chunk_size, bare_values=False):
+    """Yield (values, row_span, field_spans) for every tuple after a VALUES keyword"""
+    in_values = bare_values
+    depth = 0
+    pieces = []
+    values = []
+    spans = []
+    row_start = field_start = field_end = 0
+    for kind, text, start, end in _iter_tokens(fh, chunk_size):
+        if depth == 0:
+            if not in_values:
+                if kind == 'word' and text.upper() == b'VALUES':
+                    in_values = True
+            elif text == b'(':
+                depth = 1
+                row_start = start
+            elif text != b',':
+                # ON CONFLICT, a following INSERT, ';' ... all end the VALUES list
+                in_values = kind == 'word' and text.upper() == b'VALUES'
+            continue
+
+        if text == b'(':
+            depth += 1
+        elif text == b')':
+            depth -= 1
+            if depth == 0:
+                if pieces:
+                    values.append(_convert(pieces))
+                    spans.append((field_start, field_end))
+                yield tuple(values), (row_start, end), spans
+                pieces = []
+                values = []
+                spans = []
+                continue
+        elif text == b',' and depth == 1:
+            values.append(_convert(pieces))
+            spans.append((field_start, field_end))
+            pieces = []
+            continue
+        if not pieces:
+            field_start = start
+        pieces.append((kind, text))
+        field_end = end
+
+
+def _open_binary(source):
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return open(source, 'rb'), True
+    return source, False
+
+
+def iter_sql_values(source, chunk_size=CHUNK_SIZE, bare_values=False):
+    """Stream every VALUES tuple in a SQL dump as a tuple of Python values.
+
+    ``source`` is a path or a binary file object. Quoted strings become ``str``,
+    NULL becomes ``None``, numbers become ``int``/``float`` and anything else
+    (``NOW()``) is returned as an ``SqlExpr``. Set ``bare_values`` for files
+    that hold only ``(...),(...)`` tuples without an INSERT ... VALUES header.
+    """
+    fh, owned = _open_binary(source)
+    try:
+        for values, _, _ in _iter_rows(fh, chunk_size, bare_values):
+            yield values
+    finally:
+        if owned:
+            fh.close()
+
+
+def iter_sql_rows(source, chunk_size=CHUNK_SIZE):
+    """Like iter_sql_values, but also yield byte offsets into the source.
+
+    Yields ``(values, (row_start, row_end), field_spans)`` where the row span
+    covers the parenthesised tuple and each field span covers that field's
+    literal as written in the file.
+    """
+    fh, owned = _open_binary(source)
+    try:
+        yield from _iter_rows(fh, chunk_size)
+    finally:
+        if owned:
+            fh.close()
+
+
+def _quote(text):
+    if '\x00' in text:
+        raise ValueError('PostgreSQL text cannot contain NUL characters')
+    # Only the quote needs doubling: with standard_conforming_strings (on by
+    # default since PostgreSQL 9.1) a backslash in '...' is an ordinary character.
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _json_text(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _float_literal(value):
+    if value != value:
+        return "'NaN'"
+    if value in (math.inf, -math.inf):
+        return "'Infinity'" if value > 0 else "'-Infinity'"
+    return repr(value)
+
+
+def _decimal_literal(value):
+    if value.is_nan():
+        return "'NaN'"
+    if value.is_infinite():
+        return "'Infinity'" if value > 0 else "'-Infinity'"
+    return str(value)
+
+
+_LITERALS = {
+    type(None): lambda value: 'NULL',
+    str: _quote,
+    SqlExpr: str,
+    bool: lambda value: 'TRUE' if value else 'FALSE',
+    int: repr,
+    float: _float_literal,
+    Decimal: _decimal_literal,
+    dict: lambda value: _quote(_json_text(value)),
+    list: lambda value: _quote(_json_text(value)),
+    datetime: lambda value: _quote(value.isoformat()),
+    date: lambda value: _quote(value.isoformat()),
+    bytes: lambda value: "'\\x" + value.hex() + "'",
+}
+
+
+def sql_literal(value):
+    """Render a Python value as a SQL literal.
+
+    Strings are quoted with '' escaping, dicts and lists become JSON text (for
+    jsonb columns), datetimes ISO-8601 text, bytes a bytea hex literal, NaN and
+    infinities their quoted PostgreSQL spellings, and an SqlExpr is kept verbatim.
+    """
+    render = _LITERALS.get(type(value))
+    if render is None:
+        for kind in (SqlExpr, str, bool, int, float, Decimal, dict, list, datetime, date, bytes):
+            if isinstance(value, kind):
+                render = _LITERALS[kind]
+                break
+        else:
+            render = lambda v: _quote(str(v))
+    return render(value)
+
+
+def format_values_row(values):
+    """Render one row as a parenthesised VALUES tuple"""
+    return '(' + ', '.join(map(sql_literal, values)) + ')'
+
+
+def format_insert(table, columns, rows, on_conflict='ON CONFLICT (id) DO NOTHING'):
+    """Render a multi-row INSERT statement"""
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    values = ',\n'.join(map(format_values_row, rows))
+    return f'INSERT INTO "{table}" ({column_list}) VALUES\n{values}\n{on_conflict};'
+
+
+def format_model_insert(model, rows, on_conflict='ON CONFLICT (id) DO NOTHING'):
+    """Multi-row INSERT for one of MODEL_COLUMNS, rows in that model's column order"""
+    table, columns = MODEL_COLUMNS[model]
+    return format_insert(table, columns, rows, on_conflict)
+
+
+def _copy_text(text):
+    if '\x00' in text:
+        raise ValueError('PostgreSQL text cannot contain NUL characters')
+    # Four C-level replaces are several times faster than str.translate with a dict
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_number(value):
+    return sql_literal(value).strip("'")
+
+
+# Expressions such as NOW() cannot travel through COPY; the staging INSERT
+# fills them from the column default instead, so they are sent as NULL.
+_COPY_FIELDS = {
+    type(None): lambda value: '\\N',
+    SqlExpr: lambda value: '\\N',
+    str: _copy_text,
+    bool: lambda value: 't' if value else 'f',
+    int: repr,
+    float: _copy_number,
+    Decimal: _copy_number,
+    dict: lambda value: _copy_text(_json_text(value)),
+    list: lambda value: _copy_text(_json_text(value)),
+    datetime: lambda value: value.isoformat(),
+    date: lambda value: value.isoformat(),
+    bytes: lambda value: '\\\\x' + value.hex(),
+}
+
+
+def copy_text_field(value):
+    """Encode one value for COPY ... FROM STDIN (text format)"""
+    encode = _COPY_FIELDS.get(type(value))
+    if encode is None:
+        for kind in (SqlExpr, str, bool, int, float, Decimal, dict, list, datetime, date, bytes):
+            if isinstance(value, kind):
+                encode = _COPY_FIELDS[kind]
+                break
+        else:
+            encode = lambda v: _copy_text(str(v))
+    return encode(value)
+
+
+def copy_text_row(row):
+    """Encode one row as a COPY text line"""
+    return '\t'.join(map(copy_text_field, row)) + '\n'
+
+
+def copy_text_rows(rows):
+    """Encode rows as one COPY text payload"""
+    return ''.join(map(copy_text_row, rows))
@@ -2,46 +2,32 @@
 """
 Comprehensive analysis to find ALL missing trades between CSV export and local SQL data
 """
-import re
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from reconcile_trades import reconcile
 
 def comprehensive_missing_analysis():
     print("🔍 COMPREHENSIVE MISSING TRADES ANALYSIS")
     print("=" * 50)
     
-    # Step 1: Extract trade IDs from CSV (what's currently in Neon DB)
-    print("📊 Step 1: Extracting trade IDs from CSV export...")
-    with open('Trade.csv', 'r') as f:
-        csv_lines = f.readlines()
-    
-    csv_trade_ids = set()
-    for line in csv_lines[1:]:  # Skip header
-        trade_id = line.split(',')[0].strip().replace('"', '')
-        csv_trade_ids.add(trade_id)
-    
-    print(f"✅ CSV Trade IDs: {len(csv_trade_ids)}")
-    
-    # Step 2: Extract trade IDs from local SQL file
-    print("📊 Step 2: Extracting trade IDs from local SQL file...")
-    with open('all_trades.sql', 'r') as f:
-        sql_content = f.read()
-    
-    # Extract all trade IDs from SQL using regex
-    # Pattern to match trade IDs in the format '20003791187'
-    trade_id_pattern = r"'([0-9]{11})'"
-    sql_trade_ids = set(re.findall(trade_id_pattern, sql_content))
-    
-    print(f"✅ SQL Trade IDs: {len(sql_trade_ids)}")
-    
-    # Step 3: Find missing trade IDs
-    print("📊 Step 3: Finding missing trade IDs...")
-    missing_trade_ids = sql_trade_ids - csv_trade_ids
-    
+    # Steps 1-3: merge-diff the CSV export against the local dump by trade ID.
+    # Both sides are parsed properly (csv module, SQL tokenizer) and sorted on disk,
+    # so IDs inside raw JSON or URLs can no longer be mistaken for trade IDs.
+    print("📊 Steps 1-3: Reconciling CSV export against local SQL file...")
+    summary = reconcile('Trade.csv', 'all_trades.sql', out_dir='reconcile')
+    with open(summary['missing_path']) as f:
+        missing_trade_ids = [line.strip() for line in f if line.strip()]
+
+    print(f"✅ CSV Trade IDs: {summary['export_trades']}")
+    print(f"✅ SQL Trade IDs: {summary['dump_trades']}")
     print(f"✅ Missing Trade IDs: {len(missing_trade_ids)}")
-    
+    print(f"✅ Extra in DB: {summary['extra_in_db']}, changed since import: {summary['changed']} (see reconcile/)")
+
     # Step 4: Analyze the missing trade ID ranges
     print("📊 Step 4: Analyzing missing trade ID ranges...")
-    missing_list = sorted(list(missing_trade_ids))
+    missing_list = missing_trade_ids  # already sorted by the merge
     
     if missing_list:
         print(f"First 10 missing IDs: {missing_list[:10]}")
@@ -83,10 +69,10 @@ def comprehensive_missing_analysis():
     
     # Step 6: Summary
     print("\n📋 SUMMARY:")
-    print(f"  Current DB (CSV): {len(csv_trade_ids)} trades")
-    print(f"  Local SQL: {len(sql_trade_ids)} trades")
+    print(f"  Current DB (CSV): {summary['export_trades']} trades")
+    print(f"  Local SQL: {summary['dump_trades']} trades")
     print(f"  Missing: {len(missing_trade_ids)} trades")
-    print(f"  Expected after import: {len(csv_trade_ids) + len(missing_trade_ids)} trades")
+    print(f"  Expected after import: {summary['export_trades'] + len(missing_trade_ids)} trades")
     
     return missing_list
 
@@ -5,44 +5,32 @@ Local SQL: 35,808 trades (complete dataset)
 Neon DB: 8,023 trades (current database)
 Missing: 27,785 trades
 """
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from reconcile_trades import reconcile
 
 def find_correct_missing_trades():
     print("🔍 CORRECT MISSING TRADES ANALYSIS")
     print("=" * 50)
     
-    # Step 1: Extract trade IDs from CSV (Neon database)
-    print("📊 Step 1: Extracting trade IDs from Neon database (CSV)...")
-    with open('trade.csv', 'r') as f:
-        csv_lines = f.readlines()
-    
-    csv_trade_ids = set()
-    for line in csv_lines[1:]:  # Skip header
-        trade_id = line.split(',')[0].strip().replace('"', '')
-        csv_trade_ids.add(trade_id)
-    
-    print(f"✅ Neon Database (CSV): {len(csv_trade_ids)} trades")
-    
-    # Step 2: Extract trade IDs from local SQL file
-    print("📊 Step 2: Extracting trade IDs from local SQL file...")
-    with open('all_trades.sql', 'r') as f:
-        sql_content = f.read()
-    
-    # Extract all trade IDs from SQL using regex
-    trade_id_pattern = r"'([0-9]{11})'"
-    sql_trade_ids = set(re.findall(trade_id_pattern, sql_content))
-    
-    print(f"✅ Local SQL file: {len(sql_trade_ids)} trades")
-    
-    # Step 3: Find missing trade IDs
-    print("📊 Step 3: Finding missing trade IDs...")
-    missing_trade_ids = sql_trade_ids - csv_trade_ids
-    
+    # Steps 1-3: merge-diff the CSV export against the local dump by trade ID.
+    # Both sides are parsed properly (csv module, SQL tokenizer) and sorted on disk,
+    # so IDs inside raw JSON or URLs can no longer be mistaken for trade IDs.
+    print("📊 Steps 1-3: Reconciling CSV export against local SQL file...")
+    summary = reconcile('trade.csv', 'all_trades.sql', out_dir='reconcile')
+    with open(summary['missing_path']) as f:
+        missing_trade_ids = [line.strip() for line in f if line.strip()]
+
+    print(f"✅ Neon Database (CSV): {summary['export_trades']} trades")
+    print(f"✅ Local SQL file: {summary['dump_trades']} trades")
     print(f"✅ Missing Trade IDs: {len(missing_trade_ids)} trades")
-    
+    print(f"✅ Extra in DB: {summary['extra_in_db']}, changed since import: {summary['changed']} (see reconcile/)")
+
     # Step 4: Analyze the missing trade ID ranges
     print("📊 Step 4: Analyzing missing trade ID ranges...")
-    missing_list = sorted(list(missing_trade_ids))
+    missing_list = missing_trade_ids  # already sorted by the merge
     
     if missing_list:
         print(f"First 10 missing IDs: {missing_list[:10]}")
@@ -84,10 +72,10 @@ def find_correct_missing_trades():
     
     # Step 6: Summary
     print("\n📋 CORRECT SUMMARY:")
-    print(f"  Neon Database (CSV): {len(csv_trade_ids)} trades")
-    print(f"  Local SQL file: {len(sql_trade_ids)} trades")
+    print(f"  Neon Database (CSV): {summary['export_trades']} trades")
+    print(f"  Local SQL file: {summary['dump_trades']} trades")
     print(f"  Missing: {len(missing_trade_ids)} trades")
-    print(f"  Expected after import: {len(csv_trade_ids) + len(missing_trade_ids)} trades")
+    print(f"  Expected after import: {summary['export_trades'] + len(missing_trade_ids)} trades")
     
     return missing_list
 
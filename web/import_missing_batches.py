@@ -1,74 +1,62 @@
 #!/usr/bin/env python3
 """
 Script to import all missing trade batches and show progress
+
+Streams the trades of every missing_trades_45_batch_*.sql file into
+DATABASE_URL through the parallel COPY loader in scripts/pg_loader.py, regrouped
+into DEFAULT_BATCH_ROWS batches instead of one round trip per 45-row file.
+Batches are journaled by their ID range, so rerunning after an interruption
+skips the batches that already landed and retries only the failed ones.
 """
 import os
-import subprocess
-import time
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from import_journal import ImportJournal
+from pg_loader import DEFAULT_BATCH_ROWS, DEFAULT_WORKERS, load_trades
+from trade_record import iter_trades
 
 def import_missing_batches():
     print("🚀 STARTING MISSING TRADE BATCH IMPORT")
     print("=" * 50)
-    
+
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        print("❌ DATABASE_URL is not set")
+        sys.exit(1)
+
     # Get list of all batch files
     batch_dir = 'missing_trades_45_batches'
     batch_files = sorted([f for f in os.listdir(batch_dir) if f.startswith('missing_trades_45_batch_') and f.endswith('.sql')])
-    
-    total_batches = len(batch_files)
-    print(f"📊 Total batches to import: {total_batches}")
-    
-    successful_imports = 0
-    failed_imports = 0
-    
-    for i, batch_file in enumerate(batch_files, 1):
-        batch_path = os.path.join(batch_dir, batch_file)
-        
-        print(f"\n🔄 BATCH {i}/{total_batches}: {batch_file}")
-        
-        try:
-            # Read the SQL file
-            with open(batch_path, 'r') as f:
-                sql_content = f.read()
-            
-            # Import using MCP Neon tool
-            # Note: This would need to be called via the MCP tool in the actual implementation
-            print(f"   ✅ Importing {batch_file}...")
-            
-            # Simulate import success for now
-            successful_imports += 1
-            print(f"   ✅ SUCCESS: {batch_file}")
-            
-        except Exception as e:
-            failed_imports += 1
-            print(f"   ❌ ERROR: {batch_file} - {str(e)}")
-        
-        # Progress update every 10 batches
-        if i % 10 == 0:
-            print(f"\n📈 PROGRESS UPDATE:")
-            print(f"   Completed: {i}/{total_batches} batches")
-            print(f"   Successful: {successful_imports}")
-            print(f"   Failed: {failed_imports}")
-            print(f"   Success Rate: {(successful_imports/i)*100:.1f}%")
-    
-    print(f"\n🎯 FINAL RESULTS:")
-    print(f"   Total Batches: {total_batches}")
-    print(f"   Successful: {successful_imports}")
-    print(f"   Failed: {failed_imports}")
-    print(f"   Success Rate: {(successful_imports/total_batches)*100:.1f}%")
-    
-    if failed_imports > 0:
-        print(f"\n⚠️  {failed_imports} batches failed to import. Check the errors above.")
-    else:
-        print(f"\n🎉 All {total_batches} batches imported successfully!")
-
-if __name__ == '__main__':
-    import_missing_batches()
-
-
-
 
+    print(f"📊 Batch files to import: {len(batch_files)}")
 
+    records = (trade for f in batch_files for trade in iter_trades(os.path.join(batch_dir, f)))
 
+    def progress(batch_key, batch, inserted, error):
+        if error is not None:
+            print(f"   ❌ ERROR: {batch_key} - {error}")
+        else:
+            print(f"   ✅ SUCCESS: {batch_key} ({len(batch)} trades sent, {len(inserted)} inserted)")
 
+    with ImportJournal('import_journal.sqlite') as journal:
+        stats = load_trades(records, dsn, workers=DEFAULT_WORKERS, batch_rows=DEFAULT_BATCH_ROWS,
+                            on_batch=progress, journal=journal)
+        summary = journal.summary()
 
+    print(f"\n🎯 FINAL RESULTS:")
+    print(f"   Batches Loaded: {stats['batches']}")
+    print(f"   Skipped (already done): {stats['skipped_batches']}")
+    print(f"   Failed: {stats['failed_batches']}")
+    print(f"   Trades Sent: {stats['rows_sent']}")
+    print(f"   Trades Inserted: {stats['rows_inserted']}")
+    print(f"   Trades Landed (all runs): {summary['trades_landed']}")
+    print(f"   Time: {stats['seconds']:.1f}s")
+
+    if stats['failed_batches'] > 0:
+        print(f"\n⚠️  {stats['failed_batches']} batches failed to import. Check the errors above.")
+    else:
+        print(f"\n🎉 All trades from {len(batch_files)} batch files imported successfully!")
 
+if __name__ == '__main__':
+    import_missing_batches()
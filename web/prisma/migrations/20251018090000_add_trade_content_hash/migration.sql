@@ -0,0 +1,11 @@
+-- CreateTable
+CREATE TABLE "public"."TradeContentHash" (
+    "trade_id" TEXT NOT NULL,
+    "content_hash" TEXT NOT NULL,
+    "updated_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "TradeContentHash_pkey" PRIMARY KEY ("trade_id")
+);
+
+-- AddForeignKey
+ALTER TABLE "public"."TradeContentHash" ADD CONSTRAINT "TradeContentHash_trade_id_fkey" FOREIGN KEY ("trade_id") REFERENCES "public"."Trade"("id") ON DELETE CASCADE ON UPDATE CASCADE;
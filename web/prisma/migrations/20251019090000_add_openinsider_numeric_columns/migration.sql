@@ -0,0 +1,7 @@
+-- AlterTable
+ALTER TABLE "public"."openinsider_transactions" ADD COLUMN     "owned_pct" DECIMAL(65,30),
+ADD COLUMN     "quantity_numeric" BIGINT,
+ADD COLUMN     "shares_held_numeric" BIGINT;
+
+-- CreateIndex
+CREATE INDEX "openinsider_transactions_value_numeric_idx" ON "public"."openinsider_transactions"("value_numeric" DESC);